@@ -0,0 +1,305 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+"""
+Throughput benchmarks for the data handling pipeline.
+
+Drives the data handler of each supported game with a synthetic stream of
+busy-frame property changes (game time ticks, coordinates, battle stats),
+or with a stream recorded from a real session (`--capture`), and reports:
+
+  - updates per second;
+  - p50 and p99 latency per update;
+  - memory allocated per update (mean transient peak, traced with `tracemalloc`).
+
+The hot paths are also measured in isolation: `DataHandler.on_property_changed`,
+`StateMachine.on_input` and `Event.emit`.
+
+Usage:
+
+  python benchmarks/throughput.py
+  python benchmarks/throughput.py --game yellow --updates 200000
+  python benchmarks/throughput.py --capture session.pwcap
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Any, Callable, Dict, Final, Iterable, List, Optional, Tuple
+
+import argparse
+from itertools import cycle, islice
+import logging
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+from attrs import define, field
+
+from pokewatcher.core.capture import CaptureReader
+from pokewatcher.data.crystal.gamehook import (
+    PROPERTIES as CRYSTAL_PROPERTIES,
+    load_data_handler as load_crystal_data_handler,
+)
+from pokewatcher.data.emerald.gamehook import (
+    PROPERTIES as EMERALD_PROPERTIES,
+    load_data_handler as load_emerald_data_handler,
+)
+from pokewatcher.data.firered.gamehook import (
+    PROPERTIES as FIRERED_PROPERTIES,
+    load_data_handler as load_firered_data_handler,
+)
+from pokewatcher.data.gamehook import DataHandler
+from pokewatcher.data.structs import GameData
+from pokewatcher.data.yellow.gamehook import (
+    PROPERTIES as YELLOW_PROPERTIES,
+    load_data_handler as load_yellow_data_handler,
+)
+from pokewatcher.events import Event
+from pokewatcher.logic.crystal.fsm import Initial as InitialCrystalState
+from pokewatcher.logic.emerald.fsm import Initial as InitialEmeraldState
+from pokewatcher.logic.firered.fsm import Initial as InitialFireRedState
+from pokewatcher.logic.fsm import StateMachine
+from pokewatcher.logic.yellow.fsm import Initial as InitialYellowState
+
+###############################################################################
+# Constants
+###############################################################################
+
+# (property, value, bytes)
+Change = Tuple[str, Any, List[int]]
+
+
+@define
+class Game:
+    name: str
+    properties: Dict[str, Dict[str, Any]]
+    load_data_handler: Callable
+    initial_state: Callable
+
+
+GAMES: Final[Dict[str, Game]] = {
+    'yellow': Game(
+        'Pokemon Yellow', YELLOW_PROPERTIES, load_yellow_data_handler, InitialYellowState
+    ),
+    'crystal': Game(
+        'Pokemon Crystal', CRYSTAL_PROPERTIES, load_crystal_data_handler, InitialCrystalState
+    ),
+    'emerald': Game(
+        'Pokemon Emerald', EMERALD_PROPERTIES, load_emerald_data_handler, InitialEmeraldState
+    ),
+    'firered': Game(
+        'Pokemon FireRed', FIRERED_PROPERTIES, load_firered_data_handler, InitialFireRedState
+    ),
+}
+
+# properties that change the most during gameplay
+BUSY_PROPERTIES: Final[Tuple[str, ...]] = (
+    'gameTime.frames',
+    'gameTime.seconds',
+    'overworld.x',
+    'overworld.y',
+    'battle.yourPokemon.modStageAttack',
+    'battle.yourPokemon.modStageDefense',
+    'battle.yourPokemon.modStageSpeed',
+    'battle.yourPokemon.battleStatAttack',
+    'battle.yourPokemon.battleStatSpeed',
+    'battle.yourPokemon.attack',
+    'battle.yourPokemon.speed',
+)
+
+DEFAULT_UPDATES: Final[int] = 100000
+ALLOCATION_SAMPLES: Final[int] = 2000
+
+###############################################################################
+# Results
+###############################################################################
+
+
+@define
+class Result:
+    name: str
+    latencies: List[int] = field(factory=list, repr=False)  # nanoseconds
+    elapsed: float = 0.0  # seconds
+    allocated: float = 0.0  # bytes per update
+
+    @property
+    def n(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        return self.n / self.elapsed if self.elapsed > 0.0 else 0.0
+
+    def percentile(self, p: float) -> float:
+        values = sorted(self.latencies)
+        i = min(len(values) - 1, int(len(values) * p / 100.0))
+        return values[i] / 1000.0  # microseconds
+
+    def __str__(self) -> str:
+        return (
+            f'{self.name:<40} {self.throughput:>12,.0f} /s'
+            f' {self.percentile(50):>9.2f} us'
+            f' {self.percentile(99):>9.2f} us'
+            f' {self.allocated:>9.1f}'
+        )
+
+
+HEADER: Final[str] = (
+    f'{"benchmark":<40} {"throughput":>15} {"p50":>12} {"p99":>12} {"B/op":>9}'
+)
+
+###############################################################################
+# Streams
+###############################################################################
+
+
+def synthetic_stream(properties: Iterable[str], n: int) -> List[Change]:
+    changes = []
+    props = [p for p in BUSY_PROPERTIES if p in properties]
+    for i, prop in enumerate(islice(cycle(props), n)):
+        value = (i // len(props)) % 60
+        changes.append((prop, value, [value]))
+    return changes
+
+
+def recorded_stream(path: Path, n: int) -> Tuple[str, List[Change]]:
+    reader = CaptureReader(path)
+    changes = [(r.prop, r.value, r.byte_values) for r in reader if r.changed_bytes]
+    if n > 0 and changes:
+        changes = list(islice(cycle(changes), max(n, len(changes))))
+    return reader.game_name, changes
+
+
+def game_key(name: str) -> Optional[str]:
+    name = name.lower()
+    if 'yellow' in name or ('red' in name and 'blue' in name):
+        return 'yellow'
+    if 'crystal' in name or ('gold' in name and 'silver' in name):
+        return 'crystal'
+    if 'emerald' in name:
+        return 'emerald'
+    if 'firered' in name:
+        return 'firered'
+    return None
+
+
+###############################################################################
+# Benchmarks
+###############################################################################
+
+
+def measure(name: str, function: Callable, inputs: List[Tuple[Any, ...]]) -> Result:
+    result = Result(name)
+    latencies = result.latencies
+    clock = time.perf_counter_ns
+    start = clock()
+    for args in inputs:
+        t = clock()
+        function(*args)
+        latencies.append(clock() - t)
+    result.elapsed = (clock() - start) / 1e9
+    result.allocated = measure_allocations(function, inputs[:ALLOCATION_SAMPLES])
+    return result
+
+
+def measure_allocations(function: Callable, inputs: List[Tuple[Any, ...]]) -> float:
+    # tracing is slow, so this runs separately from the timed loop
+    if not inputs:
+        return 0.0
+    total = 0
+    tracemalloc.start()
+    try:
+        for args in inputs:
+            before, _peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            function(*args)
+            _current, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / len(inputs)
+
+
+def new_data_handler(game: Game) -> DataHandler:
+    fsm = StateMachine(game.initial_state())
+    return game.load_data_handler(GameData(), fsm)
+
+
+def bench_data_handler(key: str, changes: List[Change], label: str) -> Result:
+    handler = new_data_handler(GAMES[key])
+    return measure(f'{key}: on_property_changed ({label})', handler.on_property_changed, changes)
+
+
+def bench_state_machine(key: str, n: int) -> Optional[Result]:
+    game = GAMES[key]
+    labels = [
+        (metadata['label'], prop)
+        for prop, metadata in game.properties.items()
+        if metadata.get('label') and prop in BUSY_PROPERTIES
+    ]
+    if not labels:
+        return None
+    fsm = StateMachine(game.initial_state())
+    data = GameData()
+    inputs = []
+    for i, (label, _prop) in enumerate(islice(cycle(labels), n)):
+        inputs.append((label, i % 60, (i + 1) % 60, data))
+    return measure(f'{key}: StateMachine.on_input', fsm.on_input, inputs)
+
+
+def bench_event_emit(n: int, n_callbacks: int = 3) -> Result:
+    event = Event(name='benchmark')
+    for _ in range(n_callbacks):
+        event.watch(lambda path, prev, value: None)
+    inputs = [('player.team.slot1.level', i, i + 1) for i in range(n)]
+    return measure(f'Event.emit ({n_callbacks} callbacks)', event.emit, inputs)
+
+
+###############################################################################
+# Entry Point
+###############################################################################
+
+
+def parse_arguments(argv: Optional[List[str]]) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description='Data handling throughput benchmarks.')
+    parser.add_argument('--game', choices=sorted(GAMES), help='Benchmark a single game.')
+    parser.add_argument('--capture', type=Path, help='Replay a recorded property stream.')
+    parser.add_argument('--updates', type=int, default=DEFAULT_UPDATES, help='Updates per run.')
+    return vars(parser.parse_args(args=argv))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_arguments(argv)
+    logging.basicConfig(level=logging.WARNING)
+    n = args['updates']
+    results = []
+
+    capture = args.get('capture')
+    if capture is not None:
+        game_name, changes = recorded_stream(capture, n)
+        key = game_key(game_name)
+        if key is None:
+            print(f'unsupported game in capture file: {game_name!r}', file=sys.stderr)
+            return 1
+        results.append(bench_data_handler(key, changes, f'recorded, {capture.name}'))
+    else:
+        keys = [args['game']] if args.get('game') else list(GAMES)
+        for key in keys:
+            changes = synthetic_stream(GAMES[key].properties, n)
+            results.append(bench_data_handler(key, changes, 'synthetic'))
+            result = bench_state_machine(key, n)
+            if result is not None:
+                results.append(result)
+        results.append(bench_event_emit(n))
+
+    print(HEADER)
+    for result in results:
+        print(result)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -83,6 +83,8 @@ setup(
     ],
     extras_require={
         'dev': ['pytest', 'tox'],
+        'zstd': ['zstandard'],
+        'orjson': ['orjson'],
     },
     zip_safe=False,
     project_urls={
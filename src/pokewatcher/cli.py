@@ -25,11 +25,12 @@ import logging
 from pathlib import Path
 
 from pokewatcher import __version__ as current_version
-from pokewatcher.components import ALL_COMPONENTS
+from pokewatcher.components import ALL_COMPONENTS, save_backup
 from pokewatcher.core.config import dump as dump_configs, load as load_configs, setup_logging
 from pokewatcher.core.game import GameInterface
-from pokewatcher.core.util import SleepLoop
+from pokewatcher.core.scheduler import Scheduler
 from pokewatcher.errors import PokeWatcherComponentError
+import pokewatcher.events as events
 
 ###############################################################################
 # Constants
@@ -39,6 +40,9 @@ logger: Final[logging.Logger] = logging.getLogger(__name__)
 
 CMD_DUMP_DEFAULTS: Final[str] = 'dump-defaults'
 CMD_VALIDATE: Final[str] = 'validate'
+CMD_EXPORT_BACKUP: Final[str] = 'export-backup'
+
+WAKE_FALLBACK_RATE: Final[float] = 1.0  # Hz, for tasks that run when woken up
 
 ###############################################################################
 # Argument Parsing
@@ -64,12 +68,26 @@ def parse_arguments(argv: Optional[List[str]]) -> Dict[str, Any]:
     )
 
     parser.add_argument(
-        'cmd', nargs='?', choices=[CMD_DUMP_DEFAULTS, CMD_VALIDATE], help='Run a special command.'
+        '-o',
+        '--output',
+        type=Path,
+        default=Path.cwd(),
+        help=f'Destination file or directory for {CMD_EXPORT_BACKUP}.',
     )
 
-    # parser.add_argument(
-    #     'args', metavar='ARG', nargs=argparse.ZERO_OR_MORE, help='An argument for the program.'
-    # )
+    parser.add_argument(
+        'cmd',
+        nargs='?',
+        choices=[CMD_DUMP_DEFAULTS, CMD_VALIDATE, CMD_EXPORT_BACKUP],
+        help='Run a special command.',
+    )
+
+    parser.add_argument(
+        'args',
+        metavar='ARG',
+        nargs=argparse.ZERO_OR_MORE,
+        help=f'Backup names for {CMD_EXPORT_BACKUP} (lists all backups if omitted).',
+    )
 
     args = parser.parse_args(args=argv)
     return vars(args)
@@ -116,6 +134,31 @@ def _load_components(game: GameInterface, configs: Dict[str, Any]) -> List[Any]:
     return components
 
 
+###############################################################################
+# Special Commands
+###############################################################################
+
+
+def export_backups(args: Dict[str, Any]) -> int:
+    configs = load_configs(args)
+    settings = configs.get('save_backup') or save_backup.default_settings()
+    store = save_backup.open_store(settings)
+    names = args.get('args') or []
+    if not names:
+        for name in store.names():
+            entry = store.get(name)
+            logger.info(f'{entry.digest[:12]}  {entry.size:>8}  {name}')
+        return 0
+    output = args['output']
+    if len(names) > 1 and not output.is_dir():
+        logger.error(f'expected an output directory to export {len(names)} backups')
+        return 1
+    for name in names:
+        path = store.export(name, output)
+        logger.info(f'exported {name} to {path}')
+    return 0
+
+
 ###############################################################################
 # Main Logic
 ###############################################################################
@@ -134,18 +177,36 @@ def workflow(
     for component in components:
         component.start()
 
-    freq = configs['options']['loop_frequency']
-    delay = 1.0 / freq  # hz to sec
-    with SleepLoop(delay=delay) as loop:
-        while loop.iterate():
-            game.update(loop.delta)
-            for component in components:
-                component.update(loop.delta)
+    options = configs['options']
+    freq = options['loop_frequency']
+    rates = options.get('update_rates') or {}
+    scheduler = Scheduler()
+    # process GameHook data as soon as it arrives, instead of on the next tick;
+    # the periodic rate is only a fallback, unless memory is polled on this task
+    game_rate = WAKE_FALLBACK_RATE
+    if not game.gamehook.threaded and game.gamehook.poll_interval > 0.0:
+        game_rate = 1.0 / game.gamehook.poll_interval
+    scheduler.add('game', game.update, rates.get('game', game_rate), on_wake=True)
+    if not game.gamehook.threaded:
+        game.gamehook.queue.on_ready = scheduler.wake
+    # deliver events queued for the main loop right after they are emitted
+    events_rate = rates.get('events', WAKE_FALLBACK_RATE)
+    scheduler.add('events', events.dispatch_pending, events_rate, on_wake=True)
+    events.main_loop.on_ready = scheduler.wake
+    for component in components:
+        key = type(component).__module__.split('.')[-1]
+        scheduler.add(key, component.update, rates.get(key, freq))
+    try:
+        scheduler.run()
+    finally:
+        scheduler.log_stats()
+        events.log_stats()
     return 0
 
 
 def cleanup(game: GameInterface, components: List[Any]) -> None:
     logger.info('cleaning up game and components')
+    events.shutdown()
     game.cleanup()
     for component in components:
         component.cleanup()
@@ -162,6 +223,8 @@ def main(argv: Optional[List[str]] = None) -> int:
     # short-circuit commands ---------------------------------------------------
     cmd = args.get('cmd')
     if cmd:
+        # console only, special commands do not overwrite the log file of a run
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
         try:
             if cmd == CMD_DUMP_DEFAULTS:
                 logger.info(f'running special command {cmd}')
@@ -172,6 +235,9 @@ def main(argv: Optional[List[str]] = None) -> int:
                 load_configs(args)
                 logger.info('settings are valid')
                 return 0
+            elif cmd == CMD_EXPORT_BACKUP:
+                logger.info(f'running special command {cmd}')
+                return export_backups(args)
         except KeyboardInterrupt:
             logger.error('aborted manually')
             return 1
@@ -14,7 +14,13 @@ from attrs import define, field
 from pokewatcher.core.game import GameInterface
 from pokewatcher.core.retroarch import RetroArchError
 from pokewatcher.data.structs import GameMap
-from pokewatcher.events import on_map_changed, on_reset, on_save_game
+from pokewatcher.events import (
+    DELIVERY_MAIN,
+    GameEvent,
+    on_map_changed,
+    on_reset,
+    on_save_game,
+)
 
 ###############################################################################
 # Constants
@@ -128,9 +134,10 @@ class AutoSaveComponent:
         self._just_reset = True
         self._not_visited = set(self.maps_save_once)
 
-        on_map_changed.watch(self.on_map_changed)
-        on_reset.watch(self.on_reset)
-        on_save_game.watch(self.on_save_game)
+        # after the game update that emitted them, on the main loop
+        on_map_changed.watch(self.on_map_changed, mode=DELIVERY_MAIN)
+        on_reset.watch(self.on_reset, mode=DELIVERY_MAIN)
+        on_save_game.watch(self.on_save_game, mode=DELIVERY_MAIN)
 
     def start(self):
         logger.info('starting')
@@ -144,8 +151,9 @@ class AutoSaveComponent:
         logger.info('cleaning up')
         return
 
-    def on_map_changed(self):
-        map = self.game.data.location
+    def on_map_changed(self, event: GameEvent):
+        # the map at the time of the change, even if this is called later
+        map = event.location
         if not map:
             # possibly in intro screen
             return
@@ -171,10 +179,10 @@ class AutoSaveComponent:
                 logger.error(str(e))
         self._last_map = map
 
-    def on_reset(self):
+    def on_reset(self, _event: GameEvent):
         self._just_reset = True
 
-    def on_save_game(self):
+    def on_save_game(self, _event: GameEvent):
         try:
             self.game.retroarch.request_save_state()
         except RetroArchError as e:
@@ -5,17 +5,27 @@
 # Imports
 ###############################################################################
 
-from typing import Any, Final, Mapping
+from typing import Any, Final, Mapping, Optional, Tuple
 
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import logging
+from threading import Event, Thread
+import time
 
 from attrs import define, field
 
 from pokewatcher.core.game import GameInterface
-from pokewatcher.core.util import TcpConnection, TimeInterval, TimeRecord
+from pokewatcher.core.livesplit import LivesplitClient
+from pokewatcher.core.util import TimeInterval, TimeRecord
 from pokewatcher.errors import PokeWatcherComponentError
 
-from pokewatcher.events import on_battle_ended, on_champion_victory, on_new_game
+from pokewatcher.events import (
+    BattleEvent,
+    GameEvent,
+    on_battle_ended,
+    on_champion_victory,
+    on_new_game,
+)
 
 ###############################################################################
 # Constants
@@ -28,8 +38,18 @@ DEFAULTS: Final[Mapping[str, Any]] = {
     'host': 'localhost',
     'port': 16834,
     'timeout': 3.0,
+    'resync_interval': 5.0,
 }
 
+RESYNC_INTERVAL: Final[float] = 5.0  # seconds
+DRIFT_WARNING: Final[float] = 0.05  # seconds
+
+# replies to `getcurrenttimerphase`
+PHASE_NOT_RUNNING: Final[str] = 'NotRunning'
+PHASE_RUNNING: Final[str] = 'Running'
+PHASE_ENDED: Final[str] = 'Ended'
+PHASE_PAUSED: Final[str] = 'Paused'
+
 ###############################################################################
 # Interface
 ###############################################################################
@@ -51,12 +71,14 @@ class LiveSplitInterface:
         host = settings['host']
         port = settings['port']
         timeout = settings['timeout']
-        socket = TcpConnection(host, port, timeout=timeout)
+        client = LivesplitClient(host, port, timeout=timeout)
 
         logger.info('setting livesplit as the default time server')
         if isinstance(self.game.clock, LivesplitClock):
-            self.game.clock._socket.disconnect()
-        self.game.clock = LivesplitClock(socket)
+            self.game.clock.stop_sync()
+            self.game.clock.client.stop()
+        resync_interval = settings.get('resync_interval', RESYNC_INTERVAL)
+        self.game.clock = LivesplitClock(client, resync_interval=resync_interval)
 
         on_new_game.watch(self.on_new_game)
 
@@ -72,7 +94,8 @@ class LiveSplitInterface:
             raise PokeWatcherComponentError(f'found unexpected custom clock: {name}')
 
         logger.info('connect to livesplit')
-        self.game.clock._socket.connect()
+        self.game.clock.client.start()
+        self.game.clock.start_sync()
 
     def update(self, delta):
         # logger.debug('update')
@@ -80,21 +103,21 @@ class LiveSplitInterface:
 
     def cleanup(self):
         logger.info('cleaning up')
+        self.game.clock.stop_sync()
         logger.info('disconnect from livesplit')
-        self.game.clock._socket.disconnect()
+        self.game.clock.client.stop()
 
-    def on_new_game(self):
+    def on_new_game(self, _event: GameEvent):
         logger.info('new game: start timer')
         self.game.clock.request_start()
 
-    def on_champion_victory(self):
+    def on_champion_victory(self, _event: BattleEvent):
         logger.info('champion victory: pause timer')
         self.game.clock.request_pause()
 
-    def on_red_victory(self):
-        battle = self.game.data.battle
-        if not battle.is_vs_wild:
-            if battle.trainer.trainer_class == 'RED':
+    def on_red_victory(self, event: BattleEvent):
+        if not event.is_vs_wild:
+            if event.trainer_class == 'RED':
                 logger.info('Red victory: pause timer')
                 self.game.clock.request_pause()
 
@@ -103,74 +126,177 @@ class LiveSplitInterface:
         return 'crystal' in version or 'gold' in version or 'silver' in version
 
 
+@define
+class ClockSyncStats:
+    syncs: int = 0
+    failures: int = 0
+    last_drift: float = 0.0  # seconds, LiveSplit minus local estimate
+    max_drift: float = 0.0  # seconds, absolute
+    last_rtt: float = 0.0  # seconds
+    max_rtt: float = 0.0  # seconds
+
+    def __str__(self) -> str:
+        return (
+            f'{self.syncs} syncs, {self.failures} failures,'
+            f' last drift {self.last_drift * 1000.0:.3f} ms,'
+            f' max drift {self.max_drift * 1000.0:.3f} ms,'
+            f' last rtt {self.last_rtt * 1000.0:.3f} ms,'
+            f' max rtt {self.max_rtt * 1000.0:.3f} ms'
+        )
+
+
 @define
 class LivesplitClock:
-    _socket: TcpConnection
+    """Game clock that follows the LiveSplit timer.
+
+    LiveSplit is queried periodically from a background thread. Between
+    syncs, the current time is interpolated locally from `time.monotonic`,
+    so reading the clock never waits on the network.
+    """
+
+    client: LivesplitClient
     time_start: TimeRecord = field(factory=TimeRecord)
+    resync_interval: float = RESYNC_INTERVAL
+    stats: ClockSyncStats = field(init=False, factory=ClockSyncStats)
+    # (LiveSplit time, monotonic time, timer phase) at the last sync,
+    # replaced as a whole so that readers on other threads see a consistent sample
+    _sample: Optional[Tuple[float, float, str]] = field(init=False, default=None, repr=False)
+    _stop: Event = field(init=False, factory=Event, eq=False, repr=False)
+    _worker: Optional[Thread] = field(init=False, default=None, eq=False, repr=False)
+
+    def start_sync(self):
+        if self._worker is None:
+            self._stop.clear()
+            self._worker = Thread(target=self._run_sync, name='livesplit-sync', daemon=True)
+            self._worker.start()
+
+    def stop_sync(self):
+        if self._worker is not None:
+            self._stop.set()
+            self._worker.join(timeout=self.resync_interval + self.client.timeout)
+            self._worker = None
+            logger.info(f'clock sync: {self.stats}')
 
     def reset_start_time(self):
-        if self._socket.is_connected:
-            try:
-                self.request_reset()
-            except ConnectionError as e:
-                logger.error(f'unable to reset start time: {e}')
+        self.request_reset()
 
     def get_current_time(self) -> TimeRecord:
-        if self._socket.is_connected:
-            try:
-                return self.request_current_time()
-            except ConnectionError as e:
-                logger.error(f'unable to get current time: {e}')
-        return TimeRecord()
+        if self._sample is None:
+            return TimeRecord()
+        return TimeRecord.from_float_seconds(self.estimate(time.monotonic()))
 
     def get_elapsed_time(self) -> TimeInterval:
-        if self._socket.is_connected:
-            try:
-                now = self.request_current_time()
-                return TimeInterval(start=self.time_start, end=now)
-            except ConnectionError as e:
-                logger.error(f'unable to get current time: {e}')
-        return TimeInterval()
+        if self._sample is None:
+            return TimeInterval()
+        return TimeInterval(start=self.time_start, end=self.get_current_time())
+
+    def estimate(self, now: float) -> float:
+        # seconds on the LiveSplit timer at monotonic time `now`
+        sample = self._sample
+        if sample is None:
+            return 0.0
+        value, synced_at, phase = sample
+        return value + (now - synced_at) if phase == PHASE_RUNNING else value
+
+    @property
+    def phase(self) -> Optional[str]:
+        sample = self._sample
+        return None if sample is None else sample[2]
+
+    def sync(self) -> bool:
+        if not self.client.is_connected:
+            return False
+        try:
+            t0 = time.monotonic()
+            # pipelined, both replies arrive within the same round trip
+            phase = self.client.request('getcurrenttimerphase')
+            value = self.request_current_time().to_float_seconds()
+            t1 = time.monotonic()
+            phase = phase.result(timeout=self.client.timeout).strip()
+        except (ConnectionError, FutureTimeoutError) as e:
+            self.stats.failures += 1
+            logger.error(f'unable to get current time: {e}')
+            return False
+        self._update(value, phase, t0, t1)
+        return True
 
     def request_reset(self):
         logger.debug('request reset timer')
-        self._socket.send(b'reset\r\n')
+        self.client.send('reset')
         # no reply
+        self._set_local(0.0, PHASE_NOT_RUNNING)
 
     def request_start(self):
         logger.debug('request start timer')
-        self._socket.send(b'starttimer\r\n')
-        # no reply
+        self.client.send('starttimer')
+        # no reply; LiveSplit ignores the command unless the timer is stopped
+        if self.phase in (None, PHASE_NOT_RUNNING):
+            self._set_local(0.0, PHASE_RUNNING)
 
     def request_pause(self):
         logger.debug('request pause timer')
-        self._socket.send(b'pause\r\n')
-        # no reply
+        self.client.send('pause')
+        # no reply; LiveSplit ignores the command unless the timer is running
+        if self.phase == PHASE_RUNNING:
+            self._set_local(self.estimate(time.monotonic()), PHASE_PAUSED)
 
     def request_current_time(self) -> TimeRecord:
+        # blocks until the reply arrives, do not call from the event thread
         logger.debug('request get current time')
-        self._socket.send(b'getcurrenttime\r\n')
-        reply = self._socket.receive(bytes=1024, encoding='utf-8')
-        time_string = reply.strip()
-        if '.' not in time_string:
-            time_string = time_string + '.0'
-        if ':' not in time_string:
-            time_string = f'0:0:{time_string}'
-        elif time_string.count(':') < 2:
-            time_string = f'0:{time_string}'
-
-        parts = time_string.rsplit('.', maxsplit=1)
-        try:
-            ms = int(parts[1])
-            parts = parts[0].rsplit(':', maxsplit=2)
-            h = int(parts[0])
-            m = int(parts[1])
-            s = int(parts[2])
-            return TimeRecord(hours=h, minutes=m, seconds=s, millis=ms)
-        except (IndexError, ValueError) as e:
-            logger.error(f'getcurrenttime: unexpected reply: {reply}')
-            logger.error(str(e))
-            return TimeRecord()
+        reply = self.client.request('getcurrenttime').result(timeout=self.client.timeout)
+        return parse_time(reply)
+
+    def _update(self, value: float, phase: str, t0: float, t1: float):
+        stats = self.stats
+        rtt = t1 - t0
+        t = t0 + rtt / 2.0  # assume the reply was produced halfway through
+        sample = self._sample
+        if sample is not None:
+            drift = value - self.estimate(t)
+            stats.last_drift = drift
+            if abs(drift) > stats.max_drift:
+                stats.max_drift = abs(drift)
+            if abs(drift) > DRIFT_WARNING:
+                logger.warning(f'clock drift: {drift * 1000.0:.3f} ms')
+        self._sample = (value, t, phase)
+        stats.syncs += 1
+        stats.last_rtt = rtt
+        if rtt > stats.max_rtt:
+            stats.max_rtt = rtt
+
+    def _set_local(self, value: float, phase: str):
+        # apply the expected effect of a command until the next sync
+        self._sample = (value, time.monotonic(), phase)
+
+    def _run_sync(self):
+        while not self._stop.is_set():
+            self.sync()
+            self._stop.wait(self.resync_interval)
+
+
+def parse_time(reply: str) -> TimeRecord:
+    # LiveSplit formats times as `[[h:]m:]s[.fraction]`
+    time_string = reply.strip()
+    if '.' not in time_string:
+        time_string = time_string + '.0'
+    if ':' not in time_string:
+        time_string = f'0:0:{time_string}'
+    elif time_string.count(':') < 2:
+        time_string = f'0:{time_string}'
+
+    parts = time_string.rsplit('.', maxsplit=1)
+    try:
+        # the fraction may have fewer than 3 digits, e.g., `.45`
+        ms = int(parts[1][:3].ljust(3, '0'))
+        parts = parts[0].rsplit(':', maxsplit=2)
+        h = int(parts[0])
+        m = int(parts[1])
+        s = int(parts[2])
+        return TimeRecord(hours=h, minutes=m, seconds=s, millis=ms)
+    except (IndexError, ValueError) as e:
+        logger.error(f'getcurrenttime: unexpected reply: {reply}')
+        logger.error(str(e))
+        return TimeRecord()
 
 
 def new(game: GameInterface) -> LiveSplitInterface:
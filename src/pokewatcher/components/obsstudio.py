@@ -13,7 +13,7 @@ from attrs import define, field
 from simpleobsws import Request, WebSocketClient
 
 from pokewatcher.core.game import GameInterface
-from pokewatcher.events import on_new_game
+from pokewatcher.events import DELIVERY_THREAD, GameEvent, on_new_game
 
 ###############################################################################
 # Constants
@@ -45,7 +45,8 @@ class ObsStudioInterface:
         self.ws.url = f'ws://{host}:{port}'
         self.ws.password = settings['password']
 
-        on_new_game.watch(self.on_new_game)
+        # talking to OBS blocks until it replies
+        on_new_game.watch(self.on_new_game, mode=DELIVERY_THREAD)
 
     def start(self):
         logger.info('starting')
@@ -59,7 +60,7 @@ class ObsStudioInterface:
         logger.info('cleaning up')
         self.ws.loop.run_until_complete(self.disconnect())
 
-    def on_new_game(self):
+    def on_new_game(self, _event: GameEvent):
         logger.info('new game: start OBS recording')
         self.ws.loop.run_until_complete(self.start_record())
 
@@ -9,14 +9,21 @@ from typing import Any, Final, Mapping, Optional
 
 import logging
 from pathlib import Path
+from queue import Empty, Queue
 import shutil
-import time
+from threading import Event, Thread
 
 from attrs import define, field
 
+from pokewatcher.core.backups import COMPRESSION_ZLIB, BackupStore
+from pokewatcher.core.filewatch import (
+    WATCHER_AUTO,
+    FileWatcher,
+    get_mtime,
+    new_file_watcher,
+)
 from pokewatcher.core.game import GameInterface
-from pokewatcher.core.util import SleepLoop
-from pokewatcher.events import on_save_game
+from pokewatcher.events import GameEvent, on_save_backup, on_save_game
 
 ###############################################################################
 # Constants
@@ -29,6 +36,8 @@ FILE_CHECK_INTERVAL: Final[float] = 3.0  # seconds
 MIN_BACKUP_INTERVAL: Final[float] = 1.0  # seconds
 FILE_NAME_FORMAT: Final[str] = '{rom}-{realtime}-{location}.srm'
 SAVE_DIR: Final[str] = 'saves'
+STORE_DIR: Final[str] = '.store'
+WORKER_JOIN_TIMEOUT: Final[float] = 5.0  # seconds
 
 DEFAULTS: Final[Mapping[str, Any]] = {
     'enabled': True,
@@ -38,8 +47,24 @@ DEFAULTS: Final[Mapping[str, Any]] = {
     'file_name_format': '{rom} - {realtime}.srm',
     'dest_dir': '.',
     'create_dir': True,
+    'watcher': 'auto',
+    'deduplicate': False,
+    'compression': 'zlib',
 }
 
+###############################################################################
+# Helper Classes
+###############################################################################
+
+
+@define
+class BackupJob:
+    save_file: Path
+    data: Mapping[str, Any]
+    last_modified: float = 0.0
+    dirty: bool = False
+
+
 ###############################################################################
 # Interface
 ###############################################################################
@@ -48,16 +73,17 @@ DEFAULTS: Final[Mapping[str, Any]] = {
 @define
 class SaveFileBackupComponent:
     game: GameInterface
-    dirty: bool = False
-    requested: bool = False
     n_checks: int = N_CHECKS
     check_interval: float = FILE_CHECK_INTERVAL
     min_backup_interval: float = MIN_BACKUP_INTERVAL
     file_name_format: str = FILE_NAME_FORMAT
     dest_dir: Path = field(factory=Path.cwd)
     _timestamp: float = field(init=False, default=0.0, eq=False, repr=False)
-    _data: Mapping[str, Any] = field(init=False, factory=dict, eq=False, repr=False)
-    _last_modified: float = 0.0
+    _jobs: Queue = field(init=False, factory=Queue, eq=False, repr=False)
+    _stop: Event = field(init=False, factory=Event, eq=False, repr=False)
+    _worker: Optional[Thread] = field(init=False, default=None, eq=False, repr=False)
+    _watcher: Optional[FileWatcher] = field(init=False, default=None, eq=False, repr=False)
+    store: Optional[BackupStore] = field(init=False, default=None, eq=False, repr=False)
 
     def setup(self, settings: Mapping[str, Any]):
         logger.info('setting up')
@@ -65,35 +91,51 @@ class SaveFileBackupComponent:
         self.check_interval = settings.get('check_interval', FILE_CHECK_INTERVAL)
         self.min_backup_interval = settings.get('min_backup_interval', MIN_BACKUP_INTERVAL)
         self.file_name_format = settings.get('file_name_format', FILE_NAME_FORMAT)
-        self.dest_dir = Path(settings.get('dest_dir', '.')).resolve(strict=True)
-        if self.dest_dir.name != SAVE_DIR:
-            self.dest_dir = self.dest_dir / SAVE_DIR
-        if settings.get('create_dir', False):
-            self.dest_dir = self.dest_dir / (self.game.rom or 'rom')
-        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        self.dest_dir = save_dir(settings)
+        if settings.get('deduplicate', False):
+            self.store = open_store(settings)
+            logger.info(f'storing save file backups in {self.store.root}')
+            if settings.get('create_dir', False):
+                logger.info('create_dir is ignored: every ROM shares the backup store')
+        else:
+            if settings.get('create_dir', False):
+                self.dest_dir = self.dest_dir / (self.game.rom or 'rom')
+            self.dest_dir.mkdir(parents=True, exist_ok=True)
+        self._watcher = new_file_watcher(
+            settings.get('watcher', WATCHER_AUTO), poll_interval=self.check_interval
+        )
+        logger.info(f'detecting save file changes with {type(self._watcher).__name__}')
         on_save_game.watch(self.on_save_game)
 
     def start(self):
         logger.info('starting')
-        return
+        if self._worker is None:
+            self._stop.clear()
+            self._worker = Thread(target=self._run_worker, name='save-backup', daemon=True)
+            self._worker.start()
 
     def update(self, delta):
         # logger.debug('update')
-        if self.requested:
-            with SleepLoop(n=self.n_checks, delay=self.check_interval) as loop:
-                while loop.iterate() and not self.dirty:
-                    self.look_for_changes()
-            self.do_backup()
+        # backups run in the background worker
         return
 
     def cleanup(self):
         logger.info('cleaning up')
-        return
-
-    def on_save_game(self):
+        if self._worker is not None:
+            self._stop.set()
+            if self._watcher is not None:
+                self._watcher.wake()
+            self._jobs.put(None)
+            self._worker.join(timeout=WORKER_JOIN_TIMEOUT)
+            self._worker = None
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+    def on_save_game(self, event: GameEvent):
         logger.info('player saved the game')
         # not thread-safe but should be ok, since many fields are static
-        t = time.time()
+        t = event.timestamp
         if (t - self._timestamp) < self.min_backup_interval:
             logger.info('skipping save file backup request: too recent')
             return  # discard too many requests in a short period
@@ -104,9 +146,9 @@ class SaveFileBackupComponent:
             return
 
         data = self.game.data_dict()
-
+        data['time'] = event.game_time
         data['location'] = (
-            data['location'].replace(' ', '').replace('-', '').replace('/', '').replace("'", '')
+            event.location.replace(' ', '').replace('-', '').replace('/', '').replace("'", '')
         )
 
         time_string = '00000'
@@ -116,50 +158,74 @@ class SaveFileBackupComponent:
             time_string = time_string.replace(':', '').replace('.', '').rstrip()
             data['realtime'] = time_string
 
-        try:
-            self._last_modified = save_file.stat().st_mtime
-        except FileNotFoundError:
-            self._last_modified = 0
+        last_modified = get_mtime(save_file)
 
         logger.info('requesting save file backup')
         logger.debug(f'game data: {data}')
-        self._data = data
         self._timestamp = t
-        self.requested = True
-
-    def look_for_changes(self):
-        save_file = self.save_file
-        if save_file is None:
-            logger.warning('unable to get save file path')
-            return
-
-        try:
-            stamp = save_file.stat().st_mtime
-        except FileNotFoundError:
-            stamp = 0
-        if stamp > self._last_modified:
-            self._last_modified = stamp
-            self.dirty = True
-
-    def do_backup(self):
-        save_file = self.save_file
-        if save_file is None:
-            logger.warning('unable to get save file path')
-            return
-
-        if self.dirty:
+        self._jobs.put(BackupJob(save_file, data, last_modified=last_modified))
+
+    def wait_for_changes(self, job: BackupJob):
+        # same time budget as checking `n_checks` times, `check_interval` apart
+        timeout = max(0, self.n_checks - 1) * self.check_interval
+        if self._watcher.wait_for_write(job.save_file, job.last_modified, timeout):
+            job.last_modified = get_mtime(job.save_file)
+            job.dirty = True
+
+    def do_backup(self, job: BackupJob) -> str:
+        # returns the backup name, i.e., a file in `dest_dir` or an entry in the store
+        if job.dirty:
             logger.info('detected changes to save file')
         else:
             logger.info('no changes to save file')
 
-        self.dirty = False
-        self.requested = False
-
         logger.info('create save file backup')
-        filename = self.file_name_format.format(**self._data)
+        filename = self.file_name_format.format(**job.data)
+        if self.store is not None:
+            entry = self.store.add(job.save_file, filename)
+            logger.info(f'save file backup complete: {entry.digest}')
+            return entry.name
         dest_file = self.dest_dir / filename
-        shutil.copy(save_file, dest_file)
+        shutil.copy(job.save_file, dest_file)
         logger.info('save file backup complete')
+        return filename
+
+    def _run_worker(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            self._process(self._latest_job(job))
+
+    def _latest_job(self, job: BackupJob) -> BackupJob:
+        # coalesce saves in quick succession into a single backup
+        while True:
+            try:
+                newer = self._jobs.get_nowait()
+            except Empty:
+                return job
+            if newer is None:
+                # finish this job before stopping
+                self._jobs.put(None)
+                return job
+            logger.info('coalescing save file backup requests')
+            job = newer
+
+    def _process(self, job: BackupJob):
+        if not self._stop.is_set():
+            try:
+                self.wait_for_changes(job)
+            except OSError as e:
+                logger.warning(f'unable to watch save file: {e}')
+        if self._stop.is_set() and not job.dirty:
+            # the pending backup is not dropped, but it may miss the latest save
+            logger.warning('shutting down: backing up the save file without waiting for changes')
+        try:
+            name = self.do_backup(job)
+        except OSError as e:
+            logger.error(f'save file backup failed: {e}')
+            return
+        on_save_backup.emit(name)
 
     @property
     def save_file(self) -> Optional[Path]:
@@ -172,6 +238,18 @@ class SaveFileBackupComponent:
         return d / f'{rom}.srm'
 
 
+def save_dir(settings: Mapping[str, Any]) -> Path:
+    path = Path(settings.get('dest_dir', '.')).resolve(strict=True)
+    if path.name != SAVE_DIR:
+        path = path / SAVE_DIR
+    return path
+
+
+def open_store(settings: Mapping[str, Any]) -> BackupStore:
+    compression = settings.get('compression', COMPRESSION_ZLIB)
+    return BackupStore(save_dir(settings) / STORE_DIR, compression=compression).load()
+
+
 def new(game: GameInterface) -> SaveFileBackupComponent:
     instance = SaveFileBackupComponent(game)
     return instance
@@ -22,7 +22,13 @@ import websockets
 from pokewatcher.core.game import GameInterface
 from pokewatcher.core.util import Attribute, TimeInterval, TimeRecord
 from pokewatcher.data.structs import BadgeData, GameData, GameTime, TrainerParty
-from pokewatcher.events import on_battle_ended, on_battle_started, on_reset
+from pokewatcher.events import (
+    BattleEvent,
+    GameEvent,
+    on_battle_ended,
+    on_battle_started,
+    on_reset,
+)
 
 ###############################################################################
 # Constants
@@ -273,12 +279,12 @@ class TrackedBattle:
         return f'{self.trainer_class}/{self.trainer_id}'
 
     @classmethod
-    def from_data(cls, data: GameData, name: str, t: TimeRecord) -> 'TrackedBattle':
-        tc = data.battle.trainer.trainer_class
-        tid = data.battle.trainer.number
+    def from_event(
+        cls, event: BattleEvent, data: GameData, name: str, t: TimeRecord
+    ) -> 'TrackedBattle':
         prev = PreviousData.from_data(data)
         rt = TimeInterval(start=t)
-        return cls(tc, tid, name, rt, prev)
+        return cls(event.trainer_class, event.trainer_number, name, rt, prev)
 
 
 @define
@@ -526,21 +532,20 @@ class SplitComponent:
             for handler in self._outputs:
                 handler.cleanup()
 
-    def on_battle_started(self):
-        battle = self.game.data.battle
-        if not battle.is_vs_wild:
-            trainer_class = battle.trainer.trainer_class
+    def on_battle_started(self, event: BattleEvent):
+        if not event.is_vs_wild:
+            trainer_class = event.trainer_class
             class_key = trainer_class.casefold()
             trainers = self.trainers[class_key]
-            trainer_id = battle.trainer.number
+            trainer_id = event.trainer_number
             name = trainers.get(trainer_id)
             if name is not None:
                 logger.info(f'track battle vs {name} ({trainer_class} {trainer_id})')
                 t = self.game.clock.get_current_time()
                 assert self._tracked is None
-                self._tracked = TrackedBattle.from_data(self.game.data, name, t)
+                self._tracked = TrackedBattle.from_event(event, self.game.data, name, t)
 
-    def on_battle_ended(self):
+    def on_battle_ended(self, event: BattleEvent):
         if self._tracked is None:
             return
         name = self._tracked.trainer_name
@@ -550,21 +555,20 @@ class SplitComponent:
         time_end = self.game.clock.get_current_time()
         self._tracked.realtime.end = time_end
         duration = time_end - time_start
-        game_time = self.game.data.time
         logger.info(f'end of tracked battle vs {name} ({trainer_class} {trainer_id})')
         logger.info(f'split time - {time_end}')
-        logger.info(f'game time  - {game_time}')
-        if self.game.data.battle.is_victory:
+        logger.info(f'game time  - {event.game_time}')
+        if event.is_victory:
             logger.info('result: victory')
             self._record_victory()
-        elif self.game.data.battle.is_defeat:
+        elif event.is_defeat:
             logger.info('result: defeat')
             self._record_failure()
         else:
             logger.info('result: draw')
         self._tracked = None
 
-    def on_reset(self):
+    def on_reset(self, _event: GameEvent):
         if self._tracked is not None:
             logger.info('failed attempt: detected game reset')
             self._record_failure()
@@ -0,0 +1,226 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Any, Dict, Final, List, Optional, Tuple
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import time
+import zlib
+
+from attrs import asdict, define, field, frozen
+from attrs.validators import in_
+
+from pokewatcher.errors import PokeWatcherError
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+###############################################################################
+# Constants
+###############################################################################
+
+logger: Final[logging.Logger] = logging.getLogger(__name__)
+
+# Store layout:
+#   root/index.json            backup name -> entry (blob hash, size, creation time)
+#   root/blobs/ab/abcdef...    unique file contents, named after their SHA-256 hash
+# Blobs are written once and never modified, so identical saves cost one index entry.
+
+INDEX_FILE: Final[str] = 'index.json'
+BLOBS_DIR: Final[str] = 'blobs'
+INDEX_VERSION: Final[int] = 1
+
+COMPRESSION_NONE: Final[str] = 'none'
+COMPRESSION_ZLIB: Final[str] = 'zlib'
+COMPRESSION_ZSTD: Final[str] = 'zstd'
+
+COMPRESSIONS: Final[Tuple[str, ...]] = (COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_ZSTD)
+
+BLOB_SUFFIXES: Final[Dict[str, str]] = {
+    COMPRESSION_NONE: '',
+    COMPRESSION_ZLIB: '.zz',
+    COMPRESSION_ZSTD: '.zst',
+}
+
+DECOMPRESSION_ERRORS: Tuple[type, ...] = (OSError, zlib.error)
+if zstandard is not None:
+    DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+class BackupStoreError(PokeWatcherError):
+    @classmethod
+    def no_backup(cls, name: str) -> 'BackupStoreError':
+        return cls(f'no backup named {name!r}')
+
+    @classmethod
+    def no_zstd(cls) -> 'BackupStoreError':
+        return cls('zstd compression requires the "zstandard" package')
+
+    @classmethod
+    def corrupted(cls, name: str, digest: str) -> 'BackupStoreError':
+        return cls(f'backup {name!r}: blob {digest} is missing or corrupted')
+
+
+@frozen
+class BackupEntry:
+    name: str
+    digest: str  # SHA-256 of the uncompressed contents
+    size: int  # bytes, uncompressed
+    created: float  # seconds since the epoch
+    compression: str = COMPRESSION_NONE
+
+
+@define
+class BackupStore:
+    """Content-addressed, deduplicated storage for save file backups.
+
+    Usage:
+
+    ```
+    store = BackupStore(Path('saves/.store'))
+    store.load()
+    entry = store.add(Path('Pokemon Yellow.srm'), 'Pokemon Yellow-0012345.srm')
+    store.export(entry.name, Path('restored.srm'))
+    ```
+    """
+
+    root: Path
+    compression: str = field(default=COMPRESSION_ZLIB, validator=in_(COMPRESSIONS))
+    entries: Dict[str, BackupEntry] = field(init=False, factory=dict, repr=False)
+    _blobs: Dict[str, BackupEntry] = field(init=False, factory=dict, repr=False)
+
+    def __attrs_post_init__(self):
+        if self.compression == COMPRESSION_ZSTD and zstandard is None:
+            raise BackupStoreError.no_zstd()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / INDEX_FILE
+
+    def load(self) -> 'BackupStore':
+        self.entries = {}
+        self._blobs = {}
+        try:
+            with self.index_path.open(mode='r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return self
+        for item in index.get('backups', []):
+            entry = BackupEntry(**item)
+            self.entries[entry.name] = entry
+            self._blobs[entry.digest] = entry
+        logger.debug(f'loaded {len(self.entries)} backup entries from {self.index_path}')
+        return self
+
+    def names(self) -> List[str]:
+        return sorted(self.entries, key=lambda name: self.entries[name].created)
+
+    def get(self, name: str) -> BackupEntry:
+        entry = self.entries.get(name)
+        if entry is None:
+            raise BackupStoreError.no_backup(name)
+        return entry
+
+    def latest(self) -> Optional[BackupEntry]:
+        if not self.entries:
+            return None
+        return max(self.entries.values(), key=lambda entry: entry.created)
+
+    def blob_path(self, entry: BackupEntry) -> Path:
+        suffix = BLOB_SUFFIXES[entry.compression]
+        return self.root / BLOBS_DIR / entry.digest[:2] / f'{entry.digest}{suffix}'
+
+    def add(self, source: Path, name: str) -> BackupEntry:
+        contents = source.read_bytes()
+        digest = hashlib.sha256(contents).hexdigest()
+        entry = self._find_blob(digest)
+        if entry is None:
+            entry = BackupEntry(name, digest, len(contents), time.time(), self.compression)
+            path = self.blob_path(entry)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, _compress(contents, entry.compression))
+            logger.debug(f'stored new blob {digest}')
+        else:
+            entry = BackupEntry(name, digest, entry.size, time.time(), entry.compression)
+            logger.debug(f'reusing blob {digest}')
+        self.entries[name] = entry
+        self._blobs[digest] = entry
+        self._save_index()
+        return entry
+
+    def read(self, name: str) -> bytes:
+        entry = self.get(name)
+        try:
+            contents = _decompress(self.blob_path(entry).read_bytes(), entry.compression)
+        except DECOMPRESSION_ERRORS as e:
+            raise BackupStoreError.corrupted(name, entry.digest) from e
+        if hashlib.sha256(contents).hexdigest() != entry.digest:
+            raise BackupStoreError.corrupted(name, entry.digest)
+        return contents
+
+    def export(self, name: str, dest: Path) -> Path:
+        """Materialise a backup as a regular file. `dest` may be a directory."""
+        if dest.is_dir():
+            dest = dest / name
+        dest.write_bytes(self.read(name))
+        return dest
+
+    def _find_blob(self, digest: str) -> Optional[BackupEntry]:
+        entry = self._blobs.get(digest)
+        if entry is not None and self.blob_path(entry).is_file():
+            return entry
+        return None
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        index: Dict[str, Any] = {
+            'version': INDEX_VERSION,
+            'backups': [asdict(self.entries[name]) for name in self.names()],
+        }
+        payload = json.dumps(index, indent=1).encode('utf-8')
+        _write_atomic(self.index_path, payload)
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def _write_atomic(path: Path, contents: bytes):
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_bytes(contents)
+    os.replace(tmp, path)
+
+
+def _compress(contents: bytes, compression: str) -> bytes:
+    if compression == COMPRESSION_ZLIB:
+        return zlib.compress(contents)
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise BackupStoreError.no_zstd()
+        return zstandard.ZstdCompressor().compress(contents)
+    return contents
+
+
+def _decompress(contents: bytes, compression: str) -> bytes:
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(contents)
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise BackupStoreError.no_zstd()
+        return zstandard.ZstdDecompressor().decompress(contents)
+    return contents
@@ -0,0 +1,210 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Any, BinaryIO, Callable, Dict, Final, Iterator, List, Optional, Sequence
+
+import logging
+from pathlib import Path
+import struct
+from threading import Lock
+import time
+
+from attrs import define, field, frozen
+
+from pokewatcher.core.util import json_dumps, json_loads
+from pokewatcher.errors import PokeWatcherError
+
+###############################################################################
+# Constants
+###############################################################################
+
+logger: Final[logging.Logger] = logging.getLogger(__name__)
+
+# File layout:
+#   MAGIC
+#   header: length-prefixed JSON object (format version, creation time, mapper meta)
+#   records: length-prefixed JSON arrays [timestamp, prop, value, bytes, changed fields]
+# Lengths are unsigned 32-bit little-endian integers.
+# Timestamps are seconds (monotonic clock) since the start of the recording.
+
+MAGIC: Final[bytes] = b'PWCAP\x00'
+FORMAT_VERSION: Final[int] = 1
+
+LENGTH: Final[struct.Struct] = struct.Struct('<I')
+
+SPEED_AFAP: Final[float] = 0.0  # as fast as possible
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+class CaptureError(PokeWatcherError):
+    @classmethod
+    def bad_magic(cls, path: Path) -> 'CaptureError':
+        return cls(f'{path} is not a property capture file')
+
+    @classmethod
+    def bad_version(cls, path: Path, version: Any) -> 'CaptureError':
+        return cls(f'{path}: unsupported capture format version {version!r}')
+
+    @classmethod
+    def truncated(cls, path: Path) -> 'CaptureError':
+        return cls(f'{path}: truncated capture record')
+
+
+@frozen
+class CaptureRecord:
+    timestamp: float
+    prop: str
+    value: Any
+    byte_values: List[int]
+    changed_fields: List[str]
+
+    @property
+    def changed_bytes(self) -> bool:
+        return 'bytes' in self.changed_fields
+
+
+@define
+class CaptureWriter:
+    path: Path
+    _file: Optional[BinaryIO] = field(init=False, default=None, repr=False)
+    _start: float = field(init=False, default=0.0, repr=False)
+    _lock: Lock = field(init=False, factory=Lock, eq=False, repr=False)
+    count: int = field(init=False, default=0)
+    dropped: int = field(init=False, default=0)  # changes received while closed
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def open(self, meta: Optional[Dict[str, Any]] = None):
+        # `write` may already be called from another thread
+        with self._lock:
+            if self._file is None:
+                logger.info(f'recording property changes to {self.path}')
+                f = self.path.open(mode='wb')
+                f.write(MAGIC)
+                header = {'version': FORMAT_VERSION, 'created': time.time(), 'meta': meta or {}}
+                self._write_chunk(f, header)
+                self._start = time.monotonic()
+                self.count = 0
+                self.dropped = 0
+                self._file = f
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                logger.info(f'recorded {self.count} property changes to {self.path}')
+                self._file.close()
+                self._file = None
+
+    def write(self, args: Sequence[Any]):
+        # args as received from the GameHook `PropertyChanged` message
+        prop, _address, value, byte_values, _frozen, changed_fields = args
+        with self._lock:
+            if self._file is None:
+                self.dropped += 1
+                if self.dropped == 1:
+                    logger.warning(f'{self.path}: not recording, dropping property changes')
+                return
+            t = time.monotonic() - self._start
+            self._write_chunk(self._file, [t, prop, value, byte_values, changed_fields])
+            self.count += 1
+
+    @staticmethod
+    def _write_chunk(f: BinaryIO, obj: Any):
+        payload = json_dumps(obj)
+        f.write(LENGTH.pack(len(payload)))
+        f.write(payload)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+@define
+class CaptureReader:
+    path: Path
+    meta: Dict[str, Any] = field(init=False, factory=dict)
+    created: float = field(init=False, default=0.0)
+
+    @property
+    def game_name(self) -> str:
+        return self.meta.get('gameName', '')
+
+    def __iter__(self) -> Iterator[CaptureRecord]:
+        with self.path.open(mode='rb') as f:
+            self._read_header(f)
+            while True:
+                obj = self._read_chunk(f)
+                if obj is None:
+                    return
+                t, prop, value, byte_values, changed_fields = obj
+                yield CaptureRecord(t, prop, value, byte_values, changed_fields)
+
+    def read_header(self) -> Dict[str, Any]:
+        with self.path.open(mode='rb') as f:
+            return self._read_header(f)
+
+    def records(self) -> List[CaptureRecord]:
+        return list(self)
+
+    def _read_header(self, f: BinaryIO) -> Dict[str, Any]:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise CaptureError.bad_magic(self.path)
+        header = self._read_chunk(f)
+        if header is None:
+            raise CaptureError.truncated(self.path)
+        version = header.get('version')
+        if version != FORMAT_VERSION:
+            raise CaptureError.bad_version(self.path, version)
+        self.meta = header.get('meta', {})
+        self.created = header.get('created', 0.0)
+        return header
+
+    def _read_chunk(self, f: BinaryIO) -> Any:
+        prefix = f.read(LENGTH.size)
+        if not prefix:
+            return None
+        if len(prefix) < LENGTH.size:
+            raise CaptureError.truncated(self.path)
+        (n,) = LENGTH.unpack(prefix)
+        payload = f.read(n)
+        if len(payload) < n:
+            raise CaptureError.truncated(self.path)
+        return json_loads(payload)
+
+
+def replay(
+    records: Iterator[CaptureRecord],
+    on_change: Callable,
+    speed: float = 1.0,
+    sleep: Callable = time.sleep,
+) -> int:
+    """Feed recorded property changes to `on_change(prop, value, byte_values)`.
+
+    Use `speed=1.0` to replay at the original pace, `speed=N` to replay N
+    times faster, and `speed <= 0` to replay as fast as possible.
+    Like `GameHookBridge`, only changes to the property bytes are delivered.
+    Returns the number of delivered changes.
+    """
+    n = 0
+    start = time.monotonic()
+    for record in records:
+        if speed > 0.0:
+            delay = record.timestamp / speed - (time.monotonic() - start)
+            if delay > 0.0:
+                sleep(delay)
+        if record.changed_bytes:
+            on_change(record.prop, record.value, record.byte_values)
+            n += 1
+    return n
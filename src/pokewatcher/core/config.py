@@ -111,16 +111,25 @@ class DictParam(Param):
 
 SCHEMA: Final[Dict[str, Param]] = {
     'options': {
-        'loop_frequency': Param.with_default(50.0),
+        'loop_frequency': Param.with_default(10.0),
+        'update_rates': DictParam.optional(float, int),
     },
     'retroarch': {
         'host': Param.with_default('127.0.0.1'),
         'port': Param.with_default(55355),
         'timeout': Param.with_default(3.0),
+        'memory_polling': Param.with_default(False),
+        'poll_rate': Param.with_default(30.0),
     },
     'gamehook': {
         'host': Param.with_default('localhost'),
         'port': Param.with_default(8085),
+        'queue_size': Param.with_default(1024),
+        'overflow': Param.with_default('drop-oldest'),
+        'block_timeout': Param.with_default(1.0),
+        'threaded': Param.with_default(False),
+        'record': Param.optional(str),
+        'mapper_cache': Param.with_default('.mapper_cache'),
     },
     'auto_save': {
         'enabled': Param.with_default(False),
@@ -133,6 +142,9 @@ SCHEMA: Final[Dict[str, Param]] = {
         'min_backup_interval': Param.with_default(1.0),
         'file_name_format': Param.with_default('{rom}-{realtime}.srm'),
         'dest_dir': Param.with_default('.'),
+        'watcher': Param.with_default('auto'),
+        'deduplicate': Param.with_default(False),
+        'compression': Param.with_default('zlib'),
     },
     'splitter': {
         'enabled': Param.with_default(True),
@@ -151,6 +163,7 @@ SCHEMA: Final[Dict[str, Param]] = {
         'host': Param.with_default('localhost'),
         'port': Param.with_default(16834),
         'timeout': Param.with_default(3.0),
+        'resync_interval': Param.with_default(5.0),
     },
     'obsstudio': {
         'enabled': Param.with_default(False),
@@ -161,7 +174,13 @@ SCHEMA: Final[Dict[str, Param]] = {
 }
 
 DEFAULTS: Final[Dict[str, Any]] = {
-    'options': {'loop_frequency': 50.0},
+    'options': {
+        'loop_frequency': 10.0,
+        'update_rates': {
+            'splitter': 10.0,
+            'save_backup': 1.0,
+        },
+    },
     'retroarch': {
         'host': '127.0.0.1',
         'port': 55355,
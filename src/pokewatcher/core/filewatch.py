@@ -0,0 +1,245 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Final, Iterator, Optional, Tuple, Union
+
+import ctypes
+import ctypes.util
+import logging
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+from threading import Event
+import time
+
+from attrs import define, field
+
+from pokewatcher.errors import PokeWatcherError
+
+###############################################################################
+# Constants
+###############################################################################
+
+logger: Final[logging.Logger] = logging.getLogger(__name__)
+
+WATCHER_AUTO: Final[str] = 'auto'
+WATCHER_INOTIFY: Final[str] = 'inotify'
+WATCHER_POLL: Final[str] = 'poll'
+
+WATCHERS: Final[Tuple[str, ...]] = (WATCHER_AUTO, WATCHER_INOTIFY, WATCHER_POLL)
+
+DEFAULT_POLL_INTERVAL: Final[float] = 3.0  # seconds
+
+# see `man 7 inotify`
+IN_CLOSE_WRITE: Final[int] = 0x00000008
+IN_MOVED_TO: Final[int] = 0x00000080
+IN_Q_OVERFLOW: Final[int] = 0x00004000
+IN_NONBLOCK: Final[int] = os.O_NONBLOCK
+IN_CLOEXEC: Final[int] = getattr(os, 'O_CLOEXEC', 0)
+
+WATCH_MASK: Final[int] = IN_CLOSE_WRITE | IN_MOVED_TO
+
+# struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[]; }
+INOTIFY_EVENT: Final[struct.Struct] = struct.Struct('iIII')
+READ_SIZE: Final[int] = 64 * (INOTIFY_EVENT.size + 256)
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+class FileWatcherError(PokeWatcherError):
+    @classmethod
+    def unsupported(cls, reason: str) -> 'FileWatcherError':
+        return cls(f'inotify is not available: {reason}')
+
+    @classmethod
+    def bad_watcher(cls, name: str) -> 'FileWatcherError':
+        return cls(f'unknown file watcher {name!r}, expected one of {WATCHERS}')
+
+
+def get_mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+@define
+class PollingWatcher:
+    """Detects file writes by polling the modification time of the file."""
+
+    interval: float = DEFAULT_POLL_INTERVAL
+    _wakeup: Event = field(init=False, factory=Event, eq=False, repr=False)
+
+    def wait_for_write(self, path: Path, since: float, timeout: float) -> bool:
+        """Block until `path` is modified after `since` (a file mtime).
+
+        Returns `False` if `timeout` seconds pass or `wake` is called first.
+        """
+        self._wakeup.clear()
+        deadline = time.monotonic() + timeout
+        while True:
+            if get_mtime(path) > since:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                return False
+            if self._wakeup.wait(min(self.interval, remaining)):
+                return False
+
+    def wake(self):
+        # thread-safe
+        self._wakeup.set()
+
+    def close(self):
+        self._wakeup.set()
+
+
+@define
+class InotifyWatcher:
+    """Detects file writes with Linux inotify events, without polling.
+
+    The parent directory of the file is watched for `IN_CLOSE_WRITE`
+    (the file was written and closed) and `IN_MOVED_TO` (the file was
+    atomically replaced). Events for other files are ignored.
+    """
+
+    _fd: int = field(init=False, default=-1, repr=False)
+    _wd: int = field(init=False, default=-1, repr=False)
+    _directory: Optional[Path] = field(init=False, default=None)
+    _wake_r: int = field(init=False, default=-1, repr=False)
+    _wake_w: int = field(init=False, default=-1, repr=False)
+    _libc: Optional[ctypes.CDLL] = field(init=False, default=None, eq=False, repr=False)
+
+    def __attrs_post_init__(self):
+        if not sys.platform.startswith('linux'):
+            raise FileWatcherError.unsupported(f'platform is {sys.platform}')
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            init = libc.inotify_init1
+        except (OSError, AttributeError) as e:
+            raise FileWatcherError.unsupported(str(e))
+        fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise FileWatcherError.unsupported(os.strerror(ctypes.get_errno()))
+        self._libc = libc
+        self._fd = fd
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+
+    def wait_for_write(self, path: Path, since: float, timeout: float) -> bool:
+        """Block until `path` is written after `since` (a file mtime).
+
+        Returns `False` if `timeout` seconds pass or `wake` is called first.
+        """
+        self._watch(path.parent)
+        self._discard_events()
+        self._discard_wakeups()
+        # the file may have been written before the watch was in place
+        if get_mtime(path) > since:
+            return True
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                return False
+            ready, _, _ = select.select([self._fd, self._wake_r], [], [], remaining)
+            if self._wake_r in ready:
+                return False
+            for mask, name in self._read_events():
+                if mask & IN_Q_OVERFLOW:
+                    logger.warning('inotify event queue overflow')
+                    if get_mtime(path) > since:
+                        return True
+                elif name == path.name:
+                    return True
+
+    def wake(self):
+        # thread-safe
+        if self._wake_w >= 0:
+            try:
+                os.write(self._wake_w, b'\x00')
+            except BlockingIOError:
+                pass  # already woken up
+
+    def close(self):
+        self.wake()
+        if self._fd >= 0:
+            os.close(self._fd)  # also removes the watch
+            self._fd = -1
+            self._wd = -1
+            self._directory = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd >= 0:
+                os.close(fd)
+        self._wake_r = -1
+        self._wake_w = -1
+
+    def _watch(self, directory: Path):
+        if directory == self._directory:
+            return
+        if self._wd >= 0:
+            self._libc.inotify_rm_watch(self._fd, self._wd)
+            self._wd = -1
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(directory))
+        logger.debug(f'watching {directory}')
+        self._wd = wd
+        self._directory = directory
+
+    def _read_events(self) -> Iterator[Tuple[int, str]]:
+        try:
+            buffer = os.read(self._fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        i = 0
+        n = len(buffer)
+        while i + INOTIFY_EVENT.size <= n:
+            _wd, mask, _cookie, length = INOTIFY_EVENT.unpack_from(buffer, i)
+            i += INOTIFY_EVENT.size
+            name = buffer[i : i + length].rstrip(b'\x00')
+            i += length
+            yield mask, os.fsdecode(name)
+
+    def _discard_events(self):
+        while True:
+            try:
+                if not os.read(self._fd, READ_SIZE):
+                    return
+            except BlockingIOError:
+                return
+
+    def _discard_wakeups(self):
+        try:
+            while os.read(self._wake_r, 64):
+                pass
+        except BlockingIOError:
+            pass
+
+
+FileWatcher = Union[InotifyWatcher, PollingWatcher]
+
+
+def new_file_watcher(
+    name: str = WATCHER_AUTO, poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> FileWatcher:
+    if name not in WATCHERS:
+        raise FileWatcherError.bad_watcher(name)
+    if name != WATCHER_POLL:
+        try:
+            return InotifyWatcher()
+        except FileWatcherError as e:
+            if name == WATCHER_INOTIFY:
+                raise
+            logger.info(f'{e}; polling for file changes instead')
+    return PollingWatcher(interval=poll_interval)
@@ -7,18 +7,23 @@
 
 from typing import Any, Final, Mapping, Optional
 
+import concurrent.futures
 import logging
 from pathlib import Path
+import struct
+import time
 
 from attrs import define, field
 import yaml
 
 from pokewatcher.core.gamehook import GameHookBridge, GameHookError
-from pokewatcher.core.retroarch import RetroArchBridge
+from pokewatcher.core.memory import AddressMap, MemoryPoller
+from pokewatcher.core.retroarch import RetroArchBridge, RetroArchError
 from pokewatcher.core.util import SimpleClock
 from pokewatcher.data.crystal.gamehook import load_data_handler as load_gen2_data_handler
 from pokewatcher.data.emerald.gamehook import load_data_handler as load_gen3_data_handler
 from pokewatcher.data.firered.gamehook import load_data_handler as load_gen3_remakes_data_handler
+from pokewatcher.data.gamehook import DataHandler
 from pokewatcher.data.structs import GameData
 from pokewatcher.data.yellow.gamehook import load_data_handler as load_gen1_data_handler
 from pokewatcher.logic.crystal.fsm import Initial as InitialCrystalState
@@ -33,6 +38,19 @@ from pokewatcher.logic.yellow.fsm import Initial as InitialYellowState
 
 logger: Final[logging.Logger] = logging.getLogger(__name__)
 
+POLL_BACKOFF_MIN: Final[float] = 0.5  # seconds
+POLL_BACKOFF_MAX: Final[float] = 30.0  # seconds
+POLL_BACKOFF_FACTOR: Final[float] = 2.0
+
+# a failed memory poll, e.g., RetroArch is not running or sent a malformed reply
+POLL_ERRORS: Final = (
+    RetroArchError,
+    ConnectionError,
+    concurrent.futures.TimeoutError,
+    struct.error,
+    ValueError,
+)
+
 ###############################################################################
 # Interface
 ###############################################################################
@@ -45,6 +63,10 @@ class GameInterface:
     retroarch: RetroArchBridge = field(factory=RetroArchBridge)
     gamehook: GameHookBridge = field(factory=GameHookBridge)
     fsm: StateMachine = field(init=False, factory=StateMachine)
+    handler: Optional[DataHandler] = field(init=False, default=None)
+    memory: Optional[MemoryPoller] = field(init=False, default=None)
+    _poll_backoff: float = field(init=False, default=0.0, repr=False)
+    _poll_resume: float = field(init=False, default=0.0, repr=False)
 
     @property
     def rom(self) -> Optional[str]:
@@ -82,6 +104,7 @@ class GameInterface:
         gamehook = settings['gamehook']
         self.gamehook.setup(gamehook)
         self._load_data_handler(gamehook.get('properties', {}))
+        self._load_initial_state()
 
     def start(self):
         logger.info('starting low-level components')
@@ -135,4 +158,60 @@ class GameInterface:
             except IOError as e:
                 logger.error(f'unable to read GameHook properties file: {e}')
         handler = load_data_handler(self.data, self.fsm, properties=config)
+        self.handler = handler
         self.gamehook.on_change = handler.on_property_changed
+        self.gamehook.on_flush = handler.flush
+        if self.retroarch.memory_polling:
+            self._load_memory_poller(handler)
+
+    def _load_memory_poller(self, handler: DataHandler):
+        # read bytes-backed properties straight from RetroArch, leave the rest to GameHook
+        include = {prop for prop, ghp in handler.properties.items() if ghp.uses_bytes}
+        packed = {
+            name: ([ghp.name for ghp in group.members], group.layout.size)
+            for name, group in handler.packed.items()
+        }
+        address_map = AddressMap.from_mapper(self.gamehook.properties, include, packed=packed)
+        if not address_map.fields:
+            logger.warning('no properties to poll from memory')
+            return
+        self.memory = MemoryPoller(
+            self.retroarch.client.read_core_memory_many,
+            address_map,
+            on_change=handler.on_property_changed,
+        )
+        ignored = set(address_map.props)
+        for name in ignored & packed.keys():
+            ignored.update(packed[name][0])
+        self.gamehook.ignored = frozenset(ignored)
+        self.gamehook.on_poll = self._poll_memory
+        self.gamehook.poll_interval = 1.0 / self.retroarch.poll_rate
+
+    def _load_initial_state(self):
+        # attach to a game in progress without waiting for, or replaying, changes
+        labels = self.handler.bootstrap(self.gamehook.request_initial_state())
+        self.fsm.resume(labels, self.data)
+        if self.memory is not None:
+            # memory values may be more recent, but are not changes either
+            self.memory.on_seed = self.handler.seed
+
+    def _poll_memory(self):
+        now = time.monotonic()
+        if now < self._poll_resume:
+            return
+        try:
+            # a poll is a snapshot of memory, so its changes are applied together
+            with self.handler.transaction():
+                self.memory.poll()
+        except POLL_ERRORS as e:
+            # back off, so that a missing or broken RetroArch is not hammered
+            first = self._poll_backoff <= 0.0
+            backoff = self._poll_backoff * POLL_BACKOFF_FACTOR
+            self._poll_backoff = min(max(backoff, POLL_BACKOFF_MIN), POLL_BACKOFF_MAX)
+            self._poll_resume = now + self._poll_backoff
+            log = logger.warning if first else logger.debug
+            log(f'memory poll failed, retrying in {self._poll_backoff:.1f} s: {e!r}')
+        else:
+            if self._poll_backoff > 0.0:
+                logger.info('memory poll recovered')
+                self._poll_backoff = 0.0
@@ -5,16 +5,32 @@
 # Imports
 ###############################################################################
 
-from typing import Any, Callable, Dict, Final, List, Mapping, Optional
+from typing import Any, Callable, Dict, Final, FrozenSet, List, Mapping, Optional, Tuple
 
-import json
 import logging
+from pathlib import Path
+from threading import Thread
+import time
 
 from attrs import define, field
 import requests
 from signalrcore.hub_connection_builder import HubConnectionBuilder
 
-from pokewatcher.core.util import SleepLoop, noop
+from pokewatcher.core.capture import CaptureReader, CaptureWriter, replay as replay_capture
+from pokewatcher.core.ingest import (
+    DEFAULT_BLOCK_TIMEOUT,
+    DEFAULT_CAPACITY,
+    POLICY_DROP_OLDEST,
+    IngestQueue,
+)
+from pokewatcher.core.mapper_cache import (
+    DEFAULT_CACHE_DIR,
+    CachedMapper,
+    MapperCache,
+    mapper_digest,
+    mapper_game,
+)
+from pokewatcher.core.util import SleepLoop, json_loads, noop
 from pokewatcher.errors import PokeWatcherError
 
 ###############################################################################
@@ -23,6 +39,9 @@ from pokewatcher.errors import PokeWatcherError
 
 logger: Final[logging.Logger] = logging.getLogger(__name__)
 
+WORKER_WAIT_TIMEOUT: Final[float] = 1.0  # seconds
+REQUEST_TIMEOUT: Final[float] = 5.0  # seconds
+
 ###############################################################################
 # Interface
 ###############################################################################
@@ -45,12 +64,29 @@ class GameHookBridge:
     on_error: Callable = noop
     on_change: Callable = noop
     on_load: Callable = noop
+    on_flush: Callable = noop
+    on_poll: Callable = noop
     meta: Dict[str, Any] = field(init=False, factory=dict)
     glossary: Dict[str, Any] = field(init=False, factory=dict)
     properties: List[str] = field(init=False, factory=list)
     url_signalr: str = field(init=False, default='http://localhost:8085/updates')
     url_requests: str = field(init=False, default='http://localhost:8085/mapper')
+    url_properties: str = field(init=False, default='http://localhost:8085/mapper/properties')
+    session: Optional[requests.Session] = field(init=False, default=None, repr=False)
     hub: Optional[HubConnectionBuilder] = field(init=False, default=None, repr=False)
+    queue: IngestQueue = field(init=False, factory=IngestQueue, repr=False)
+    threaded: bool = field(init=False, default=False)
+    poll_interval: float = field(init=False, default=0.0)  # seconds, 0 disables `on_poll`
+    ignored: FrozenSet[str] = field(init=False, factory=frozenset)
+    recorder: Optional[CaptureWriter] = field(init=False, default=None, repr=False)
+    cache: Optional[MapperCache] = field(init=False, default=None, repr=False)
+    cached_mapper: Optional[CachedMapper] = field(init=False, default=None, repr=False)
+    mapper_from_cache: bool = field(init=False, default=False)
+    _fresh_mapper: Optional[Mapping[str, Any]] = field(init=False, default=None, repr=False)
+    _revalidator: Optional[Thread] = field(init=False, default=None, eq=False, repr=False)
+    _worker: Optional[Thread] = field(init=False, default=None, eq=False, repr=False)
+    _running: bool = field(init=False, default=False, eq=False, repr=False)
+    _next_poll: float = field(init=False, default=0.0, eq=False, repr=False)
 
     @property
     def game_name(self) -> str:
@@ -63,18 +99,52 @@ class GameHookBridge:
         port = settings['port']
         self.url_signalr = f'http://{host}:{port}/updates'
         self.url_requests = f'http://{host}:{port}/mapper'
-        self.request_mapper()
+        self.url_properties = f'http://{host}:{port}/mapper/properties'
+        self.queue = IngestQueue(
+            capacity=settings.get('queue_size', DEFAULT_CAPACITY),
+            policy=settings.get('overflow', POLICY_DROP_OLDEST),
+            block_timeout=settings.get('block_timeout', DEFAULT_BLOCK_TIMEOUT),
+        )
+        self.threaded = settings.get('threaded', False)
+        # a single keep-alive session for the main thread's requests to GameHook
+        self.session = requests.Session()
+        record = settings.get('record')
+        if record:
+            self.recorder = CaptureWriter(Path(record))
+        cache_dir = settings.get('mapper_cache', DEFAULT_CACHE_DIR)
+        if cache_dir:
+            self.cache = MapperCache(Path(cache_dir))
+        self.load_mapper()
 
     def start(self):
+        if self.threaded:
+            self._start_worker()
+        if self.recorder is not None:
+            self.recorder.open(meta=self.meta)
         self.connect()
 
     def update(self, delta):
         # logger.debug('update')
-        return
+        if self._fresh_mapper is not None:
+            self._apply_fresh_mapper()
+        if not self.threaded:
+            self._poll_if_due()
+            self.queue.drain(self.on_change)
+            self.on_flush()
 
     def cleanup(self):
         logger.info('cleaning up')
         self.disconnect()
+        if self.recorder is not None:
+            self.recorder.close()
+        self._stop_worker()
+        if self._revalidator is not None:
+            self._revalidator.join(timeout=REQUEST_TIMEOUT)
+            self._revalidator = None
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        logger.info(f'ingest queue: {self.queue.stats}')
 
     def connect(self):
         if self.hub is None:
@@ -112,30 +182,186 @@ class GameHookBridge:
             self.hub.stop()
             self.hub = None
 
+    def load_mapper(self) -> str:
+        # use the cached mapper right away, if any, and check it with GameHook later
+        cached = None if self.cache is None else self.cache.load(self.url_requests)
+        if cached is None:
+            return self.request_mapper()
+        logger.info(f'using cached mapper: {cached.key}')
+        self._use_mapper(cached.mapper)
+        self.cached_mapper = cached
+        self.mapper_from_cache = True
+        self._revalidator = Thread(target=self._revalidate, name='gamehook-mapper', daemon=True)
+        self._revalidator.start()
+        return cached.game
+
     def request_mapper(self, ntries: int = 3) -> str:
         with SleepLoop(n=ntries, delay=1.0) as loop:
             while loop.iterate():
                 logger.info(f'requesting mapper from {self.url_requests}')
-                response = requests.get(self.url_requests)
-                data = json.loads(response.text)
+                response = self._get(self.url_requests)
+                data = json_loads(response.content)
                 try:
-                    self.meta = data['meta']
-                    self.glossary = data['glossary']
-                    self.properties = data['properties']
+                    self._use_mapper(data)
+                    self.mapper_from_cache = False
                     name = self.meta['gameName']
                     logger.info('received mapper')
+                    self._cache_mapper(response)
                     return name
                 except KeyError:
                     logger.warning('mapper not yet loaded')
         logger.warning('gave up on mapper request')
         raise GameHookError.get_mapper(self.url_requests)
 
+    def request_properties(self) -> List[Mapping[str, Any]]:
+        # the current state of every property, in a single request
+        logger.debug(f'requesting properties from {self.url_properties}')
+        response = self._get(self.url_properties)
+        response.raise_for_status()
+        return json_loads(response.content)
+
+    def request_snapshot(self) -> List[Tuple[str, Any, List[int]]]:
+        # the same `(prop, value, byte_values)` as property change notifications
+        return _snapshot(self.request_properties())
+
+    def request_initial_state(self) -> List[Tuple[str, Any, List[int]]]:
+        # a freshly received mapper already lists current values, a cached one does not
+        if not self.mapper_from_cache:
+            return _snapshot(self.properties)
+        try:
+            return self.request_snapshot()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f'unable to request the initial state: {e}')
+            return []
+
+    def replay(self, path: Path, speed: float = 1.0, sleep: Callable = time.sleep) -> int:
+        # feeds a recorded session to `on_change`, without a GameHook server
+        reader = CaptureReader(Path(path))
+        header = reader.read_header()
+        if not self.meta:
+            self.meta = header.get('meta', {})
+        logger.info(f'replaying property changes from {path} (speed: {speed})')
+        try:
+            n = replay_capture(iter(reader), self.on_change, speed=speed, sleep=sleep)
+        finally:
+            # a truncated capture still applies the changes read so far
+            self.on_flush()
+        logger.info(f'replayed {n} property changes')
+        return n
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        return self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+
+    def _use_mapper(self, data: Mapping[str, Any]):
+        meta = data['meta']
+        glossary = data['glossary']
+        properties = data['properties']
+        self.meta = meta
+        self.glossary = glossary
+        self.properties = properties
+
+    def _cache_mapper(self, response: requests.Response):
+        if self.cache is not None:
+            try:
+                etag = response.headers.get('ETag')
+                self.cached_mapper = self.cache.save(self.url_requests, response.content, etag)
+            except OSError as e:
+                logger.warning(f'unable to cache mapper: {e}')
+
+    def _revalidate(self):
+        # runs in a background thread, right after loading a cached mapper
+        cached = self.cached_mapper
+        headers = {'If-None-Match': cached.etag} if cached.etag else {}
+        # sessions are not thread-safe, so this thread does not share the main one
+        with requests.Session() as session, SleepLoop(n=3, delay=1.0) as loop:
+            while loop.iterate():
+                try:
+                    response = session.get(
+                        self.url_requests, headers=headers, timeout=REQUEST_TIMEOUT
+                    )
+                    if response.status_code == 304:
+                        break
+                    data = json_loads(response.content)
+                    game = mapper_game(data)
+                except requests.RequestException as e:
+                    logger.debug(f'unable to revalidate cached mapper: {e}')
+                    continue
+                except (ValueError, KeyError, TypeError):
+                    logger.debug('mapper not yet loaded')
+                    continue
+                if mapper_digest(response.content) == cached.digest:
+                    break
+                self._cache_mapper(response)
+                if game != cached.game:
+                    logger.warning(
+                        f'GameHook is running {game}, not {cached.game} (cached);'
+                        ' restart to load the new mapper'
+                    )
+                else:
+                    # handed over to the main loop, which owns the mapper
+                    self._fresh_mapper = data
+                return
+            else:
+                logger.warning('unable to revalidate cached mapper, GameHook is not responding')
+                return
+        logger.info('cached mapper is up to date')
+
+    def _apply_fresh_mapper(self):
+        data = self._fresh_mapper
+        self._fresh_mapper = None
+        self._use_mapper(data)
+        logger.info(f'cached mapper was outdated, updated to {self.cached_mapper.key}')
+
     def _on_property_changed(self, args):
+        # runs in the SignalR receive thread; game logic runs on the consumer side
+        if self.recorder is not None:
+            self.recorder.write(args)
         prop, _address, value, byte_values, _frozen, changed_fields = args
-        if 'bytes' in changed_fields:
-            self.on_change(prop, value, byte_values)
+        if 'bytes' in changed_fields and prop not in self.ignored:
+            self.queue.put(prop, value, byte_values)
+
+    def _start_worker(self):
+        if self._worker is None:
+            logger.info('starting ingest worker')
+            self._running = True
+            self._worker = Thread(target=self._run_worker, name='gamehook-ingest', daemon=True)
+            self._worker.start()
+
+    def _stop_worker(self):
+        if self._worker is not None:
+            logger.info('stopping ingest worker')
+            self._running = False
+            self.queue.notify()
+            self._worker.join()
+            self._worker = None
+
+    def _poll_if_due(self) -> float:
+        # data arrival drives draining, polling keeps its own rate
+        if self.poll_interval <= 0.0:
+            return WORKER_WAIT_TIMEOUT
+        now = time.monotonic()
+        if now >= self._next_poll:
+            self.on_poll()
+            self._next_poll = now + self.poll_interval
+        return max(0.0, self._next_poll - time.monotonic())
+
+    def _run_worker(self):
+        while self._running:
+            timeout = min(self._poll_if_due(), WORKER_WAIT_TIMEOUT)
+            if self.queue.wait(timeout):
+                self.queue.drain(self.on_change)
+            self.on_flush()
 
 
 def new():
     instance = GameHookBridge()
     return instance
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def _snapshot(properties: List[Mapping[str, Any]]) -> List[Tuple[str, Any, List[int]]]:
+    return [(p['path'], p.get('value'), p.get('bytes') or []) for p in properties if 'path' in p]
@@ -0,0 +1,179 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Any, Callable, Deque, Dict, Final, List, Tuple
+
+from collections import deque
+import logging
+from threading import Condition
+import time
+
+from attrs import define, field
+from attrs.validators import gt, in_
+
+from pokewatcher.core.util import noop
+
+###############################################################################
+# Constants
+###############################################################################
+
+logger: Final[logging.Logger] = logging.getLogger(__name__)
+
+POLICY_DROP_OLDEST: Final[str] = 'drop-oldest'
+POLICY_COALESCE: Final[str] = 'coalesce'
+POLICY_BLOCK: Final[str] = 'block'
+
+OVERFLOW_POLICIES: Final[Tuple[str, ...]] = (POLICY_DROP_OLDEST, POLICY_COALESCE, POLICY_BLOCK)
+
+DEFAULT_CAPACITY: Final[int] = 1024
+DEFAULT_BLOCK_TIMEOUT: Final[float] = 1.0  # seconds
+
+# (timestamp, property, value, bytes)
+Entry = List[Any]
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+@define
+class IngestStats:
+    received: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    failed: int = 0
+    max_depth: int = 0
+    max_latency: float = 0.0  # seconds
+
+    def __str__(self) -> str:
+        return (
+            f'received {self.received}, delivered {self.delivered},'
+            f' dropped {self.dropped}, coalesced {self.coalesced}, failed {self.failed},'
+            f' max depth {self.max_depth}, max latency {self.max_latency * 1000.0:.3f} ms'
+        )
+
+
+@define
+class IngestQueue:
+    """Bounded queue of property changes between a producer and a consumer thread.
+
+    The producer (e.g., the SignalR receive thread) calls `put`, which never
+    runs any game logic. The consumer calls `drain` to deliver pending changes
+    to a callback, in arrival order. `on_ready` is called after each `put`,
+    e.g., to wake up a consumer that is not waiting on the queue itself.
+
+    When the queue is full, the `policy` decides what happens:
+    - `drop-oldest` discards the oldest pending change;
+    - `coalesce` keeps only the latest value of each pending property,
+      and discards the oldest change if the queue is full of distinct properties;
+    - `block` makes the producer wait for free space (up to `block_timeout`),
+      discarding the new change if the wait times out.
+    """
+
+    capacity: int = field(default=DEFAULT_CAPACITY, validator=gt(0))
+    policy: str = field(default=POLICY_DROP_OLDEST, validator=in_(OVERFLOW_POLICIES))
+    block_timeout: float = DEFAULT_BLOCK_TIMEOUT
+    on_ready: Callable = field(default=noop, eq=False, repr=False)
+    stats: IngestStats = field(init=False, factory=IngestStats)
+    _entries: Deque[Entry] = field(init=False, factory=deque, repr=False)
+    _pending: Dict[str, Entry] = field(init=False, factory=dict, repr=False)
+    _cond: Condition = field(init=False, factory=Condition, eq=False, repr=False)
+
+    @property
+    def depth(self) -> int:
+        return len(self._entries)
+
+    def put(self, prop: str, value: Any, byte_values: List[int]) -> None:
+        now = time.monotonic()
+        with self._cond:
+            self.stats.received += 1
+            if self.policy == POLICY_COALESCE:
+                entry = self._pending.get(prop)
+                if entry is not None:
+                    # keep the original timestamp, the change has been waiting since then
+                    entry[2] = value
+                    entry[3] = byte_values
+                    self.stats.coalesced += 1
+                    return
+            if len(self._entries) >= self.capacity:
+                if self.policy == POLICY_BLOCK:
+                    if not self._cond.wait_for(self._has_space, timeout=self.block_timeout):
+                        self.stats.dropped += 1
+                        logger.warning(f'ingest queue full: dropped change to {prop}')
+                        return
+                else:
+                    self._drop_oldest()
+            entry = [now, prop, value, byte_values]
+            self._entries.append(entry)
+            if self.policy == POLICY_COALESCE:
+                self._pending[prop] = entry
+            depth = len(self._entries)
+            if depth > self.stats.max_depth:
+                self.stats.max_depth = depth
+            self._cond.notify_all()
+        self.on_ready()
+
+    def drain(self, callback: Callable, limit: int = 0) -> int:
+        """Deliver pending changes to `callback(prop, value, byte_values)`.
+
+        Use `limit <= 0` to deliver everything that is pending.
+        A callback that raises is logged and counted, and the rest of the
+        batch is still delivered.
+        Returns the number of delivered changes.
+        """
+        with self._cond:
+            n = len(self._entries)
+            if limit > 0 and limit < n:
+                n = limit
+            batch = [self._entries.popleft() for _ in range(n)]
+            if self._pending:
+                for entry in batch:
+                    self._pending.pop(entry[1], None)
+            if n > 0:
+                self._cond.notify_all()
+        if n == 0:
+            return 0
+        stats = self.stats
+        for timestamp, prop, value, byte_values in batch:
+            latency = time.monotonic() - timestamp
+            if latency > stats.max_latency:
+                stats.max_latency = latency
+            try:
+                callback(prop, value, byte_values)
+            except Exception:
+                stats.failed += 1
+                logger.exception(f'failed to apply change to {prop}')
+            else:
+                stats.delivered += 1
+        return n
+
+    def wait(self, timeout: float) -> bool:
+        """Block until there is something to drain, or `timeout` seconds pass."""
+        with self._cond:
+            return self._cond.wait_for(self._entries.__len__, timeout=timeout) > 0
+
+    def notify(self) -> None:
+        """Wake up consumers waiting on the queue, e.g., to stop a worker."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def clear(self) -> None:
+        with self._cond:
+            self._entries.clear()
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def _has_space(self) -> bool:
+        return len(self._entries) < self.capacity
+
+    def _drop_oldest(self):
+        entry = self._entries.popleft()
+        if self._pending:
+            self._pending.pop(entry[1], None)
+        self.stats.dropped += 1
+        logger.debug(f'ingest queue full: dropped change to {entry[1]}')
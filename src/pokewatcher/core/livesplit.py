@@ -0,0 +1,283 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Deque, Dict, Final, List, Optional
+
+from collections import deque
+from concurrent.futures import Future
+import logging
+from queue import Empty, SimpleQueue
+import select
+import socket
+from threading import Event, Thread
+import time
+
+from attrs import define, field
+
+###############################################################################
+# Constants
+###############################################################################
+
+logger: Final[logging.Logger] = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT: Final[float] = 3.0  # seconds
+BACKOFF_MIN: Final[float] = 0.5  # seconds
+BACKOFF_MAX: Final[float] = 30.0  # seconds
+BACKOFF_FACTOR: Final[float] = 2.0
+IDLE_WAIT: Final[float] = 1.0  # seconds
+RECV_SIZE: Final[int] = 4096
+LINE_END: Final[bytes] = b'\r\n'
+MAX_LINE: Final[int] = 64 * 1024  # bytes
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+@define
+class CommandStats:
+    sent: int = 0
+    failed: int = 0
+    total_latency: float = 0.0  # seconds
+    max_latency: float = 0.0  # seconds
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.sent if self.sent > 0 else 0.0
+
+    def record(self, latency: float):
+        self.sent += 1
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def __str__(self) -> str:
+        return (
+            f'{self.sent} sent, {self.failed} failed,'
+            f' mean {self.mean_latency * 1000.0:.3f} ms,'
+            f' max {self.max_latency * 1000.0:.3f} ms'
+        )
+
+
+@define
+class Command:
+    name: str
+    line: bytes
+    reply: Optional[Future] = None  # None for commands without a reply
+    queued_at: float = field(factory=time.monotonic)
+    deadline: float = 0.0  # monotonic, for commands with a reply
+
+
+@define
+class LivesplitClient:
+    """Pipelined client for the LiveSplit Server text protocol.
+
+    A dedicated thread owns the socket. `send` queues a command without a
+    reply and returns immediately. `request` queues a command and returns a
+    `Future` for its reply. Commands are written as soon as they are queued,
+    without waiting for earlier replies; LiveSplit answers in order, so
+    replies are matched to requests first-in, first-out. A request that times
+    out resets the connection, since later replies can no longer be matched.
+
+    The connection is re-established automatically, with exponential backoff.
+    Commands queued while disconnected are sent after reconnecting.
+    """
+
+    host: str
+    port: int
+    timeout: float = DEFAULT_TIMEOUT
+    backoff_min: float = BACKOFF_MIN
+    backoff_max: float = BACKOFF_MAX
+    stats: Dict[str, CommandStats] = field(init=False, factory=dict)
+    _queue: SimpleQueue = field(init=False, factory=SimpleQueue, eq=False, repr=False)
+    _awaiting: Deque[Command] = field(init=False, factory=deque, eq=False, repr=False)
+    _buffer: bytearray = field(init=False, factory=bytearray, eq=False, repr=False)
+    _socket: Optional[socket.socket] = field(init=False, default=None, repr=False)
+    _wake_r: Optional[socket.socket] = field(init=False, default=None, repr=False)
+    _wake_w: Optional[socket.socket] = field(init=False, default=None, repr=False)
+    _stop: Event = field(init=False, factory=Event, eq=False, repr=False)
+    _worker: Optional[Thread] = field(init=False, default=None, eq=False, repr=False)
+
+    @property
+    def address(self) -> str:
+        return f'{self.host}:{self.port}'
+
+    @property
+    def is_connected(self) -> bool:
+        return self._socket is not None
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None
+
+    def start(self):
+        if self._worker is None:
+            self._stop.clear()
+            # a socket pair, rather than a pipe, so that `select` works on Windows
+            self._wake_r, self._wake_w = socket.socketpair()
+            self._wake_r.setblocking(False)
+            self._wake_w.setblocking(False)
+            self._worker = Thread(target=self._run, name='livesplit', daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        if self._worker is not None:
+            self._stop.set()
+            self._wake()
+            self._worker.join(timeout=self.timeout + 1.0)
+            self._worker = None
+            self._wake_r.close()
+            self._wake_w.close()
+            self._wake_r = None
+            self._wake_w = None
+            for name, stats in self.stats.items():
+                logger.info(f'{name}: {stats}')
+
+    def send(self, command: str):
+        # thread-safe, never blocks
+        self._queue.put(Command(command, command.encode('utf-8') + LINE_END))
+        self._wake()
+
+    def request(self, command: str) -> Future:
+        # thread-safe, never blocks
+        future = Future()
+        self._queue.put(Command(command, command.encode('utf-8') + LINE_END, reply=future))
+        self._wake()
+        return future
+
+    def _wake(self):
+        if self._wake_w is not None:
+            try:
+                self._wake_w.send(b'\x00')
+            except (BlockingIOError, OSError):
+                pass  # already woken up, or shutting down
+
+    def _run(self):
+        backoff = self.backoff_min
+        while not self._stop.is_set():
+            if self._socket is None:
+                if not self._connect():
+                    logger.debug(f'reconnecting to livesplit in {backoff:.1f} s')
+                    if self._stop.wait(backoff):
+                        break
+                    backoff = min(backoff * BACKOFF_FACTOR, self.backoff_max)
+                    continue
+                backoff = self.backoff_min
+            try:
+                self._write_pending()
+                self._wait_and_read()
+                self._expire()
+            except (ConnectionError, OSError) as e:
+                logger.error(f'livesplit connection lost: {e}')
+                self._disconnect(e)
+        self._disconnect(ConnectionError('client stopped'))
+        self._fail_queued()
+
+    def _connect(self) -> bool:
+        try:
+            self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            logger.debug(f'unable to connect to livesplit at {self.address}: {e}')
+            return False
+        logger.info(f'connected to livesplit at {self.address}')
+        self._buffer.clear()
+        return True
+
+    def _disconnect(self, error: Exception):
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            finally:
+                self._socket = None
+        while self._awaiting:
+            self._fail(self._awaiting.popleft(), error)
+        self._buffer.clear()
+
+    def _write_pending(self):
+        while True:
+            try:
+                command = self._queue.get_nowait()
+            except Empty:
+                return
+            if command.reply is not None and not command.reply.set_running_or_notify_cancel():
+                continue  # cancelled by the caller
+            try:
+                self._socket.sendall(command.line)
+            except OSError:
+                self._awaiting.append(command)  # failed along with the others
+                raise
+            if command.reply is None:
+                self._stats(command.name).record(time.monotonic() - command.queued_at)
+            else:
+                command.deadline = time.monotonic() + self.timeout
+                self._awaiting.append(command)
+
+    def _wait_and_read(self):
+        timeout = IDLE_WAIT
+        if self._awaiting:
+            timeout = max(0.0, min(timeout, self._awaiting[0].deadline - time.monotonic()))
+        ready, _, _ = select.select([self._socket, self._wake_r], [], [], timeout)
+        if self._wake_r in ready:
+            self._drain_wakeups()
+        if self._socket in ready:
+            data = self._socket.recv(RECV_SIZE)
+            if not data:
+                raise ConnectionError('connection closed by livesplit')
+            self._buffer += data
+            self._read_lines()
+
+    def _read_lines(self):
+        buffer = self._buffer
+        while True:
+            i = buffer.find(b'\n')
+            if i < 0:
+                if len(buffer) > MAX_LINE:
+                    raise ConnectionError('reply line too long')
+                return
+            line = bytes(buffer[:i]).rstrip(b'\r').decode('utf-8', errors='replace')
+            del buffer[: i + 1]
+            if not self._awaiting:
+                logger.warning(f'unexpected reply from livesplit: {line!r}')
+                continue
+            command = self._awaiting.popleft()
+            self._stats(command.name).record(time.monotonic() - command.queued_at)
+            command.reply.set_result(line)
+
+    def _expire(self):
+        if self._awaiting and self._awaiting[0].deadline <= time.monotonic():
+            name = self._awaiting[0].name
+            raise ConnectionError(f'{name}: no reply within {self.timeout} s')
+
+    def _drain_wakeups(self):
+        try:
+            while self._wake_r.recv(RECV_SIZE):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _fail(self, command: Command, error: Exception):
+        self._stats(command.name).failed += 1
+        if command.reply is not None and not command.reply.done():
+            command.reply.set_exception(error)
+
+    def _fail_queued(self):
+        error = ConnectionError('client stopped')
+        pending: List[Command] = []
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except Empty:
+                break
+        for command in pending:
+            if command.reply is not None and command.reply.set_running_or_notify_cancel():
+                self._fail(command, error)
+
+    def _stats(self, name: str) -> CommandStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = CommandStats()
+        return stats
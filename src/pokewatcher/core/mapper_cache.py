@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Any, Final, Mapping, Optional
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import re
+
+from attrs import define, field, frozen
+
+from pokewatcher.core.util import json_loads
+
+###############################################################################
+# Constants
+###############################################################################
+
+logger: Final[logging.Logger] = logging.getLogger(__name__)
+
+# Cache layout, one pair of files per GameHook server:
+#   root/<host-port>.json        the mapper, exactly as served by GameHook
+#   root/<host-port>.meta.json   game name, SHA-256 of the mapper and HTTP ETag
+# The hash is checked on load, so a partially written mapper is never used.
+
+CACHE_VERSION: Final[int] = 1
+DEFAULT_CACHE_DIR: Final[str] = '.mapper_cache'
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+@frozen
+class CachedMapper:
+    url: str
+    game: str
+    digest: str
+    etag: Optional[str] = None
+    mapper: Mapping[str, Any] = field(factory=dict, eq=False, repr=False)
+
+    @property
+    def key(self) -> str:
+        return f'{self.game}@{self.digest[:12]}'
+
+
+@define
+class MapperCache:
+    """Keeps the last mapper received from each GameHook server on disk."""
+
+    root: Path
+
+    def mapper_path(self, url: str) -> Path:
+        return self.root / f'{_slug(url)}.json'
+
+    def meta_path(self, url: str) -> Path:
+        return self.root / f'{_slug(url)}.meta.json'
+
+    def load(self, url: str) -> Optional[CachedMapper]:
+        # any problem with the cache just means that the mapper must be requested
+        try:
+            meta = json.loads(self.meta_path(url).read_bytes())
+            body = self.mapper_path(url).read_bytes()
+        except FileNotFoundError:
+            logger.debug(f'no cached mapper for {url}')
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f'unable to read cached mapper for {url}: {e}')
+            return None
+        try:
+            if meta['version'] != CACHE_VERSION:
+                logger.info(f'ignoring cached mapper with version {meta["version"]}')
+                return None
+            digest = mapper_digest(body)
+            if digest != meta['digest']:
+                logger.warning(f'cached mapper for {url} is corrupted')
+                return None
+            mapper = json_loads(body)
+            game = mapper_game(mapper)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f'invalid cached mapper for {url}: {e}')
+            return None
+        return CachedMapper(url, game, digest, etag=meta.get('etag'), mapper=mapper)
+
+    def save(self, url: str, body: bytes, etag: Optional[str] = None) -> CachedMapper:
+        # raises `ValueError` or `KeyError` if `body` is not a loaded mapper
+        mapper = json_loads(body)
+        game = mapper_game(mapper)
+        digest = mapper_digest(body)
+        meta = {
+            'version': CACHE_VERSION,
+            'url': url,
+            'game': game,
+            'digest': digest,
+            'etag': etag,
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        # the mapper first, so that the metadata never refers to a missing mapper
+        _write_atomic(self.mapper_path(url), body)
+        _write_atomic(self.meta_path(url), json.dumps(meta, indent=2).encode('utf-8'))
+        logger.debug(f'cached mapper for {url}: {game} ({digest[:12]})')
+        return CachedMapper(url, game, digest, etag=etag, mapper=mapper)
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def mapper_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def mapper_game(mapper: Mapping[str, Any]) -> str:
+    # a mapper is only usable once GameHook has loaded a game
+    for key in ('meta', 'glossary', 'properties'):
+        if key not in mapper:
+            raise KeyError(key)
+    return mapper['meta']['gameName']
+
+
+def _slug(url: str) -> str:
+    url = re.sub(r'^\w+://', '', url)
+    return re.sub(r'[^A-Za-z0-9]+', '-', url).strip('-')
+
+
+def _write_atomic(path: Path, contents: bytes):
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_bytes(contents)
+    os.replace(tmp, path)
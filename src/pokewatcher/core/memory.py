@@ -0,0 +1,310 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Final,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from bisect import bisect_left
+import logging
+
+from attrs import define, field, frozen
+
+from pokewatcher.core.util import noop
+
+try:
+    import numpy
+except ImportError:  # optional dependency
+    numpy = None
+
+###############################################################################
+# Constants
+###############################################################################
+
+logger: Final[logging.Logger] = logging.getLogger(__name__)
+
+# merge fields separated by up to this many unused bytes into the same read
+MAX_GAP: Final[int] = 32  # bytes
+# keep each reply within a single datagram (3 characters per byte)
+MAX_BLOCK_LENGTH: Final[int] = 512  # bytes
+
+# changed ranges are narrowed down to this size, then fields are compared exactly
+DIFF_CHUNK: Final[int] = 16  # bytes
+# below this size, comparing `bytes` slices beats the overhead of NumPy arrays
+NUMPY_MIN_LENGTH: Final[int] = 256  # bytes
+
+# [start, end) offsets within a block
+Range = Tuple[int, int]
+
+###############################################################################
+# Address Map
+###############################################################################
+
+
+@frozen(order=True)
+class MemoryField:
+    address: int
+    length: int
+    prop: str
+
+    @property
+    def end(self) -> int:
+        return self.address + self.length
+
+
+@define
+class IntervalIndex:
+    """Finds the fields that overlap a range of addresses, by binary search."""
+
+    fields: List[MemoryField]  # sorted by address
+    starts: List[int] = field(init=False, repr=False)
+    max_length: int = field(init=False, default=0)
+
+    def __attrs_post_init__(self):
+        self.starts = [f.address for f in self.fields]
+        self.max_length = max((f.length for f in self.fields), default=0)
+
+    def overlapping(self, start: int, end: int) -> Iterator[MemoryField]:
+        # fields that start more than `max_length` bytes before `start` cannot overlap
+        i = bisect_left(self.starts, start - self.max_length + 1)
+        j = bisect_left(self.starts, end, lo=i)
+        for f in self.fields[i:j]:
+            if f.end > start:
+                yield f
+
+
+@define
+class MemoryBlock:
+    address: int
+    length: int
+    fields: List[MemoryField] = field(factory=list)
+    previous: Optional[bytes] = field(default=None, repr=False)
+    _index: Optional[IntervalIndex] = field(init=False, default=None, eq=False, repr=False)
+
+    @property
+    def end(self) -> int:
+        return self.address + self.length
+
+    def diff(self, data: bytes) -> List[MemoryField]:
+        """Store a new snapshot and return the fields that changed since the previous one."""
+        previous = self.previous
+        self.previous = data
+        if previous is None:
+            return list(self.fields)
+        if previous == data:
+            return []
+        if self._index is None:
+            self._index = IntervalIndex(self.fields)
+        base = self.address
+        changed = []
+        seen = set()
+        for start, end in changed_ranges(previous, data):
+            for f in self._index.overlapping(base + start, base + end):
+                if f.prop in seen:
+                    continue
+                seen.add(f.prop)
+                i = f.address - base
+                j = i + f.length
+                # ranges are approximate, so confirm that the field bytes did change
+                if previous[i:j] != data[i:j]:
+                    changed.append(f)
+        return changed
+
+
+@define
+class AddressMap:
+    fields: List[MemoryField] = field(factory=list)
+
+    @property
+    def props(self) -> FrozenSet[str]:
+        return frozenset(f.prop for f in self.fields)
+
+    @classmethod
+    def from_mapper(
+        cls,
+        properties: Iterable[Mapping[str, Any]],
+        include: Container[str],
+        packed: Optional[Mapping[str, Tuple[Sequence[str], int]]] = None,
+    ) -> 'AddressMap':
+        # `properties` as listed by the GameHook mapper, with `path`, `address` and `length`
+        # `packed` maps the name of a group to its members and its size in bytes
+        properties = list(properties)
+        fields = []
+        grouped = set()
+        for name, (members, size) in (packed or {}).items():
+            f = _packed_field(properties, name, members, size)
+            if f is not None:
+                fields.append(f)
+                grouped.update(members)
+        for metadata in properties:
+            prop = metadata.get('path')
+            address = metadata.get('address')
+            length = metadata.get('length') or 0
+            if prop not in include or prop in grouped:
+                continue
+            if address is None or length <= 0:
+                logger.debug(f'{prop}: no memory address, left to GameHook')
+                continue
+            fields.append(MemoryField(int(address), int(length), prop))
+        fields.sort()
+        return cls(fields)
+
+    def blocks(
+        self, max_gap: int = MAX_GAP, max_length: int = MAX_BLOCK_LENGTH
+    ) -> List[MemoryBlock]:
+        # batch nearby fields into as few reads as possible
+        blocks: List[MemoryBlock] = []
+        block = None
+        for f in self.fields:
+            if (
+                block is not None
+                and f.address <= block.end + max_gap
+                and max(block.end, f.end) - block.address <= max_length
+            ):
+                block.length = max(block.end, f.end) - block.address
+                block.fields.append(f)
+            else:
+                block = MemoryBlock(f.address, f.length, [f])
+                blocks.append(block)
+        return blocks
+
+
+###############################################################################
+# Polling
+###############################################################################
+
+
+@define
+class MemoryPoller:
+    """Derives property changes from direct reads of the emulated memory.
+
+    `read` takes a list of `(address, length)` pairs and returns the bytes
+    of each block, e.g., `RetroArchClient.read_core_memory_many`. Each poll
+    compares the new blocks with the previous ones and calls
+    `on_change(prop, None, byte_values)` only for fields whose bytes changed.
+    """
+
+    read: Callable
+    address_map: AddressMap
+    on_change: Callable = field(default=noop, eq=False, repr=False)
+    # receives the first snapshot instead of `on_change`, if set
+    on_seed: Optional[Callable] = field(default=None, eq=False, repr=False)
+    blocks: List[MemoryBlock] = field(init=False, factory=list)
+    polls: int = field(init=False, default=0)
+    changes: int = field(init=False, default=0)
+
+    def __attrs_post_init__(self):
+        self.blocks = self.address_map.blocks()
+        n = len(self.address_map.fields)
+        logger.info(f'polling {n} properties from memory in {len(self.blocks)} reads')
+
+    def poll(self) -> int:
+        snapshots = self.read([(block.address, block.length) for block in self.blocks])
+        on_change = self.on_change if self.on_seed is None else self.on_seed
+        self.on_seed = None
+        n = 0
+        for block, data in zip(self.blocks, snapshots):
+            n += self._diff(block, bytes(data), on_change)
+        self.polls += 1
+        self.changes += n
+        return n
+
+    def reset(self):
+        # the next poll reports every field, e.g., after loading a save state
+        for block in self.blocks:
+            block.previous = None
+
+    def _diff(self, block: MemoryBlock, data: bytes, on_change: Callable) -> int:
+        changed = block.diff(data)
+        base = block.address
+        for f in changed:
+            i = f.address - base
+            on_change(f.prop, None, data[i : i + f.length])
+        return len(changed)
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def _packed_field(
+    properties: List[Mapping[str, Any]],
+    name: str,
+    members: Sequence[str],
+    size: int,
+) -> Optional[MemoryField]:
+    # the group starts at its first member and must cover all of them
+    addresses = {m.get('path'): m.get('address') for m in properties}
+    if any(addresses.get(member) is None for member in members):
+        logger.debug(f'{name}: members without a memory address, left to GameHook')
+        return None
+    start = int(addresses[members[0]])
+    if any(not (start <= int(addresses[member]) < start + size) for member in members):
+        logger.warning(f'{name}: members are not within {size} bytes of {members[0]}')
+        return None
+    return MemoryField(start, size, name)
+
+
+def changed_ranges(previous: bytes, data: bytes, chunk: int = DIFF_CHUNK) -> List[Range]:
+    """Locate the byte ranges that differ between two snapshots of a block.
+
+    With NumPy, ranges are exact. Otherwise, the snapshots are bisected with
+    `bytes` comparisons (`memcmp`), skipping equal halves, down to ranges of
+    at most `chunk` bytes. Adjacent ranges are merged.
+    """
+    n = min(len(previous), len(data))
+    ranges: List[Range] = []
+    if numpy is not None and n >= NUMPY_MIN_LENGTH:
+        ranges = _numpy_changed_ranges(previous[:n], data[:n])
+    else:
+        _bisect_changes(previous, data, 0, n, chunk, ranges)
+    if len(previous) != len(data):
+        # e.g., a short read; everything past the common length is unknown
+        _append_range(ranges, n, max(len(previous), len(data)))
+    return ranges
+
+
+def _bisect_changes(a: bytes, b: bytes, start: int, end: int, chunk: int, ranges: List[Range]):
+    if a[start:end] == b[start:end]:
+        return
+    if end - start <= chunk:
+        _append_range(ranges, start, end)
+        return
+    middle = (start + end) // 2
+    _bisect_changes(a, b, start, middle, chunk, ranges)
+    _bisect_changes(a, b, middle, end, chunk, ranges)
+
+
+def _append_range(ranges: List[Range], start: int, end: int):
+    if ranges and ranges[-1][1] == start:
+        ranges[-1] = (ranges[-1][0], end)
+    else:
+        ranges.append((start, end))
+
+
+def _numpy_changed_ranges(a: bytes, b: bytes) -> List[Range]:
+    diff = numpy.frombuffer(a, dtype=numpy.uint8) != numpy.frombuffer(b, dtype=numpy.uint8)
+    indices = numpy.flatnonzero(diff)
+    if indices.size == 0:
+        return []
+    # split the changed indices into runs of consecutive bytes
+    breaks = numpy.flatnonzero(numpy.diff(indices) > 1)
+    starts = indices[numpy.concatenate(([0], breaks + 1))]
+    ends = indices[numpy.concatenate((breaks, [indices.size - 1]))] + 1
+    return list(zip(starts.tolist(), ends.tolist()))
@@ -5,23 +5,48 @@
 # Imports
 ###############################################################################
 
-from typing import Any, Final, Mapping, Optional
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Final,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
+import asyncio
+from collections import deque
+import concurrent.futures
 import logging
 from pathlib import Path
+from threading import Thread
 
 from attrs import define, field
 
-from pokewatcher.core.util import SleepLoop, UdpConnection
 from pokewatcher.errors import PokeWatcherError
 
 ###############################################################################
 # Constants
 ###############################################################################
 
-GET_STATUS: Final[str] = b'GET_STATUS\n'
-GET_PARAM_SAVE_DIR: Final[str] = b'GET_CONFIG_PARAM savefile_directory\n'
-SAVE_STATE: Final[str] = b'SAVE_STATE\n'
+GET_STATUS: Final[str] = 'GET_STATUS'
+GET_CONFIG_PARAM: Final[str] = 'GET_CONFIG_PARAM'
+READ_CORE_MEMORY: Final[str] = 'READ_CORE_MEMORY'
+SAVE_STATE: Final[str] = 'SAVE_STATE'
+
+PARAM_SAVE_DIR: Final[str] = 'savefile_directory'
+
+DEFAULT_TIMEOUT: Final[float] = 3.0  # seconds
+DEFAULT_POLL_RATE: Final[float] = 30.0  # Hz
+N_ATTEMPTS: Final[int] = 3
+
+# replies are matched to requests by the command name and its first argument
+ReplyKey = Tuple[str, ...]
 
 logger: Final = logging.getLogger(__name__)
 
@@ -43,12 +68,261 @@ class RetroArchError(PokeWatcherError):
     def save_state(cls, address):
         return cls(f'Failed to save game state at {address}')
 
+    @classmethod
+    def timeout(cls, command: str, address: str) -> 'RetroArchError':
+        return cls(f'{command}: no reply from {address}')
+
+    @classmethod
+    def bad_reply(cls, command: str, reply: str) -> 'RetroArchError':
+        return cls(f'{command}: unexpected reply: {reply!r}')
+
+    @classmethod
+    def not_connected(cls, address: str) -> 'RetroArchError':
+        return cls(f'not connected to {address}')
+
+
+class RetroArchProtocol(asyncio.DatagramProtocol):
+    def __init__(self, on_reply: Callable, on_error: Callable):
+        self.on_reply = on_reply
+        self.on_error = on_error
+
+    def datagram_received(self, data: bytes, addr: Any):
+        self.on_reply(data)
+
+    def error_received(self, exc: Exception):
+        # e.g., ICMP port unreachable, when RetroArch is not listening
+        self.on_error(exc)
+
+
+@define
+class AsyncRetroArchClient:
+    """Client for the RetroArch network control interface (NCI), over UDP.
+
+    One long-lived socket is used for every command. Commands without a
+    reply (e.g., `SAVE_STATE`) are fire-and-forget. Replies start with the
+    command name, and its first argument for parameterised commands, so
+    they are matched to pending requests by that key, first-in, first-out.
+    Each request has a timeout; nothing sleeps while waiting.
+
+    Methods must be called from the thread running the event loop.
+    See `RetroArchClient` for a thread-safe, synchronous wrapper.
+    """
+
+    host: str = '127.0.0.1'
+    port: int = 55355
+    timeout: float = DEFAULT_TIMEOUT
+    _transport: Optional[asyncio.DatagramTransport] = field(init=False, default=None, repr=False)
+    _pending: Dict[ReplyKey, Deque[asyncio.Future]] = field(init=False, factory=dict, repr=False)
+
+    @property
+    def address(self) -> str:
+        return f'{self.host}:{self.port}'
+
+    @property
+    def is_connected(self) -> bool:
+        return self._transport is not None
+
+    async def connect(self):
+        if self._transport is None:
+            loop = asyncio.get_running_loop()
+            transport, _protocol = await loop.create_datagram_endpoint(
+                lambda: RetroArchProtocol(self._on_reply, self._on_error),
+                remote_addr=(self.host, self.port),
+            )
+            self._transport = transport
+            logger.info(f'connected to {self.address}')
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        self._fail_pending(ConnectionError(f'disconnected from {self.address}'))
+
+    def send(self, command: str):
+        if self._transport is None:
+            raise RetroArchError.not_connected(self.address)
+        logger.debug(f'send: {command}')
+        self._transport.sendto(f'{command}\n'.encode('utf-8'))
+
+    async def request(self, command: str, timeout: Optional[float] = None) -> str:
+        key = reply_key(command)
+        future = asyncio.get_running_loop().create_future()
+        queue = self._pending.get(key)
+        if queue is None:
+            queue = self._pending[key] = deque()
+        queue.append(future)
+        try:
+            self.send(command)
+            return await asyncio.wait_for(future, self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            raise RetroArchError.timeout(command, self.address) from None
+        finally:
+            if not future.done() or future.cancelled():
+                try:
+                    queue.remove(future)
+                except ValueError:
+                    pass
+
+    async def get_status(self) -> Tuple[str, Optional[str]]:
+        # e.g., `GET_STATUS PLAYING game_boy,Pokemon Yellow,crc32=7d527d62`
+        reply = await self.request(GET_STATUS)
+        status = reply[len(GET_STATUS) + 1 :].strip()
+        state, _, info = status.partition(' ')
+        if state == 'CONTENTLESS':
+            return state, None
+        parts = info.split(',')
+        if len(parts) < 2:
+            raise RetroArchError.bad_reply(GET_STATUS, reply)
+        return state, parts[1]
+
+    async def get_config_param(self, name: str) -> str:
+        command = f'{GET_CONFIG_PARAM} {name}'
+        reply = await self.request(command)
+        return reply[len(command) + 1 :].strip()
+
+    async def read_core_memory(self, address: int, length: int) -> bytes:
+        # e.g., `READ_CORE_MEMORY d158 80 92 87` or `READ_CORE_MEMORY d158 -1 no memory map`
+        command = f'{READ_CORE_MEMORY} {address:x} {length}'
+        reply = await self.request(command)
+        values = reply.split()[2:]
+        if values and values[0] == '-1':
+            raise RetroArchError.bad_reply(command, reply)
+        try:
+            return bytes(int(value, 16) for value in values)
+        except ValueError:
+            raise RetroArchError.bad_reply(command, reply) from None
+
+    async def read_core_memory_many(self, reads: Iterable[Tuple[int, int]]) -> List[bytes]:
+        # all reads are in flight at once, instead of one round trip each
+        return list(
+            await asyncio.gather(*(self.read_core_memory(address, n) for address, n in reads))
+        )
+
+    def save_state(self):
+        self.send(SAVE_STATE)
+        # no reply
+
+    def _on_reply(self, data: bytes):
+        reply = data.decode('utf-8', errors='replace').rstrip('\n')
+        key = reply_key(reply)
+        queue = self._pending.get(key)
+        while queue:
+            future = queue.popleft()
+            if not future.done():
+                future.set_result(reply)
+                return
+        logger.debug(f'unexpected reply: {reply!r}')
+
+    def _on_error(self, exc: Exception):
+        logger.debug(f'socket error: {exc}')
+        self._fail_pending(ConnectionError(exc))
+
+    def _fail_pending(self, error: Exception):
+        for queue in self._pending.values():
+            while queue:
+                future = queue.popleft()
+                if not future.done():
+                    future.set_exception(error)
+
+
+@define
+class RetroArchClient:
+    """Thread-safe, synchronous wrapper around `AsyncRetroArchClient`.
+
+    Runs the asynchronous client on an event loop in a background thread.
+    Requests block the calling thread until the reply arrives or times out.
+    `send` and `save_state` never block.
+    """
+
+    host: str = '127.0.0.1'
+    port: int = 55355
+    timeout: float = DEFAULT_TIMEOUT
+    client: AsyncRetroArchClient = field(init=False)
+    _loop: Optional[asyncio.AbstractEventLoop] = field(init=False, default=None, repr=False)
+    _thread: Optional[Thread] = field(init=False, default=None, repr=False)
+
+    @client.default
+    def _make_client(self) -> AsyncRetroArchClient:
+        return AsyncRetroArchClient(self.host, self.port, timeout=self.timeout)
+
+    @property
+    def address(self) -> str:
+        return self.client.address
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = Thread(target=self._loop.run_forever, name='retroarch', daemon=True)
+            self._thread.start()
+            self._call(self.client.connect())
+
+    def stop(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self.client.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=self.timeout)
+            self._thread = None
+            self._loop.close()
+            self._loop = None
+
+    def send(self, command: str):
+        self._check_running()
+        self._loop.call_soon_threadsafe(self._send, command)
+
+    def save_state(self):
+        self.send(SAVE_STATE)
+
+    def request(self, command: str) -> str:
+        return self._call(self.client.request(command))
+
+    def get_status(self) -> Tuple[str, Optional[str]]:
+        return self._call(self.client.get_status())
+
+    def get_config_param(self, name: str) -> str:
+        return self._call(self.client.get_config_param(name))
+
+    def read_core_memory(self, address: int, length: int) -> bytes:
+        return self._call(self.client.read_core_memory(address, length))
+
+    def read_core_memory_many(self, reads: Iterable[Tuple[int, int]]) -> List[bytes]:
+        return self._call(self.client.read_core_memory_many(reads))
+
+    def _call(self, coroutine: Awaitable) -> Any:
+        self._check_running(coroutine)
+        name = getattr(coroutine, '__qualname__', 'request')
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        # the coroutine enforces its own timeout, this is only a safety net
+        try:
+            return future.result(timeout=self.timeout * 2.0)
+        except concurrent.futures.TimeoutError:
+            # not the builtin `TimeoutError` before Python 3.11
+            future.cancel()
+            raise RetroArchError.timeout(name, self.address) from None
+
+    def _send(self, command: str):
+        try:
+            self.client.send(command)
+        except (RetroArchError, OSError) as e:
+            logger.error(f'{command}: {e}')
+
+    def _check_running(self, coroutine: Optional[Awaitable] = None):
+        if self._loop is None:
+            if coroutine is not None:
+                coroutine.close()
+            raise RetroArchError.not_connected(self.address)
+
 
 @define
 class RetroArchBridge:
     rom: Optional[str] = field(init=False, default=None)
     savefile_dir: Optional[Path] = field(init=False, default=None)
-    _socket: Optional[UdpConnection] = field(init=False, default=None, repr=False)
+    memory_polling: bool = field(init=False, default=False)
+    poll_rate: float = field(init=False, default=DEFAULT_POLL_RATE)
+    client: Optional[RetroArchClient] = field(init=False, default=None, repr=False)
 
     def setup(self, settings: Mapping[str, Any]):
         logger.info('setting up')
@@ -56,7 +330,11 @@ class RetroArchBridge:
         host = settings['host']
         port = settings['port']
         timeout = settings['timeout']
-        self._socket = UdpConnection(host, port, timeout=timeout)
+        self.memory_polling = settings.get('memory_polling', False)
+        self.poll_rate = settings.get('poll_rate', DEFAULT_POLL_RATE)
+        self.client = RetroArchClient(host, port, timeout=timeout)
+        logger.info(f'connecting to {self.client.address}')
+        self.client.start()
         self.request_status()
         self.request_savefile_dir()
 
@@ -69,75 +347,66 @@ class RetroArchBridge:
 
     def cleanup(self):
         logger.info('cleaning up')
-        logger.info(f'disconnecting from {self._socket.address}')
-        self._socket.disconnect()
-        self._socket = None
+        logger.info(f'disconnecting from {self.client.address}')
+        self.client.stop()
+        self.client = None
 
     def request_status(self) -> str:
-        with SleepLoop(n=3, delay=1.0) as loop:
-            while loop.iterate():
-                logger.info(f'connecting to {self._socket.address}')
-                try:
-                    self._socket.connect()
-                    logger.info('requesting status')
-                    self._socket.send(GET_STATUS)
-                    reply = self._socket.receive(bytes=4096)
-                except ConnectionError as e:
-                    logger.error(f'failed to establish a connection: {e}')
-                    continue
-
-                if not reply.startswith('GET_STATUS '):
-                    logger.warning('unexpected response: ' + reply)
-                else:
-                    reply = reply[11:]
-                    if reply.startswith('CONTENTLESS'):
-                        logger.warning('no ROM content')
-                    else:
-                        parts = reply.split(',')
-                        self.rom = parts[1]
-                        logger.info('got ROM: ' + self.rom)
-                        return self.rom  # break the loop
+        for _ in range(N_ATTEMPTS):
+            logger.info('requesting status')
+            try:
+                state, rom = self.client.get_status()
+            except (RetroArchError, ConnectionError) as e:
+                logger.error(f'failed to get status: {e}')
+                continue
+            if rom is None:
+                logger.warning(f'no ROM content ({state})')
+                continue
+            self.rom = rom
+            logger.info('got ROM: ' + self.rom)
+            return self.rom
         logger.warning('unable to get RetroArch status')
-        raise RetroArchError.get_rom(self._socket.address)
+        raise RetroArchError.get_rom(self.client.address)
 
-    def request_savefile_dir(self) -> str:
-        with SleepLoop(n=3, delay=1.0) as loop:
-            while loop.iterate():
-                logger.info(f'connecting to {self._socket.address}')
-                try:
-                    self._socket.connect()
-                    logger.info('requesting save file directory')
-                    self._socket.send(GET_PARAM_SAVE_DIR)
-                    reply = self._socket.receive(bytes=8192)
-                except ConnectionError as e:
-                    logger.error(f'failed to establish a connection: {e}')
-
-                if not reply.startswith('GET_CONFIG_PARAM savefile_directory '):
-                    logger.warning('unexpected response: ' + reply)
-                else:
-                    reply = reply[36:].strip()
-                    self.savefile_dir = Path(reply)
-                    logger.info(f'got save file directory: {self.savefile_dir}')
-                    return self.savefile_dir  # break the loop
+    def request_savefile_dir(self) -> Path:
+        for _ in range(N_ATTEMPTS):
+            logger.info('requesting save file directory')
+            try:
+                reply = self.client.get_config_param(PARAM_SAVE_DIR)
+            except (RetroArchError, ConnectionError) as e:
+                logger.error(f'failed to get save file directory: {e}')
+                continue
+            self.savefile_dir = Path(reply)
+            logger.info(f'got save file directory: {self.savefile_dir}')
+            return self.savefile_dir
         logger.warning('unable to get RetroArch save file directory')
-        raise RetroArchError.get_savefile_dir(self._socket.address)
+        raise RetroArchError.get_savefile_dir(self.client.address)
 
     def request_save_state(self):
-        with SleepLoop(n=3, delay=0.1) as loop:
-            while loop.iterate():
-                try:
-                    self._socket.connect()
-                    logger.info('requesting save state')
-                    self._socket.send(SAVE_STATE)
-                    # no reply
-                    # logger.info('requesting increment save slot')
-                    # self._socket.send(b'STATE_SLOT_PLUS\n')
-                    # no reply
-                    return
-                except ConnectionError as e:
-                    logger.error(f'failed to establish a connection: {e}')
-        logger.warning('unable to save state')
-        raise RetroArchError.save_state(self._socket.address)
+        # fire-and-forget, safe to call from event handlers
+        if self.client is None or not self.client.is_running:
+            raise RetroArchError.save_state('RetroArch')
+        logger.info('requesting save state')
+        self.client.save_state()
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def reply_key(line: str) -> ReplyKey:
+    parts = line.split(maxsplit=2)
+    if not parts:
+        return ()
+    if parts[0] == READ_CORE_MEMORY and len(parts) > 1:
+        try:
+            return (parts[0], f'{int(parts[1], 16):x}')
+        except ValueError:
+            return (parts[0], parts[1])
+    if parts[0] == GET_CONFIG_PARAM and len(parts) > 1:
+        return (parts[0], parts[1])
+    return (parts[0],)
 
 
 def new():
@@ -0,0 +1,163 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Callable, Final, List
+
+import logging
+from threading import Event
+import time
+
+from attrs import define, field
+
+###############################################################################
+# Constants
+###############################################################################
+
+logger: Final[logging.Logger] = logging.getLogger(__name__)
+
+MAX_IDLE_SLEEP: Final[float] = 1.0  # seconds
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+@define
+class ScheduledTask:
+    name: str
+    callback: Callable  # callback(delta)
+    period: float  # seconds
+    on_wake: bool = False
+    next_due: float = 0.0
+    last_run: float = field(default=0.0, repr=False)
+    runs: int = field(default=0, repr=False)
+    overruns: int = field(default=0, repr=False)
+    total_duration: float = field(default=0.0, repr=False)
+    max_duration: float = field(default=0.0, repr=False)
+    max_lateness: float = field(default=0.0, repr=False)
+
+    @property
+    def rate(self) -> float:
+        return 1.0 / self.period
+
+    @property
+    def mean_duration(self) -> float:
+        return self.total_duration / self.runs if self.runs > 0 else 0.0
+
+    def stats(self) -> str:
+        return (
+            f'{self.name}: {self.runs} runs at {self.rate:g} Hz, {self.overruns} overruns,'
+            f' mean {self.mean_duration * 1000.0:.3f} ms,'
+            f' max {self.max_duration * 1000.0:.3f} ms,'
+            f' max lateness {self.max_lateness * 1000.0:.3f} ms'
+        )
+
+
+@define
+class Scheduler:
+    """Runs periodic tasks on absolute deadlines, sleeping in between.
+
+    Each task has its own update rate. Deadlines advance by whole periods,
+    so the work done by a task does not make its period drift. A task that
+    misses its next deadline counts as an overrun and is rescheduled one
+    period after it finished, instead of running repeatedly to catch up.
+
+    Tasks added with `on_wake=True` also run as soon as another thread
+    calls `wake`, e.g., when new data arrives. The scheduler sleeps until
+    the next deadline or wake up, whichever comes first.
+
+    Usage:
+
+    ```
+    scheduler = Scheduler()
+    scheduler.add('game', game.update, rate=50.0, on_wake=True)
+    scheduler.add('backup', backup.update, rate=1.0)
+    scheduler.run()  # until `scheduler.stop()` is called
+    ```
+    """
+
+    tasks: List[ScheduledTask] = field(factory=list)
+    clock: Callable = field(default=time.monotonic, repr=False)
+    _wakeup: Event = field(init=False, factory=Event, eq=False, repr=False)
+    _running: bool = field(init=False, default=False, eq=False, repr=False)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def add(
+        self, name: str, callback: Callable, rate: float, on_wake: bool = False
+    ) -> ScheduledTask:
+        if rate <= 0.0:
+            raise ValueError(f'{name}: expected a positive update rate, got {rate}')
+        now = self.clock()
+        task = ScheduledTask(name, callback, 1.0 / rate, on_wake=on_wake, next_due=now)
+        task.last_run = now
+        self.tasks.append(task)
+        return task
+
+    def wake(self):
+        # thread-safe
+        self._wakeup.set()
+
+    def stop(self):
+        # thread-safe
+        self._running = False
+        self._wakeup.set()
+
+    def run(self):
+        self._running = True
+        while self._running:
+            self.run_pending()
+            timeout = self.time_until_next_due()
+            if timeout > 0.0:
+                self._wakeup.wait(timeout)
+
+    def run_pending(self) -> int:
+        woken = self._wakeup.is_set()
+        self._wakeup.clear()
+        n = 0
+        for task in self.tasks:
+            now = self.clock()
+            if now >= task.next_due:
+                self._run_task(task, now, True)
+                n += 1
+            elif woken and task.on_wake:
+                self._run_task(task, now, False)
+                n += 1
+        return n
+
+    def time_until_next_due(self) -> float:
+        if not self.tasks:
+            return MAX_IDLE_SLEEP
+        next_due = min(task.next_due for task in self.tasks)
+        return min(MAX_IDLE_SLEEP, next_due - self.clock())
+
+    def log_stats(self):
+        for task in self.tasks:
+            logger.info(task.stats())
+
+    def _run_task(self, task: ScheduledTask, now: float, on_schedule: bool):
+        delta = now - task.last_run
+        task.last_run = now
+        task.callback(delta)
+        end = self.clock()
+        duration = end - now
+        task.runs += 1
+        task.total_duration += duration
+        if duration > task.max_duration:
+            task.max_duration = duration
+        if not on_schedule:
+            return
+        lateness = now - task.next_due
+        if lateness > task.max_lateness:
+            task.max_lateness = lateness
+        task.next_due += task.period
+        if task.next_due <= end:
+            task.overruns += 1
+            logger.debug(f'{task.name}: overrun ({duration * 1000.0:.3f} ms)')
+            task.next_due = end + task.period
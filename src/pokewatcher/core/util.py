@@ -5,13 +5,24 @@
 # Imports
 ###############################################################################
 
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Mapping, Optional, Union
 
+from collections import defaultdict
+from functools import partial
+import json
+import operator
 import socket
 import time
 
 from attrs import define, field
 
+from pokewatcher.errors import PokeWatcherDataError
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
 ###############################################################################
 # Useful Functions
 ###############################################################################
@@ -29,6 +40,20 @@ def identity(x: Any) -> Any:
     return x
 
 
+def json_loads(data: Union[bytes, str]) -> Any:
+    # parse straight from bytes, without decoding them to `str` first
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    # compact UTF-8 JSON, the same with or without `orjson`
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
 ###############################################################################
 # Data Handling
 ###############################################################################
@@ -36,35 +61,44 @@ def identity(x: Any) -> Any:
 
 @define
 class Attribute:
+    """A field within nested data, e.g., `player.team.slot1.level`.
+
+    The path is resolved once, when the attribute is created, and `get` and
+    `set` are bound to the last object on the path: item access for mappings,
+    attribute access otherwise. Each call is then a single direct call.
+    Paths that do not exist raise `PokeWatcherDataError` right away.
+    """
+
     obj: Any
     name: str
     path: str = ''
+    get: Callable[[], Any] = field(init=False, eq=False, repr=False)
+    set: Callable[[Any], None] = field(init=False, eq=False, repr=False)
 
     def __attrs_post_init__(self):
         if not self.path:
             self.path = self.name
-
-    def get(self) -> Any:
-        try:
-            return getattr(self.obj, self.name)
-        except AttributeError:
-            return self.obj[self.name]
-
-    def set(self, value: Any) -> None:
-        try:
-            self.obj[self.name] = value
-        except TypeError:
-            setattr(self.obj, self.name, value)
+        obj = self.obj
+        name = self.name
+        if isinstance(obj, Mapping):
+            if name not in obj and not isinstance(obj, defaultdict):
+                raise PokeWatcherDataError.bad_path(self.path, name)
+            self.get = partial(operator.getitem, obj, name)
+            self.set = partial(operator.setitem, obj, name)
+        else:
+            if not hasattr(obj, name):
+                raise PokeWatcherDataError.bad_path(self.path, name)
+            self.get = partial(getattr, obj, name)
+            self.set = partial(setattr, obj, name)
 
     @classmethod
     def of(cls, obj: Any, path: str) -> 'Attribute':
         parts = path.split('.')
         for attr in parts[:-1]:
             try:
-                obj = getattr(obj, attr)
-            except AttributeError:
-                obj = obj[attr]
-        # assert hasattr(obj, parts[-1])
+                obj = obj[attr] if isinstance(obj, Mapping) else getattr(obj, attr)
+            except (AttributeError, KeyError):
+                raise PokeWatcherDataError.bad_path(path, attr) from None
         return cls(obj, parts[-1], path=path)
 
 
@@ -127,6 +161,9 @@ class TimeRecord:
 
         return cls(hours=h, minutes=m, seconds=s, millis=ms)
 
+    def to_float_seconds(self) -> float:
+        return self.hours * 3600 + self.minutes * 60 + self.seconds + self.millis / 1000.0
+
     @classmethod
     def converter(cls, value: Any) -> 'TimeRecord':
         if isinstance(value, TimeRecord):
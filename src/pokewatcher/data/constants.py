@@ -179,70 +179,70 @@ VAR_BATTLE_TRAINER_NAME: Final[str] = 'battle.trainer.name'
 VAR_BATTLE_TRAINER_ID: Final[str] = 'battle.trainer.number'
 VAR_BATTLE_TRAINER_CLASS: Final[str] = 'battle.trainer.trainer_class'
 
-VAR_BATTLE_TRAINER_MON1_SPECIES: Final[str] = 'battle.trainer.slot1.species'
-VAR_BATTLE_TRAINER_MON1_NAME: Final[str] = 'battle.trainer.slot1.name'
-VAR_BATTLE_TRAINER_MON1_LEVEL: Final[str] = 'battle.trainer.slot1.level'
-VAR_BATTLE_TRAINER_MON1_HP: Final[str] = 'battle.trainer.slot1.hp'
-VAR_BATTLE_TRAINER_MON1_MAX_HP: Final[str] = 'battle.trainer.slot1.stats.hp'
-VAR_BATTLE_TRAINER_MON1_ATTACK: Final[str] = 'battle.trainer.slot1.stats.attack'
-VAR_BATTLE_TRAINER_MON1_DEFENSE: Final[str] = 'battle.trainer.slot1.stats.defense'
-VAR_BATTLE_TRAINER_MON1_SPEED: Final[str] = 'battle.trainer.slot1.stats.speed'
-VAR_BATTLE_TRAINER_MON1_SP_ATTACK: Final[str] = 'battle.trainer.slot1.stats.sp_attack'
-VAR_BATTLE_TRAINER_MON1_SP_DEFENSE: Final[str] = 'battle.trainer.slot1.stats.sp_defense'
-
-VAR_BATTLE_TRAINER_MON2_SPECIES: Final[str] = 'battle.trainer.slot2.species'
-VAR_BATTLE_TRAINER_MON2_NAME: Final[str] = 'battle.trainer.slot2.name'
-VAR_BATTLE_TRAINER_MON2_LEVEL: Final[str] = 'battle.trainer.slot2.level'
-VAR_BATTLE_TRAINER_MON2_HP: Final[str] = 'battle.trainer.slot2.hp'
-VAR_BATTLE_TRAINER_MON2_MAX_HP: Final[str] = 'battle.trainer.slot2.stats.hp'
-VAR_BATTLE_TRAINER_MON2_ATTACK: Final[str] = 'battle.trainer.slot2.stats.attack'
-VAR_BATTLE_TRAINER_MON2_DEFENSE: Final[str] = 'battle.trainer.slot2.stats.defense'
-VAR_BATTLE_TRAINER_MON2_SPEED: Final[str] = 'battle.trainer.slot2.stats.speed'
-VAR_BATTLE_TRAINER_MON2_SP_ATTACK: Final[str] = 'battle.trainer.slot2.stats.sp_attack'
-VAR_BATTLE_TRAINER_MON2_SP_DEFENSE: Final[str] = 'battle.trainer.slot2.stats.sp_defense'
-
-VAR_BATTLE_TRAINER_MON3_SPECIES: Final[str] = 'battle.trainer.slot3.species'
-VAR_BATTLE_TRAINER_MON3_NAME: Final[str] = 'battle.trainer.slot3.name'
-VAR_BATTLE_TRAINER_MON3_LEVEL: Final[str] = 'battle.trainer.slot3.level'
-VAR_BATTLE_TRAINER_MON3_HP: Final[str] = 'battle.trainer.slot3.hp'
-VAR_BATTLE_TRAINER_MON3_MAX_HP: Final[str] = 'battle.trainer.slot3.stats.hp'
-VAR_BATTLE_TRAINER_MON3_ATTACK: Final[str] = 'battle.trainer.slot3.stats.attack'
-VAR_BATTLE_TRAINER_MON3_DEFENSE: Final[str] = 'battle.trainer.slot3.stats.defense'
-VAR_BATTLE_TRAINER_MON3_SPEED: Final[str] = 'battle.trainer.slot3.stats.speed'
-VAR_BATTLE_TRAINER_MON3_SP_ATTACK: Final[str] = 'battle.trainer.slot3.stats.sp_attack'
-VAR_BATTLE_TRAINER_MON3_SP_DEFENSE: Final[str] = 'battle.trainer.slot3.stats.sp_defense'
-
-VAR_BATTLE_TRAINER_MON4_SPECIES: Final[str] = 'battle.trainer.slot4.species'
-VAR_BATTLE_TRAINER_MON4_NAME: Final[str] = 'battle.trainer.slot4.name'
-VAR_BATTLE_TRAINER_MON4_LEVEL: Final[str] = 'battle.trainer.slot4.level'
-VAR_BATTLE_TRAINER_MON4_HP: Final[str] = 'battle.trainer.slot4.hp'
-VAR_BATTLE_TRAINER_MON4_MAX_HP: Final[str] = 'battle.trainer.slot4.stats.hp'
-VAR_BATTLE_TRAINER_MON4_ATTACK: Final[str] = 'battle.trainer.slot4.stats.attack'
-VAR_BATTLE_TRAINER_MON4_DEFENSE: Final[str] = 'battle.trainer.slot4.stats.defense'
-VAR_BATTLE_TRAINER_MON4_SPEED: Final[str] = 'battle.trainer.slot4.stats.speed'
-VAR_BATTLE_TRAINER_MON4_SP_ATTACK: Final[str] = 'battle.trainer.slot4.stats.sp_attack'
-VAR_BATTLE_TRAINER_MON4_SP_DEFENSE: Final[str] = 'battle.trainer.slot4.stats.sp_defense'
-
-VAR_BATTLE_TRAINER_MON5_SPECIES: Final[str] = 'battle.trainer.slot5.species'
-VAR_BATTLE_TRAINER_MON5_NAME: Final[str] = 'battle.trainer.slot5.name'
-VAR_BATTLE_TRAINER_MON5_LEVEL: Final[str] = 'battle.trainer.slot5.level'
-VAR_BATTLE_TRAINER_MON5_HP: Final[str] = 'battle.trainer.slot5.hp'
-VAR_BATTLE_TRAINER_MON5_MAX_HP: Final[str] = 'battle.trainer.slot5.stats.hp'
-VAR_BATTLE_TRAINER_MON5_ATTACK: Final[str] = 'battle.trainer.slot5.stats.attack'
-VAR_BATTLE_TRAINER_MON5_DEFENSE: Final[str] = 'battle.trainer.slot5.stats.defense'
-VAR_BATTLE_TRAINER_MON5_SPEED: Final[str] = 'battle.trainer.slot5.stats.speed'
-VAR_BATTLE_TRAINER_MON5_SP_ATTACK: Final[str] = 'battle.trainer.slot5.stats.sp_attack'
-VAR_BATTLE_TRAINER_MON5_SP_DEFENSE: Final[str] = 'battle.trainer.slot5.stats.sp_defense'
-
-VAR_BATTLE_TRAINER_MON6_SPECIES: Final[str] = 'battle.trainer.slot6.species'
-VAR_BATTLE_TRAINER_MON6_NAME: Final[str] = 'battle.trainer.slot6.name'
-VAR_BATTLE_TRAINER_MON6_LEVEL: Final[str] = 'battle.trainer.slot6.level'
-VAR_BATTLE_TRAINER_MON6_HP: Final[str] = 'battle.trainer.slot6.hp'
-VAR_BATTLE_TRAINER_MON6_MAX_HP: Final[str] = 'battle.trainer.slot6.stats.hp'
-VAR_BATTLE_TRAINER_MON6_ATTACK: Final[str] = 'battle.trainer.slot6.stats.attack'
-VAR_BATTLE_TRAINER_MON6_DEFENSE: Final[str] = 'battle.trainer.slot6.stats.defense'
-VAR_BATTLE_TRAINER_MON6_SPEED: Final[str] = 'battle.trainer.slot6.stats.speed'
-VAR_BATTLE_TRAINER_MON6_SP_ATTACK: Final[str] = 'battle.trainer.slot6.stats.sp_attack'
-VAR_BATTLE_TRAINER_MON6_SP_DEFENSE: Final[str] = 'battle.trainer.slot6.stats.sp_defense'
+VAR_BATTLE_TRAINER_MON1_SPECIES: Final[str] = 'battle.trainer.team.slot1.species'
+VAR_BATTLE_TRAINER_MON1_NAME: Final[str] = 'battle.trainer.team.slot1.name'
+VAR_BATTLE_TRAINER_MON1_LEVEL: Final[str] = 'battle.trainer.team.slot1.level'
+VAR_BATTLE_TRAINER_MON1_HP: Final[str] = 'battle.trainer.team.slot1.hp'
+VAR_BATTLE_TRAINER_MON1_MAX_HP: Final[str] = 'battle.trainer.team.slot1.stats.hp'
+VAR_BATTLE_TRAINER_MON1_ATTACK: Final[str] = 'battle.trainer.team.slot1.stats.attack'
+VAR_BATTLE_TRAINER_MON1_DEFENSE: Final[str] = 'battle.trainer.team.slot1.stats.defense'
+VAR_BATTLE_TRAINER_MON1_SPEED: Final[str] = 'battle.trainer.team.slot1.stats.speed'
+VAR_BATTLE_TRAINER_MON1_SP_ATTACK: Final[str] = 'battle.trainer.team.slot1.stats.sp_attack'
+VAR_BATTLE_TRAINER_MON1_SP_DEFENSE: Final[str] = 'battle.trainer.team.slot1.stats.sp_defense'
+
+VAR_BATTLE_TRAINER_MON2_SPECIES: Final[str] = 'battle.trainer.team.slot2.species'
+VAR_BATTLE_TRAINER_MON2_NAME: Final[str] = 'battle.trainer.team.slot2.name'
+VAR_BATTLE_TRAINER_MON2_LEVEL: Final[str] = 'battle.trainer.team.slot2.level'
+VAR_BATTLE_TRAINER_MON2_HP: Final[str] = 'battle.trainer.team.slot2.hp'
+VAR_BATTLE_TRAINER_MON2_MAX_HP: Final[str] = 'battle.trainer.team.slot2.stats.hp'
+VAR_BATTLE_TRAINER_MON2_ATTACK: Final[str] = 'battle.trainer.team.slot2.stats.attack'
+VAR_BATTLE_TRAINER_MON2_DEFENSE: Final[str] = 'battle.trainer.team.slot2.stats.defense'
+VAR_BATTLE_TRAINER_MON2_SPEED: Final[str] = 'battle.trainer.team.slot2.stats.speed'
+VAR_BATTLE_TRAINER_MON2_SP_ATTACK: Final[str] = 'battle.trainer.team.slot2.stats.sp_attack'
+VAR_BATTLE_TRAINER_MON2_SP_DEFENSE: Final[str] = 'battle.trainer.team.slot2.stats.sp_defense'
+
+VAR_BATTLE_TRAINER_MON3_SPECIES: Final[str] = 'battle.trainer.team.slot3.species'
+VAR_BATTLE_TRAINER_MON3_NAME: Final[str] = 'battle.trainer.team.slot3.name'
+VAR_BATTLE_TRAINER_MON3_LEVEL: Final[str] = 'battle.trainer.team.slot3.level'
+VAR_BATTLE_TRAINER_MON3_HP: Final[str] = 'battle.trainer.team.slot3.hp'
+VAR_BATTLE_TRAINER_MON3_MAX_HP: Final[str] = 'battle.trainer.team.slot3.stats.hp'
+VAR_BATTLE_TRAINER_MON3_ATTACK: Final[str] = 'battle.trainer.team.slot3.stats.attack'
+VAR_BATTLE_TRAINER_MON3_DEFENSE: Final[str] = 'battle.trainer.team.slot3.stats.defense'
+VAR_BATTLE_TRAINER_MON3_SPEED: Final[str] = 'battle.trainer.team.slot3.stats.speed'
+VAR_BATTLE_TRAINER_MON3_SP_ATTACK: Final[str] = 'battle.trainer.team.slot3.stats.sp_attack'
+VAR_BATTLE_TRAINER_MON3_SP_DEFENSE: Final[str] = 'battle.trainer.team.slot3.stats.sp_defense'
+
+VAR_BATTLE_TRAINER_MON4_SPECIES: Final[str] = 'battle.trainer.team.slot4.species'
+VAR_BATTLE_TRAINER_MON4_NAME: Final[str] = 'battle.trainer.team.slot4.name'
+VAR_BATTLE_TRAINER_MON4_LEVEL: Final[str] = 'battle.trainer.team.slot4.level'
+VAR_BATTLE_TRAINER_MON4_HP: Final[str] = 'battle.trainer.team.slot4.hp'
+VAR_BATTLE_TRAINER_MON4_MAX_HP: Final[str] = 'battle.trainer.team.slot4.stats.hp'
+VAR_BATTLE_TRAINER_MON4_ATTACK: Final[str] = 'battle.trainer.team.slot4.stats.attack'
+VAR_BATTLE_TRAINER_MON4_DEFENSE: Final[str] = 'battle.trainer.team.slot4.stats.defense'
+VAR_BATTLE_TRAINER_MON4_SPEED: Final[str] = 'battle.trainer.team.slot4.stats.speed'
+VAR_BATTLE_TRAINER_MON4_SP_ATTACK: Final[str] = 'battle.trainer.team.slot4.stats.sp_attack'
+VAR_BATTLE_TRAINER_MON4_SP_DEFENSE: Final[str] = 'battle.trainer.team.slot4.stats.sp_defense'
+
+VAR_BATTLE_TRAINER_MON5_SPECIES: Final[str] = 'battle.trainer.team.slot5.species'
+VAR_BATTLE_TRAINER_MON5_NAME: Final[str] = 'battle.trainer.team.slot5.name'
+VAR_BATTLE_TRAINER_MON5_LEVEL: Final[str] = 'battle.trainer.team.slot5.level'
+VAR_BATTLE_TRAINER_MON5_HP: Final[str] = 'battle.trainer.team.slot5.hp'
+VAR_BATTLE_TRAINER_MON5_MAX_HP: Final[str] = 'battle.trainer.team.slot5.stats.hp'
+VAR_BATTLE_TRAINER_MON5_ATTACK: Final[str] = 'battle.trainer.team.slot5.stats.attack'
+VAR_BATTLE_TRAINER_MON5_DEFENSE: Final[str] = 'battle.trainer.team.slot5.stats.defense'
+VAR_BATTLE_TRAINER_MON5_SPEED: Final[str] = 'battle.trainer.team.slot5.stats.speed'
+VAR_BATTLE_TRAINER_MON5_SP_ATTACK: Final[str] = 'battle.trainer.team.slot5.stats.sp_attack'
+VAR_BATTLE_TRAINER_MON5_SP_DEFENSE: Final[str] = 'battle.trainer.team.slot5.stats.sp_defense'
+
+VAR_BATTLE_TRAINER_MON6_SPECIES: Final[str] = 'battle.trainer.team.slot6.species'
+VAR_BATTLE_TRAINER_MON6_NAME: Final[str] = 'battle.trainer.team.slot6.name'
+VAR_BATTLE_TRAINER_MON6_LEVEL: Final[str] = 'battle.trainer.team.slot6.level'
+VAR_BATTLE_TRAINER_MON6_HP: Final[str] = 'battle.trainer.team.slot6.hp'
+VAR_BATTLE_TRAINER_MON6_MAX_HP: Final[str] = 'battle.trainer.team.slot6.stats.hp'
+VAR_BATTLE_TRAINER_MON6_ATTACK: Final[str] = 'battle.trainer.team.slot6.stats.attack'
+VAR_BATTLE_TRAINER_MON6_DEFENSE: Final[str] = 'battle.trainer.team.slot6.stats.defense'
+VAR_BATTLE_TRAINER_MON6_SPEED: Final[str] = 'battle.trainer.team.slot6.stats.speed'
+VAR_BATTLE_TRAINER_MON6_SP_ATTACK: Final[str] = 'battle.trainer.team.slot6.stats.sp_attack'
+VAR_BATTLE_TRAINER_MON6_SP_DEFENSE: Final[str] = 'battle.trainer.team.slot6.stats.sp_defense'
 
 VARIABLES: Final[Tuple] = tuple(v for k, v in list(globals().items()) if k.startswith('VAR_'))
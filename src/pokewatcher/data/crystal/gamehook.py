@@ -87,6 +87,11 @@ P_KANTO_BADGE6: Final[str] = 'player.badges.badge14'
 P_KANTO_BADGE7: Final[str] = 'player.badges.badge15'
 P_KANTO_BADGE8: Final[str] = 'player.badges.badge16'
 
+P_MAP: Final[str] = 'overworld.map'  # group
+P_MON_STATS: Final[str] = 'player.team.0.stats'  # group
+P_BADGES: Final[str] = 'player.badges'  # group
+P_GAME_TIME: Final[str] = 'gameTime'  # group
+
 PROPERTIES: Final[Mapping[str, Mapping[str, Any]]] = {
     P_PLAYER_ID: {
         'type': 'int',
@@ -337,6 +342,19 @@ PROPERTIES: Final[Mapping[str, Mapping[str, Any]]] = {
         'bytes': True,
         'store': game_data.VAR_PLAYER_BADGE8,
     },
+    # changes to any of these are applied together, as a single transaction
+    P_MAP: {
+        'group': [P_MAP_GROUP, P_MAP_NUMBER],
+    },
+    P_MON_STATS: {
+        'group': [P_MON_ATK, P_MON_DEF, P_MON_SPD, P_MON_SPATK, P_MON_SPDEF],
+    },
+    P_BADGES: {
+        'group': [P_BADGE1, P_BADGE2, P_BADGE3, P_BADGE4, P_BADGE5, P_BADGE6, P_BADGE7, P_BADGE8],
+    },
+    P_GAME_TIME: {
+        'group': [P_GAME_TIME_HOURS, P_GAME_TIME_MINUTES, P_GAME_TIME_SECONDS, P_GAME_TIME_FRAMES],
+    },
 }
 
 ###############################################################################
@@ -104,6 +104,7 @@ PROPERTIES: Final[Mapping[str, Mapping[str, Any]]] = {
         'type': 'int',
         'bytes': True,
         'store': game_data.VAR_GAME_TIME_FRAMES,
+        'coalesce_ms': 100,
     },
     P_SPECIES: {
         'type': 'string',
@@ -5,15 +5,33 @@
 # Imports
 ###############################################################################
 
-from typing import Any, Callable, Final, Iterable, List, Mapping, Optional
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Final,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from contextlib import contextmanager
 import logging
+import struct
+import time
 
 from attrs import define, field
 
 from pokewatcher.core.util import Attribute, identity, noop
 from pokewatcher.data.structs import GameData
-from pokewatcher.events import on_data_changed
+from pokewatcher.errors import PokeWatcherDataError
+from pokewatcher.events import on_data_batch, on_data_changed
 from pokewatcher.logic.fsm import StateMachine
 
 ###############################################################################
@@ -79,9 +97,63 @@ PROCESSORS: Final[Mapping[str, Callable]] = {
 ###############################################################################
 
 
+@define
+class Transaction:
+    """Property updates applied as a single change, see `DataHandler.transaction`.
+
+    While active, stored values emit nothing and FSM labels are held back.
+    On commit, all changed paths are emitted at once with `on_data_batch`,
+    and then one by one with `on_data_changed`, each with its first previous
+    value and its last value. Then labels are fed in the order in which
+    properties were configured. Every distinct value of a label is fed in
+    order, so that edges such as 0 -> 1 -> 0 are not lost.
+    """
+
+    active: bool = False
+    depth: int = 0
+    group: Optional[str] = None  # an implicit transaction, see `DataHandler.group`
+    missing: Set[str] = field(factory=set)  # group members that did not change yet
+    changes: Dict[str, List[Any]] = field(factory=dict)  # path -> [previous, value]
+    # rank -> [(react, previous, value)]
+    reactions: Dict[int, List[Tuple[Callable, Any, Any]]] = field(factory=dict)
+
+    def record(self, path: str, previous: Any, value: Any):
+        change = self.changes.get(path)
+        if change is None:
+            self.changes[path] = [previous, value]
+        else:
+            change[1] = value
+
+    def defer(self, rank: int, react: Callable, previous: Any, value: Any):
+        reactions = self.reactions.get(rank)
+        if reactions is None:
+            self.reactions[rank] = [(react, previous, value)]
+        elif reactions[-1][2] != value:
+            reactions.append((react, previous, value))
+
+    def commit(self):
+        changes = self.changes
+        reactions = self.reactions
+        self.changes = {}
+        self.reactions = {}
+        self.group = None
+        self.missing.clear()
+        self.active = self.depth > 0
+        batch = {path: (prev, value) for path, (prev, value) in changes.items() if prev != value}
+        if batch:
+            on_data_batch.emit(batch)
+            emit = on_data_changed.emit
+            for path, (prev, value) in batch.items():
+                emit(path, prev, value)
+        for rank in sorted(reactions):
+            for react, previous, value in reactions[rank]:
+                react(previous, value)
+
+
 @define
 class GameHookProperty:
     name: str
+    rank: int = 0  # configuration order
     previous: Any = None
     default: Any = None
     uses_bytes: bool = False
@@ -91,6 +163,221 @@ class GameHookProperty:
     converter: Callable = identity
     processors: List[Callable] = field(factory=list)
     handler: Callable = noop
+    coalesce: float = 0.0  # seconds
+    update: Callable = field(default=noop, eq=False, repr=False)
+    apply: Callable = field(default=noop, eq=False, repr=False)
+    seed: Callable = field(default=noop, eq=False, repr=False)
+    seed_number: Callable = field(default=noop, eq=False, repr=False)
+
+    def compile(self, data: GameData, fsm: StateMachine, tx: Transaction) -> Callable:
+        # specialise the whole update pipeline for this property at configure time,
+        # so that handling a change does not have to branch on the configuration
+        transform = self._compile_transform()
+        decode = self._compile_decoder(transform)
+        store = self._compile_store(tx)
+        react = self._compile_reaction(data, fsm)
+        rank = self.rank
+
+        if react is None:
+
+            def update(value: Any, byte_values: List[int]):
+                value = decode(value, byte_values)
+                store(value)
+                self.previous = value
+
+            def apply(number: int):
+                value = transform(number)
+                store(value)
+                self.previous = value
+
+        else:
+
+            def update(value: Any, byte_values: List[int]):
+                value = decode(value, byte_values)
+                if tx.active:
+                    tx.defer(rank, react, store(value), value)
+                else:
+                    react(store(value), value)
+                self.previous = value
+
+            def apply(number: int):
+                value = transform(number)
+                if tx.active:
+                    tx.defer(rank, react, store(value), value)
+                else:
+                    react(store(value), value)
+                self.previous = value
+
+        self.update = update
+        # `apply` takes a number already decoded from bytes, see `PackedProperty`
+        self.apply = apply
+        self._compile_seed(decode, transform)
+        return update
+
+    def _compile_seed(self, decode: Callable, transform: Callable):
+        # store the current value quietly, without emitting or feeding the FSM
+        put = noop if self.attribute is None else self.attribute.set
+
+        def settle(value: Any) -> Any:
+            put(value)
+            self.previous = value
+            return value
+
+        def seed(value: Any, byte_values: List[int]) -> Any:
+            return settle(decode(value, byte_values))
+
+        def seed_number(number: int) -> Any:
+            return settle(transform(number))
+
+        self.seed = seed
+        self.seed_number = seed_number
+
+    def _compile_decoder(self, transform: Callable) -> Callable:
+        if self.uses_bytes:
+            # indexing is several times faster than `int.from_bytes` for the
+            # single byte values that make up most of the data
+            from_bytes = int.from_bytes
+            if self.is_little_endian:
+
+                def decode(_value: Any, byte_values: Sequence[int]) -> Any:
+                    n = len(byte_values)
+                    if n == 1:
+                        return transform(byte_values[0])
+                    if n == 2:
+                        return transform(byte_values[0] | (byte_values[1] << 8))
+                    return transform(from_bytes(byte_values, 'little'))
+
+            else:
+
+                def decode(_value: Any, byte_values: Sequence[int]) -> Any:
+                    n = len(byte_values)
+                    if n == 1:
+                        return transform(byte_values[0])
+                    if n == 2:
+                        return transform((byte_values[0] << 8) | byte_values[1])
+                    return transform(from_bytes(byte_values, 'big'))
+
+        else:
+            default = self.default
+
+            def decode(value: Any, _byte_values: List[int]) -> Any:
+                if value is None:
+                    value = default
+                    if value is None:
+                        return None
+                return transform(value)
+
+        return decode
+
+    def _compile_transform(self) -> Callable:
+        converter = self.converter
+        processors = tuple(self.processors)
+        if not processors:
+            return converter
+        if len(processors) == 1:
+            processor = processors[0]
+
+            def transform(value: Any) -> Any:
+                value = converter(value)
+                return value if value is None else processor(value)
+
+        else:
+
+            def transform(value: Any) -> Any:
+                value = converter(value)
+                if value is not None:
+                    for processor in processors:
+                        value = processor(value)
+                return value
+
+        return transform
+
+    def _compile_store(self, tx: Transaction) -> Callable:
+        attribute = self.attribute
+        if attribute is None:
+            # the previous value is whatever this property last received
+            return lambda _value: self.previous
+
+        get = attribute.get
+        put = attribute.set
+        path = attribute.path
+        emit = on_data_changed.emit
+
+        def store(value: Any) -> Any:
+            previous = get()
+            put(value)
+            if tx.active:
+                tx.record(path, previous, value)
+            else:
+                emit(path, previous, value)
+            return previous
+
+        return store
+
+    def _compile_reaction(self, data: GameData, fsm: StateMachine) -> Optional[Callable]:
+        handler = None if self.handler is noop else self.handler
+        label = self.label or None
+        if label is None:
+            if handler is None:
+                return None
+            return lambda _previous, value: handler(value, data)
+
+        on_input = fsm.on_input
+        if handler is None:
+            return lambda previous, value: on_input(label, previous, value, data)
+
+        def react(previous: Any, value: Any):
+            handler(value, data)
+            on_input(label, previous, value, data)
+
+        return react
+
+
+@define
+class PackedProperty:
+    """Several bytes-backed properties stored next to each other in memory.
+
+    The whole record is decoded with a single `struct` unpack, and only the
+    members whose value changed are applied. `layout` describes the record,
+    e.g., `>BxBBB` for four single byte values with one unused byte.
+    """
+
+    name: str
+    members: List[GameHookProperty]
+    layout: struct.Struct
+    last: Optional[Tuple[int, ...]] = field(default=None, repr=False)
+
+    def compile(self) -> Callable:
+        unpack = self.layout.unpack_from
+        members = tuple(enumerate(self.members))
+
+        def update(_value: Any, byte_values: Sequence[int]):
+            try:
+                values = unpack(byte_values)
+            except TypeError:
+                values = unpack(bytes(byte_values))  # a list, from GameHook
+            last = self.last
+            self.last = values
+            for i, ghp in members:
+                if last is None or last[i] != values[i]:
+                    ghp.apply(values[i])
+
+        return update
+
+    def seed(self, byte_values: Sequence[int]):
+        values = self.layout.unpack_from(bytes(byte_values))
+        self.last = values
+        for ghp, value in zip(self.members, values):
+            ghp.seed_number(value)
+
+
+@define
+class CoalescedUpdate:
+    update: Callable
+    window: float
+    due: float = 0.0
+    value: Any = None
+    byte_values: List[int] = field(factory=list)
 
 
 @define
@@ -98,43 +385,129 @@ class DataHandler:
     data: GameData
     fsm: StateMachine
     properties: Mapping[str, GameHookProperty] = field(init=False, factory=dict)
+    packed: Mapping[str, PackedProperty] = field(init=False, factory=dict)
+    groups: Mapping[str, FrozenSet[str]] = field(init=False, factory=dict)
+    updaters: Mapping[str, Callable] = field(init=False, factory=dict, repr=False)
+    _tx: Transaction = field(init=False, factory=Transaction, repr=False)
+    _group_of: Dict[str, str] = field(init=False, factory=dict, repr=False)
+    _deferred: Dict[str, CoalescedUpdate] = field(init=False, factory=dict, repr=False)
 
     def on_property_changed(self, prop: str, value: Any, byte_values: List[int]):
+        update = self.updaters.get(prop)
+        if update is None:
+            return
+        tx = self._tx
+        if tx.depth == 0:
+            # consecutive changes to members of the same group form a transaction
+            group = self._group_of.get(prop)
+            if group != tx.group:
+                if tx.group is not None:
+                    tx.commit()
+                if group is not None:
+                    tx.group = group
+                    tx.missing.update(self.groups[group])
+                    tx.active = True
+            if group is not None:
+                update(value, byte_values)
+                # the group is complete once every member has changed
+                tx.missing.discard(prop)
+                if not tx.missing:
+                    tx.commit()
+                return
+        update(value, byte_values)
+
+    def on_properties_changed(self, changes: Iterable[Tuple[str, Any, List[int]]]):
+        with self.transaction():
+            for prop, value, byte_values in changes:
+                self.on_property_changed(prop, value, byte_values)
+
+    def seed(self, prop: str, value: Any, byte_values: List[int]):
+        # same arguments as `on_property_changed`, but only stores the value
+        packed = self.packed.get(prop)
+        if packed is not None:
+            packed.seed(byte_values)
+            return
         ghp = self.properties.get(prop)
         if ghp is not None:
-            if value is None:
-                value = ghp.default
-            # bytes or glossary value?
-            if ghp.uses_bytes:
-                endianess = 'little' if ghp.is_little_endian else 'big'
-                value = int.from_bytes(byte_values, byteorder=endianess)
-            # convert data to something else
-            if value is not None:
-                value = ghp.converter(value)
-            if value is not None:
-                for processor in ghp.processors:
-                    value = processor(value)
-            # store it in GameData
-            if ghp.attribute is not None:
-                ghp.previous = ghp.attribute.get()
-                ghp.attribute.set(value)
-                on_data_changed.emit(ghp.attribute.path, ghp.previous, value)
-            # additional side effects
-            ghp.handler(value, self.data)
-            # feed to StateMachine
+            ghp.seed(value, byte_values)
+
+    def bootstrap(self, snapshot: Iterable[Tuple[str, Any, List[int]]]) -> Dict[str, Any]:
+        """Load the current value of every property, e.g., when attaching to a running game.
+
+        Values are stored without emitting `on_data_changed` or feeding the
+        state machine. Returns the current value of each FSM label, so that
+        the state machine can resume from there.
+        """
+        labels = {}
+        n = 0
+        for prop, value, byte_values in snapshot:
+            ghp = self.properties.get(prop)
+            if ghp is None or prop not in self.updaters:
+                continue
+            known = bool(byte_values) if ghp.uses_bytes else value is not None
+            if not known:
+                continue
+            try:
+                value = ghp.seed(value, byte_values)
+            except (TypeError, ValueError, KeyError, PokeWatcherDataError) as e:
+                logger.warning(f'{prop}: unable to load initial value {value!r}: {e}')
+                continue
+            n += 1
             if ghp.label:
-                self.fsm.on_input(ghp.label, ghp.previous, value, self.data)
-            # store previous value for posterity
-            ghp.previous = value
+                labels[ghp.label] = value
+        logger.info(f'loaded the initial value of {n} properties')
+        return labels
+
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """Apply every property change within the context as a single change."""
+        tx = self._tx
+        if tx.depth == 0 and tx.group is not None:
+            tx.commit()
+        tx.depth += 1
+        tx.active = True
+        try:
+            yield tx
+        finally:
+            tx.depth -= 1
+            if tx.depth == 0:
+                tx.commit()
+
+    def commit(self):
+        # ends an implicit group transaction, e.g., when a batch of changes is over
+        tx = self._tx
+        if tx.depth == 0 and tx.group is not None:
+            tx.commit()
+
+    def flush(self):
+        # must run on the same thread as `on_property_changed`, after every batch
+        # of changes; a group in which only some members changed is closed here
+        if self._deferred:
+            now = time.monotonic()
+            for prop, pending in list(self._deferred.items()):
+                if now >= pending.due:
+                    del self._deferred[prop]
+                    pending.due = now + pending.window
+                    pending.update(pending.value, pending.byte_values)
+        self.commit()
 
     def ensure_property(self, prop: str) -> GameHookProperty:
         ghp = self.properties.get(prop)
         if ghp is None:
-            ghp = GameHookProperty(prop)
+            ghp = GameHookProperty(prop, rank=len(self.properties))
             self.properties[prop] = ghp
         return ghp
 
     def configure_property(self, prop: str, metadata: Mapping[str, Any]):
+        members = metadata.get('packed')
+        if members:
+            self.pack(prop, members, metadata['format'])
+            return
+        members = metadata.get('group')
+        if members:
+            self.group(prop, members)
+            return
+
         use_bytes = bool(metadata.get('bytes', False))
         if use_bytes:
             self.use_bytes(prop, is_little_endian=metadata.get('little_endian', False))
@@ -157,11 +530,16 @@ class DataHandler:
         if label is not None:
             self.transition(prop, label)
 
+        window = metadata.get('coalesce_ms')
+        if window:
+            self.coalesce(prop, window)
+
     def use_bytes(self, prop: str, is_little_endian=False):
         logger.debug(f'use bytes: {prop}')
         ghp = self.ensure_property(prop)
         ghp.uses_bytes = True
         ghp.is_little_endian = is_little_endian
+        self._compile(ghp)
 
     def convert(self, prop: str, data_type: str, key: Optional[str] = None):
         logger.debug(f'convert data: {prop} -> {data_type}[{repr(key)}]')
@@ -171,6 +549,7 @@ class DataHandler:
             ghp.converter = f
         else:
             ghp.converter = lambda d: f(d[key])
+        self._compile(ghp)
 
     def process(self, prop: str, func: str, args: Iterable[Any]):
         logger.debug(f'process data: {prop} -> {func}{args}')
@@ -184,11 +563,16 @@ class DataHandler:
                 ghp.processors.append(processor)
             except TypeError as e:
                 logger.error(f'{prop}: processor {func}: {e}')
+        self._compile(ghp)
 
     def store(self, prop: str, path: str, default: Any = None, data_type: str = ''):
         logger.debug(f'data store: {prop} -> {path}')
         ghp = self.ensure_property(prop)
-        ghp.attribute = Attribute.of(self.data, path)
+        try:
+            ghp.attribute = Attribute.of(self.data, path)
+        except PokeWatcherDataError as e:
+            logger.error(f'{prop}: {e}')
+            return
         ghp.previous = ghp.attribute.get()
         if default is not None:
             ghp.default = default
@@ -206,11 +590,51 @@ class DataHandler:
             elif data_type == 'float':
                 ghp.default = 0.0
                 ghp.attribute.set(0.0)
+        self._compile(ghp)
 
     def transition(self, prop: str, label: str):
         logger.debug(f'transition label: {prop} -> {label}')
         ghp = self.ensure_property(prop)
         ghp.label = label
+        self._compile(ghp)
+
+    def coalesce(self, prop: str, window_ms: float):
+        logger.debug(f'coalesce changes: {prop} -> {window_ms} ms')
+        ghp = self.ensure_property(prop)
+        ghp.coalesce = window_ms / 1000.0
+        self._compile(ghp)
+
+    def pack(self, prop: str, members: Sequence[str], layout: str):
+        logger.debug(f'packed properties: {prop} -> {layout} {members}')
+        try:
+            layout = struct.Struct(layout)
+        except struct.error as e:
+            logger.error(f'{prop}: packed format {layout}: {e}')
+            return
+        n = len(layout.unpack(bytes(layout.size)))
+        if n != len(members):
+            logger.error(f'{prop}: {len(members)} packed members, {n} values in {layout.format}')
+            return
+        ghps = [self.ensure_property(member) for member in members]
+        packed = PackedProperty(prop, ghps, layout)
+        self.packed[prop] = packed
+        apply = packed.compile()
+        transaction = self.transaction
+
+        def update(value: Any, byte_values: List[int]):
+            with transaction():
+                apply(value, byte_values)
+
+        self.updaters[prop] = update
+        # the members may also arrive one by one, from GameHook
+        self.group(prop, members)
+
+    def group(self, prop: str, members: Sequence[str]):
+        logger.debug(f'property group: {prop} -> {members}')
+        for member in members:
+            self.ensure_property(member)
+            self._group_of[member] = prop
+        self.groups[prop] = frozenset(members)
 
     def do(self, prop: str, handler: Callable):
         logger.debug(f'handle {prop}: {handler}')
@@ -219,6 +643,37 @@ class DataHandler:
             ghp.handler = handler
         else:
             ghp.handler = self._chain(ghp.handler, handler)
+        self._compile(ghp)
+
+    def _compile(self, ghp: GameHookProperty):
+        update = ghp.compile(self.data, self.fsm, self._tx)
+        if ghp.coalesce > 0.0:
+            if ghp.label:
+                # state machines may depend on every single edge
+                logger.warning(f'{ghp.name}: not coalescing changes to FSM label {ghp.label}')
+            else:
+                update = self._coalesced(ghp.name, update, ghp.coalesce)
+        self.updaters[ghp.name] = update
+
+    def _coalesced(self, prop: str, update: Callable, window: float) -> Callable:
+        # apply the first change right away, then at most one change per window;
+        # changes in between are held back and only the latest one is applied by `flush`
+        pending = CoalescedUpdate(update, window)
+        deferred = self._deferred
+        monotonic = time.monotonic
+
+        def coalesced_update(value: Any, byte_values: List[int]):
+            now = monotonic()
+            if now >= pending.due:
+                pending.due = now + window
+                deferred.pop(prop, None)
+                update(value, byte_values)
+            else:
+                pending.value = value
+                pending.byte_values = byte_values
+                deferred[prop] = pending
+
+        return coalesced_update
 
     def _chain(self, f: Callable, g: Callable) -> Callable:
         def gof(value: Any, data: GameData):
@@ -5,13 +5,16 @@
 # Imports
 ###############################################################################
 
-from typing import Any, Dict, Final, List, Optional, Tuple
+from typing import Any, ClassVar, Dict, Final, List, Optional, Tuple
 
+from array import array
 from collections import defaultdict
 import logging
 
 from attrs import asdict, define, field
 
+from pokewatcher.errors import PokeWatcherDataError
+
 ###############################################################################
 # Constants
 ###############################################################################
@@ -22,19 +25,131 @@ BATTLE_RESULT_WIN: Final[int] = 1
 BATTLE_RESULT_DRAW: Final[int] = 0
 BATTLE_RESULT_LOSE: Final[int] = -1
 
+# numbers in fixed layouts are stored as signed 64-bit integers
+LAYOUT_TYPECODE: Final[str] = 'q'
+
+###############################################################################
+# Fixed Layouts
+###############################################################################
+
+# The numbers that change all the time (stats, party slots, badges, game time)
+# live in flat `array` buffers, each field at a fixed offset. Structures that
+# are nested in the model, e.g., the stats of each party slot, are views into
+# the buffer of their parent, so copying a whole party copies one buffer of
+# numbers and one list of names, instead of building every object anew.
+
+
+def _number_field(i: int, name: str, default: int, flag: bool) -> property:
+    def get(self: 'Record') -> int:
+        return self._values[self._base + i]
+
+    def get_flag(self: 'Record') -> bool:
+        return self._values[self._base + i] != 0
+
+    def set(self: 'Record', value: Any):
+        if value is None:
+            # GameHook sends `None` for values it cannot read (yet)
+            value = default
+        try:
+            self._values[self._base + i] = value
+        except (TypeError, OverflowError):
+            # e.g., a `float`, which would be stored as something else
+            raise PokeWatcherDataError.not_an_integer(name, value) from None
+
+    return property(get_flag if flag else get, set)
+
+
+def _name_field(j: int) -> property:
+    def get(self: 'PartyMon') -> str:
+        return self._names[self._offset + j]
+
+    def set(self: 'PartyMon', value: str):
+        self._names[self._offset + j] = value
+
+    return property(get, set)
+
+
+def _slot_field(i: int) -> property:
+    def get(self: 'TrainerParty') -> 'PartyMon':
+        return self.slots[i]
+
+    def set(self: 'TrainerParty', mon: 'PartyMon'):
+        self.slots[i].assign(mon)
+
+    return property(get, set)
+
+
+class Record:
+    """Named integer fields at fixed offsets of an `array` buffer.
+
+    Subclasses list their `FIELDS` and the `DEFAULTS` of their whole layout,
+    which may be longer than `FIELDS`. Each field becomes a property.
+    Fields only hold integers (or `bool`); setting `None` restores the default,
+    and anything else raises `PokeWatcherDataError`.
+    """
+
+    __slots__ = ('_values', '_base')
+
+    FIELDS: ClassVar[Tuple[str, ...]] = ()
+    DEFAULTS: ClassVar[Tuple[int, ...]] = ()
+    FLAGS: ClassVar[bool] = False  # fields are read as `bool`
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        if 'FIELDS' in cls.__dict__:
+            for i, (name, default) in enumerate(zip(cls.FIELDS, cls.DEFAULTS)):
+                setattr(cls, name, _number_field(i, name, default, cls.FLAGS))
+
+    def __init__(self, **kwargs: Any):
+        self._values = array(LAYOUT_TYPECODE, self.DEFAULTS)
+        self._base = 0
+        for name, value in kwargs.items():
+            if name not in self.FIELDS:
+                raise TypeError(f'{type(self).__name__}: unexpected field {name!r}')
+            setattr(self, name, value)
+
+    @classmethod
+    def view(cls, values: array, base: int = 0) -> Any:
+        record = cls.__new__(cls)
+        record._values = values
+        record._base = base
+        return record
+
+    def numbers(self) -> array:
+        # a copy of this record's slice of the buffer
+        return self._values[self._base : self._base + len(self.DEFAULTS)]
+
+    def assign(self, other: 'Record'):
+        self._values[self._base : self._base + len(self.DEFAULTS)] = other.numbers()
+
+    def copy(self) -> Any:
+        return self.view(self.numbers())
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.numbers() == other.numbers()
+
+    __hash__ = None  # mutable
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={value!r}' for name, value in self.as_dict().items())
+        return f'{type(self).__name__}({fields})'
+
+
 ###############################################################################
 # Pokémon Data
 ###############################################################################
 
 
-@define
-class MonStats:
-    hp: int = 1
-    attack: int = 1
-    defense: int = 1
-    speed: int = 1
-    sp_attack: int = 1
-    sp_defense: int = 1
+class MonStats(Record):
+    __slots__ = ()
+
+    FIELDS = ('hp', 'attack', 'defense', 'speed', 'sp_attack', 'sp_defense')
+    DEFAULTS = (1, 1, 1, 1, 1, 1)
 
     @property
     def special(self) -> int:
@@ -45,16 +160,6 @@ class MonStats:
         self.sp_attack = value
         self.sp_defense = value
 
-    def copy(self) -> 'MonStats':
-        return MonStats(
-            hp=self.hp,
-            attack=self.attack,
-            defense=self.defense,
-            speed=self.speed,
-            sp_attack=self.sp_attack,
-            sp_defense=self.sp_defense,
-        )
-
 
 @define
 class MonSpecies:
@@ -63,21 +168,56 @@ class MonSpecies:
     base_stats: MonStats = field(factory=MonStats)
 
 
-@define
-class PartyMon:
-    species: str = ''
-    name: str = ''
-    level: int = 1
-    stats: MonStats = field(factory=MonStats)
-    hp: int = -1
-    move1: str = ''
-    move2: str = ''
-    move3: str = ''
-    move4: str = ''
-
-    def __attrs_post_init__(self):
-        if self.hp < 0:
-            self.hp = self.stats.hp
+class PartyMon(Record):
+    """A Pokémon in a party.
+
+    Numbers are laid out as `level`, `hp` and then `stats`; the species,
+    name and moves are kept at consecutive positions of a list of names.
+    """
+
+    __slots__ = ('_names', '_offset', 'stats')
+
+    FIELDS = ('level', 'hp')
+    DEFAULTS = (1, 1) + MonStats.DEFAULTS
+    NAMES: ClassVar[Tuple[str, ...]] = ('species', 'name', 'move1', 'move2', 'move3', 'move4')
+
+    def __init__(
+        self,
+        species: str = '',
+        name: str = '',
+        level: int = 1,
+        stats: Optional[MonStats] = None,
+        hp: int = -1,
+        move1: str = '',
+        move2: str = '',
+        move3: str = '',
+        move4: str = '',
+    ):
+        super().__init__()
+        self._names = [species, name, move1, move2, move3, move4]
+        self._offset = 0
+        self.stats = MonStats.view(self._values, 2)
+        if stats is not None:
+            self.stats.assign(stats)
+        self.level = level
+        self.hp = self.stats.hp if hp < 0 else hp
+
+    @classmethod
+    def view(
+        cls, values: array, base: int = 0, names: Optional[List[str]] = None, offset: int = 0
+    ) -> 'PartyMon':
+        mon = super().view(values, base)
+        mon._names = [''] * len(cls.NAMES) if names is None else names
+        mon._offset = offset
+        mon.stats = MonStats.view(values, base + 2)
+        return mon
+
+    species = _name_field(0)
+    name = _name_field(1)
+    move1 = _name_field(2)
+    move2 = _name_field(3)
+    move3 = _name_field(4)
+    move4 = _name_field(5)
 
     @property
     def max_hp(self) -> int:
@@ -91,33 +231,95 @@ class PartyMon:
     def is_valid_species(self) -> bool:
         return self.species != ''
 
+    def names(self) -> List[str]:
+        return self._names[self._offset : self._offset + len(self.NAMES)]
+
+    def assign(self, other: 'PartyMon'):
+        super().assign(other)
+        self._names[self._offset : self._offset + len(self.NAMES)] = other.names()
+
     def copy(self) -> 'PartyMon':
-        return PartyMon(
-            species=self.species,
-            name=self.name,
-            level=self.level,
-            stats=self.stats.copy(),
-            hp=self.hp,
-            move1=self.move1,
-            move2=self.move2,
-            move3=self.move3,
-            move4=self.move4,
+        return PartyMon.view(self.numbers(), 0, self.names(), 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'species': self.species,
+            'name': self.name,
+            'level': self.level,
+            'stats': self.stats.as_dict(),
+            'hp': self.hp,
+            'move1': self.move1,
+            'move2': self.move2,
+            'move3': self.move3,
+            'move4': self.move4,
+        }
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.numbers() == other.numbers() and self.names() == other.names()
+
+    __hash__ = None  # mutable
+
+    def __repr__(self) -> str:
+        fields = ', '.join(
+            f'{name}={value!r}' if name != 'stats' else f'stats={self.stats!r}'
+            for name, value in self.as_dict().items()
         )
+        return f'PartyMon({fields})'
 
 
-@define
 class TrainerParty:
-    size: int = 0
-    slot1: PartyMon = field(factory=PartyMon)
-    slot2: PartyMon = field(factory=PartyMon)
-    slot3: PartyMon = field(factory=PartyMon)
-    slot4: PartyMon = field(factory=PartyMon)
-    slot5: PartyMon = field(factory=PartyMon)
-    slot6: PartyMon = field(factory=PartyMon)
+    """Six party slots in a single buffer: `size`, then each `PartyMon`."""
+
+    __slots__ = ('_values', '_names', '_slots')
+
+    SLOTS: ClassVar[int] = 6
+
+    def __init__(
+        self,
+        size: int = 0,
+        slot1: Optional[PartyMon] = None,
+        slot2: Optional[PartyMon] = None,
+        slot3: Optional[PartyMon] = None,
+        slot4: Optional[PartyMon] = None,
+        slot5: Optional[PartyMon] = None,
+        slot6: Optional[PartyMon] = None,
+    ):
+        self._values = array(LAYOUT_TYPECODE, (size,) + PartyMon.DEFAULTS * self.SLOTS)
+        self._names = [''] * (len(PartyMon.NAMES) * self.SLOTS)
+        self._slots: Optional[Tuple[PartyMon, ...]] = None
+        for mon, slot in zip((slot1, slot2, slot3, slot4, slot5, slot6), self.slots):
+            if mon is not None:
+                slot.assign(mon)
+
+    @property
+    def size(self) -> int:
+        return self._values[0]
+
+    @size.setter
+    def size(self, value: int):
+        self._values[0] = 0 if value is None else value
 
     @property
-    def slots(self) -> Tuple[PartyMon]:
-        return (self.slot1, self.slot2, self.slot3, self.slot4, self.slot5, self.slot6)
+    def slots(self) -> Tuple[PartyMon, ...]:
+        # views are only created on demand, e.g., not for copies kept as records
+        if self._slots is None:
+            n = len(PartyMon.DEFAULTS)
+            m = len(PartyMon.NAMES)
+            values = self._values
+            names = self._names
+            self._slots = tuple(
+                PartyMon.view(values, 1 + i * n, names, i * m) for i in range(self.SLOTS)
+            )
+        return self._slots
+
+    slot1 = _slot_field(0)
+    slot2 = _slot_field(1)
+    slot3 = _slot_field(2)
+    slot4 = _slot_field(3)
+    slot5 = _slot_field(4)
+    slot6 = _slot_field(5)
 
     def as_list(self) -> List[PartyMon]:
         return list(self.slots[: self.size])
@@ -131,15 +333,17 @@ class TrainerParty:
         return self.slot6
 
     def copy(self) -> 'TrainerParty':
-        return TrainerParty(
-            size=self.size,
-            slot1=self.slot1.copy(),
-            slot2=self.slot2.copy(),
-            slot3=self.slot3.copy(),
-            slot4=self.slot4.copy(),
-            slot5=self.slot5.copy(),
-            slot6=self.slot6.copy(),
-        )
+        party = TrainerParty.__new__(TrainerParty)
+        party._values = self._values[:]
+        party._names = self._names[:]
+        party._slots = None
+        return party
+
+    def as_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {'size': self.size}
+        for i, mon in enumerate(self.slots):
+            data[f'slot{i + 1}'] = mon.as_dict()
+        return data
 
     def __getitem__(self, i: int) -> PartyMon:
         return self.slots[i]
@@ -147,6 +351,17 @@ class TrainerParty:
     def __len__(self) -> int:
         return self.size
 
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values == other._values and self._names == other._names
+
+    __hash__ = None  # mutable
+
+    def __repr__(self) -> str:
+        slots = ', '.join(f'slot{i + 1}={mon!r}' for i, mon in enumerate(self.slots))
+        return f'TrainerParty(size={self.size!r}, {slots})'
+
 
 ###############################################################################
 # Battle Pokémon Data
@@ -170,16 +385,15 @@ class TrainerData:
         self.trainer_class = ''
         self.team.size = 0
 
+    def copy(self) -> 'TrainerData':
+        return TrainerData(self.name, self.number, self.trainer_class, self.team.copy())
 
-@define
-class BattleMonStatStages:
-    attack: int = 0
-    defense: int = 0
-    speed: int = 0
-    sp_attack: int = 0
-    sp_defense: int = 0
-    accuracy: int = 0
-    evasion: int = 0
+
+class BattleMonStatStages(Record):
+    __slots__ = ()
+
+    FIELDS = ('attack', 'defense', 'speed', 'sp_attack', 'sp_defense', 'accuracy', 'evasion')
+    DEFAULTS = (0, 0, 0, 0, 0, 0, 0)
 
     @property
     def special(self) -> int:
@@ -199,6 +413,11 @@ class BattleMon:
     stages: BattleMonStatStages = field(factory=BattleMonStatStages)
     party_index: int = 0
 
+    def copy(self) -> 'BattleMon':
+        return BattleMon(
+            self.name, self.hp, self.stats.copy(), self.stages.copy(), self.party_index
+        )
+
 
 @define
 class BattleData:
@@ -243,77 +462,47 @@ class BattleData:
         self.ongoing = False
         self.result = BATTLE_RESULT_DRAW
 
+    def copy(self) -> 'BattleData':
+        return BattleData(
+            self.ongoing,
+            self.is_vs_wild,
+            self.result,
+            self.player.copy(),
+            self.enemy.copy(),
+            self.trainer.copy(),
+        )
+
 
 ###############################################################################
 # Player Data
 ###############################################################################
 
 
-@define
-class BadgeData:
-    badge1: bool = False
-    badge2: bool = False
-    badge3: bool = False
-    badge4: bool = False
-    badge5: bool = False
-    badge6: bool = False
-    badge7: bool = False
-    badge8: bool = False
-
-    def copy(self) -> 'BadgeData':
-        return BadgeData(
-            badge1=self.badge1,
-            badge2=self.badge2,
-            badge3=self.badge3,
-            badge4=self.badge4,
-            badge5=self.badge5,
-            badge6=self.badge6,
-            badge7=self.badge7,
-            badge8=self.badge8,
-        )
+class BadgeData(Record):
+    __slots__ = ()
+
+    FIELDS = ('badge1', 'badge2', 'badge3', 'badge4', 'badge5', 'badge6', 'badge7', 'badge8')
+    DEFAULTS = (0, 0, 0, 0, 0, 0, 0, 0)
+    FLAGS = True
 
     def __getitem__(self, i: Any) -> bool:
-        if i == 0 or i == 'badge1':
-            return self.badge1
-        if i == 1 or i == 'badge2':
-            return self.badge2
-        if i == 2 or i == 'badge3':
-            return self.badge3
-        if i == 3 or i == 'badge4':
-            return self.badge4
-        if i == 4 or i == 'badge5':
-            return self.badge5
-        if i == 5 or i == 'badge6':
-            return self.badge6
-        if i == 6 or i == 'badge7':
-            return self.badge7
-        if i == 7 or i == 'badge8':
-            return self.badge8
-        raise IndexError(f'expected 0 <= i < 8; got {i}')
+        return self._values[self._base + self._index(i)] != 0
 
     def __setitem__(self, i: Any, value: bool):
-        if i == 0 or i == 'badge1':
-            self.badge1 = value
-        elif i == 1 or i == 'badge2':
-            self.badge2 = value
-        elif i == 2 or i == 'badge3':
-            self.badge3 = value
-        elif i == 3 or i == 'badge4':
-            self.badge4 = value
-        elif i == 4 or i == 'badge5':
-            self.badge5 = value
-        elif i == 5 or i == 'badge6':
-            self.badge6 = value
-        elif i == 6 or i == 'badge7':
-            self.badge7 = value
-        elif i == 7 or i == 'badge8':
-            self.badge8 = value
-        else:
-            raise IndexError(f'expected 0 <= i < 8; got {i}')
+        self._values[self._base + self._index(i)] = 1 if value else 0
 
     def __len__(self) -> int:
         return 8
 
+    def _index(self, i: Any) -> int:
+        # by position or by name, e.g., `badges[0]` or `badges['badge1']`
+        if isinstance(i, str):
+            if i in self.FIELDS:
+                return self.FIELDS.index(i)
+        elif isinstance(i, int) and 0 <= i < 8:
+            return i
+        raise IndexError(f'expected 0 <= i < 8; got {i}')
+
 
 @define
 class PlayerData:
@@ -363,20 +552,11 @@ class GameMap:
 ###############################################################################
 
 
-@define
-class GameTime:
-    hours: int = 0
-    minutes: int = 0
-    seconds: int = 0
-    frames: int = 0
-
-    def copy(self) -> 'GameTime':
-        return GameTime(
-            hours=self.hours,
-            minutes=self.minutes,
-            seconds=self.seconds,
-            frames=self.frames,
-        )
+class GameTime(Record):
+    __slots__ = ()
+
+    FIELDS = ('hours', 'minutes', 'seconds', 'frames')
+    DEFAULTS = (0, 0, 0, 0)
 
     def formatted(self, zeroes: bool = True, frames: bool = True) -> str:
         t = f'{self.seconds:02}' if not frames else f'{self.seconds:02}.{self.frames:02}'
@@ -411,5 +591,35 @@ class GameData:
     def is_in_battle(self) -> bool:
         return self.battle.ongoing
 
+    def copy(self) -> 'GameData':
+        # a snapshot of the live state; `dex` and `maps` are static and shared
+        return GameData(
+            player=self.player.copy(),
+            time=self.time.copy(),
+            location=self.location,
+            battle=self.battle.copy(),
+            dex=self.dex,
+            maps=self.maps,
+            custom=_copy_tree(self.custom),
+        )
+
     def serialize(self) -> Dict[str, Any]:
-        return asdict(self)
+        return asdict(self, value_serializer=_serialize_value)
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def _copy_tree(tree: Dict[str, Any]) -> Dict[str, Any]:
+    copy = dict_of_dicts()
+    for key, value in tree.items():
+        copy[key] = _copy_tree(value) if isinstance(value, dict) else value
+    return copy
+
+
+def _serialize_value(_obj: Any, _attribute: Any, value: Any) -> Any:
+    if isinstance(value, (Record, TrainerParty)):
+        return value.as_dict()
+    return value
@@ -63,11 +63,13 @@ P_BATTLE_ATK = 'battle.yourPokemon.battleStatAttack'
 P_BATTLE_DEF = 'battle.yourPokemon.battleStatDefense'
 P_BATTLE_SPD = 'battle.yourPokemon.battleStatSpeed'
 P_BATTLE_SPC = 'battle.yourPokemon.battleStatSpecial'
+P_BATTLE_STATS = 'battle.yourPokemon.battleStats'  # packed
 
 P_GAME_TIME_HOURS = 'gameTime.hours'
 P_GAME_TIME_MINUTES = 'gameTime.minutes'
 P_GAME_TIME_SECONDS = 'gameTime.seconds'
 P_GAME_TIME_FRAMES = 'gameTime.frames'
+P_GAME_TIME = 'gameTime'  # packed
 P_COUNT_GAME_TIME = 'events.overworldFlags.countPlayTime'
 
 P_BADGE1 = 'player.badges.badge1'
@@ -81,6 +83,9 @@ P_BADGE8 = 'player.badges.badge8'
 
 P_CUR_MENU_ITEM = 'screen.menu.currentItem'
 
+P_MON_STATS = 'player.team.0.stats'  # group
+P_BADGES = 'player.badges'  # group
+
 PROPERTIES: Final[Mapping[str, Mapping[str, Any]]] = {
     P_PLAYER_ID: {
         'type': 'int',
@@ -324,6 +329,23 @@ PROPERTIES: Final[Mapping[str, Mapping[str, Any]]] = {
         'bytes': True,
         'store': game_data.VAR_PLAYER_BADGE8,
     },
+    # changes to any of these are applied together, as a single transaction;
+    # Gen 1 has a single special stat, so only members that GameHook sends
+    P_MON_STATS: {
+        'group': [P_MON_ATK, P_MON_DEF, P_MON_SPD, P_MON_SPC],
+    },
+    P_BADGES: {
+        'group': [P_BADGE1, P_BADGE2, P_BADGE3, P_BADGE4, P_BADGE5, P_BADGE6, P_BADGE7, P_BADGE8],
+    },
+    # consecutive in WRAM, decoded at once when read straight from memory
+    P_GAME_TIME: {
+        'packed': [P_GAME_TIME_HOURS, P_GAME_TIME_MINUTES, P_GAME_TIME_SECONDS, P_GAME_TIME_FRAMES],
+        'format': '>BxBBB',  # the unused byte is wPlayTimeMaxed
+    },
+    P_BATTLE_STATS: {
+        'packed': [P_BATTLE_ATK, P_BATTLE_DEF, P_BATTLE_SPD, P_BATTLE_SPC],
+        'format': '>HHHH',
+    },
 }
 
 ###############################################################################
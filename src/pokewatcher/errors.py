@@ -52,6 +52,16 @@ class PokeWatcherComponentError(PokeWatcherError):
     pass
 
 
+class PokeWatcherDataError(PokeWatcherError):
+    @classmethod
+    def bad_path(cls, path: str, name: str) -> 'PokeWatcherDataError':
+        return cls(f'invalid data path "{path}": "{name}" does not exist')
+
+    @classmethod
+    def not_an_integer(cls, name: str, value: Any) -> 'PokeWatcherDataError':
+        return cls(f'invalid value for "{name}": expected an integer, got {value!r}')
+
+
 class StateMachineError(PokeWatcherError):
     @classmethod
     def no_transition(cls, state: str, label: str, value: Any) -> 'StateMachineError':
@@ -5,9 +5,294 @@
 # Imports
 ###############################################################################
 
-from typing import Callable, Final, Iterable, List
+from typing import Any, Callable, Deque, Dict, Final, Iterable, List, Optional, Tuple
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import inspect
+import logging
+from threading import Condition, Lock
+import time
+
+from attrs import define, field, frozen
+from attrs.validators import in_
+
+from pokewatcher.core.util import noop
+from pokewatcher.data.structs import (
+    BATTLE_RESULT_DRAW,
+    BATTLE_RESULT_LOSE,
+    BATTLE_RESULT_WIN,
+    GameData,
+    GameTime,
+)
+
+###############################################################################
+# Constants
+###############################################################################
+
+logger: Final[logging.Logger] = logging.getLogger(__name__)
+
+# how a subscriber receives events
+DELIVERY_INLINE: Final[str] = 'inline'  # in the emitting thread, before `emit` returns
+DELIVERY_MAIN: Final[str] = 'main'  # queued, then called by `dispatch_pending` in the main loop
+DELIVERY_THREAD: Final[str] = 'thread'  # queued, then called from a shared thread pool
+DELIVERY_ASYNC: Final[str] = 'async'  # queued, then called (or awaited) in an asyncio loop
+
+DELIVERY_MODES: Final[Tuple[str, ...]] = (
+    DELIVERY_INLINE,
+    DELIVERY_MAIN,
+    DELIVERY_THREAD,
+    DELIVERY_ASYNC,
+)
+
+# what happens when a subscriber falls behind
+OVERFLOW_DROP_OLDEST: Final[str] = 'drop-oldest'
+OVERFLOW_BLOCK: Final[str] = 'block'  # the emitter waits, up to `block_timeout`
+
+OVERFLOW_POLICIES: Final[Tuple[str, ...]] = (OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK)
+
+DEFAULT_MAX_PENDING: Final[int] = 256
+DEFAULT_BLOCK_TIMEOUT: Final[float] = 1.0  # seconds
+THREAD_POOL_SIZE: Final[int] = 4
+
+# (queued at, args, kwargs)
+Delivery = Tuple[float, Tuple[Any, ...], Dict[str, Any]]
+
+###############################################################################
+# Subscriptions
+###############################################################################
+
+
+@define
+class SubscriptionStats:
+    delivered: int = 0
+    dropped: int = 0
+    failed: int = 0
+    total_duration: float = 0.0  # seconds
+    max_duration: float = 0.0  # seconds
+    max_latency: float = 0.0  # seconds, from `emit` to the call
+
+    @property
+    def mean_duration(self) -> float:
+        return self.total_duration / self.delivered if self.delivered > 0 else 0.0
+
+    def record(self, latency: float, duration: float):
+        self.delivered += 1
+        self.total_duration += duration
+        if duration > self.max_duration:
+            self.max_duration = duration
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def __str__(self) -> str:
+        return (
+            f'{self.delivered} delivered, {self.dropped} dropped, {self.failed} failed,'
+            f' mean {self.mean_duration * 1000.0:.3f} ms,'
+            f' max {self.max_duration * 1000.0:.3f} ms,'
+            f' max latency {self.max_latency * 1000.0:.3f} ms'
+        )
+
+
+@define(eq=False)
+class Subscription:
+    """A callback that receives events through its own bounded queue.
+
+    Events are delivered in order, one at a time, in the context given by
+    `mode`. A callback that raises is logged and counted, and does not
+    affect the emitter or other subscribers.
+    """
+
+    callback: Callable
+    mode: str = field(default=DELIVERY_MAIN, validator=in_(DELIVERY_MODES[1:]))
+    name: str = ''
+    max_pending: int = DEFAULT_MAX_PENDING
+    overflow: str = field(default=OVERFLOW_DROP_OLDEST, validator=in_(OVERFLOW_POLICIES))
+    block_timeout: float = DEFAULT_BLOCK_TIMEOUT
+    loop: Optional[asyncio.AbstractEventLoop] = field(default=None, repr=False)
+    stats: SubscriptionStats = field(factory=SubscriptionStats)
+    _pending: Deque[Delivery] = field(init=False, factory=deque, repr=False)
+    _cond: Condition = field(init=False, factory=Condition, repr=False)
+    _scheduled: bool = field(init=False, default=False, repr=False)
+    _closed: bool = field(init=False, default=False, repr=False)
+
+    def __attrs_post_init__(self):
+        if self.mode == DELIVERY_ASYNC and self.loop is None:
+            raise ValueError(f'{self.name}: asyncio delivery requires an event loop')
+        if not self.name:
+            self.name = getattr(self.callback, '__qualname__', repr(self.callback))
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def deliver(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+        # thread-safe; only blocks with `OVERFLOW_BLOCK` and a full queue
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._pending) >= self.max_pending:
+                if self.overflow == OVERFLOW_BLOCK:
+                    if not self._cond.wait_for(self._has_space, timeout=self.block_timeout):
+                        self.stats.dropped += 1
+                        logger.warning(f'{self.name}: subscriber is not keeping up, event dropped')
+                        return
+                    if self._closed:
+                        return
+                else:
+                    self._pending.popleft()
+                    self.stats.dropped += 1
+            self._pending.append((time.monotonic(), args, kwargs))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._schedule()
+
+    def notify(self, *args, **kwargs):
+        # same as `deliver`, with the arguments of `Event.emit`
+        self.deliver(args, kwargs)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def drain(self) -> int:
+        # runs every pending delivery; one drain at a time, see `_scheduled`
+        n = 0
+        while True:
+            delivery = self._next()
+            if delivery is None:
+                return n
+            queued_at, args, kwargs = delivery
+            start = time.monotonic()
+            try:
+                self.callback(*args, **kwargs)
+            except Exception:
+                self.stats.failed += 1
+                logger.exception(f'{self.name}: event callback failed')
+            self.stats.record(start - queued_at, time.monotonic() - start)
+            n += 1
+
+    async def drain_async(self) -> int:
+        n = 0
+        while True:
+            delivery = self._next()
+            if delivery is None:
+                return n
+            queued_at, args, kwargs = delivery
+            start = time.monotonic()
+            try:
+                result = self.callback(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                self.stats.failed += 1
+                logger.exception(f'{self.name}: event callback failed')
+            self.stats.record(start - queued_at, time.monotonic() - start)
+            n += 1
+
+    def _has_space(self) -> bool:
+        return self._closed or len(self._pending) < self.max_pending
+
+    def _next(self) -> Optional[Delivery]:
+        with self._cond:
+            if not self._pending:
+                self._scheduled = False
+                return None
+            delivery = self._pending.popleft()
+            self._cond.notify_all()
+            return delivery
+
+    def _schedule(self):
+        if self.mode == DELIVERY_THREAD:
+            _thread_pool().submit(self.drain)
+        elif self.mode == DELIVERY_ASYNC:
+            asyncio.run_coroutine_threadsafe(self.drain_async(), self.loop)
+        else:
+            main_loop.ready(self)
+
+
+@define
+class MainLoopDispatcher:
+    """Subscriptions with events waiting to be delivered in the main loop."""
+
+    on_ready: Callable = noop  # e.g., wake up the scheduler
+    _ready: Deque[Subscription] = field(init=False, factory=deque, repr=False)
+    _lock: Lock = field(init=False, factory=Lock, repr=False)
+
+    def ready(self, subscription: Subscription):
+        with self._lock:
+            self._ready.append(subscription)
+        self.on_ready()
+
+    def dispatch_pending(self, delta: float = 0.0) -> int:
+        # events emitted by these callbacks wait for the next call
+        with self._lock:
+            ready = list(self._ready)
+            self._ready.clear()
+        return sum(subscription.drain() for subscription in ready)
+
+
+###############################################################################
+# Event Payloads
+###############################################################################
+
+# Payloads are captured when an event is emitted. Subscribers read the state of
+# the game at that moment from their payload, instead of `GameInterface.data`,
+# which may have changed by the time a queued subscriber is called.
+
+
+@frozen
+class GameEvent:
+    # for `on_new_game`, `on_continue`, `on_reset`, `on_save_game` and `on_map_changed`
+    location: str = ''
+    game_time: GameTime = field(factory=GameTime)  # a copy, never updated
+    timestamp: float = field(factory=time.time)  # seconds since the epoch
+
+    @classmethod
+    def of(cls, data: GameData) -> 'GameEvent':
+        return cls(location=data.location, game_time=data.time.copy())
+
+
+@frozen
+class BattleEvent:
+    # for `on_battle_started`, `on_battle_ended`, `on_champion_victory` and `on_blackout`
+    is_vs_wild: bool = False
+    trainer_class: str = ''
+    trainer_number: int = 0
+    ongoing: bool = False
+    result: int = BATTLE_RESULT_WIN
+    location: str = ''
+    game_time: GameTime = field(factory=GameTime)  # a copy, never updated
+    timestamp: float = field(factory=time.time)  # seconds since the epoch
+
+    @property
+    def is_victory(self) -> bool:
+        return not self.ongoing and self.result == BATTLE_RESULT_WIN
+
+    @property
+    def is_draw(self) -> bool:
+        return not self.ongoing and self.result == BATTLE_RESULT_DRAW
+
+    @property
+    def is_defeat(self) -> bool:
+        return not self.ongoing and self.result == BATTLE_RESULT_LOSE
+
+    @classmethod
+    def of(cls, data: GameData) -> 'BattleEvent':
+        battle = data.battle
+        return cls(
+            is_vs_wild=battle.is_vs_wild,
+            trainer_class=battle.trainer.trainer_class,
+            trainer_number=battle.trainer.number,
+            ongoing=battle.ongoing,
+            result=battle.result,
+            location=data.location,
+            game_time=data.time.copy(),
+        )
 
-from attrs import define, field
 
 ###############################################################################
 # Event Class
@@ -23,6 +308,9 @@ class Event:
 
     A list of callable objects. Calling an instance of this will cause a
     call to each item in the list in ascending order by index.
+    Subscribers that should not run in the emitter's thread, or should not
+    hold it up, can `watch` with another delivery mode; they are called
+    after the inline callbacks return, from their own queue.
 
     Example Usage:
     >>> def f(x):
@@ -47,28 +335,52 @@ class Event:
 
     name: str = 'Event'
     callbacks: List[Callable] = field(factory=list)
+    subscriptions: List[Subscription] = field(factory=list, repr=False)
     count: int = field(init=False, default=0, repr=False)
 
     def emit(self, *args, **kwargs) -> None:
         self.count += 1
         for f in self.callbacks:
             f(*args, **kwargs)
+        for subscription in self.subscriptions:
+            subscription.deliver(args, kwargs)
 
-    def watch(self, callback: Callable) -> None:
-        return self.callbacks.append(callback)
+    def watch(
+        self, callback: Callable, mode: str = DELIVERY_INLINE, **options: Any
+    ) -> Optional[Subscription]:
+        # `options` are passed on to `Subscription`, e.g., `max_pending` or `loop`
+        if mode == DELIVERY_INLINE:
+            return self.callbacks.append(callback)
+        options.setdefault('name', f'{self.name}:{getattr(callback, "__qualname__", callback)}')
+        subscription = Subscription(callback, mode=mode, **options)
+        self.subscriptions.append(subscription)
+        return subscription
 
     def append(self, callback: Callable) -> None:
         return self.callbacks.append(callback)
 
     def forget(self, callback: Callable) -> None:
-        return self.callbacks.remove(callback)
+        if callback in self.callbacks:
+            return self.callbacks.remove(callback)
+        for subscription in self.subscriptions:
+            if subscription.callback == callback:
+                subscription.close()
+                return self.subscriptions.remove(subscription)
+        raise ValueError(f'{self.name}: not watched by {callback!r}')
 
     def remove(self, callback: Callable) -> None:
         return self.callbacks.remove(callback)
 
     def clear(self) -> None:
+        for subscription in self.subscriptions:
+            subscription.close()
+        self.subscriptions.clear()
         return self.callbacks.clear()
 
+    def log_stats(self):
+        for subscription in self.subscriptions:
+            logger.info(f'{subscription.name}: {subscription.stats}')
+
     def __call__(self, *args, **kwargs) -> None:
         return self.emit(*args, **kwargs)
 
@@ -77,16 +389,113 @@ class Event:
         return self
 
 
+@frozen
+class PathWatch:
+    callback: Callable
+    invoke: Callable  # the callback itself, or its `Subscription.notify`
+    subscription: Optional[Subscription] = None
+
+
+@define
+class DataEvent(Event):
+    """`on_data_changed`, with subscriptions to specific attribute paths.
+
+    Callbacks given to `watch` receive every change, as `(path, prev, value)`.
+    Callbacks given to `watch_path` only receive changes to an exact path,
+    e.g., `player.badges`, or under a prefix that ends in `.*`, e.g.,
+    `player.team.slot1.*`, which also matches `player.team.slot1` itself.
+    Both see the changes committed by a transaction too: the commit emits
+    `on_data_batch` first, then each changed path with `emit`.
+
+    The callbacks for each path are looked up once and then cached until
+    path subscriptions change. A path without subscribers costs a single
+    dictionary lookup per change.
+    """
+
+    _paths: Dict[str, List[PathWatch]] = field(init=False, factory=dict, repr=False)
+    _routes: Dict[str, Tuple[Callable, ...]] = field(init=False, factory=dict, repr=False)
+
+    def emit(self, path: str, previous: Any, value: Any) -> None:
+        super().emit(path, previous, value)
+        self.route(path, previous, value)
+
+    def route(self, path: str, previous: Any, value: Any) -> None:
+        # only path subscriptions; `emit` calls this after the plain callbacks
+        routes = self._routes.get(path)
+        if routes is None:
+            routes = self._resolve(path)
+            self._routes[path] = routes
+        for f in routes:
+            f(path, previous, value)
+
+    def watch_path(
+        self, pattern: str, callback: Callable, mode: str = DELIVERY_INLINE, **options: Any
+    ) -> Optional[Subscription]:
+        subscription = None
+        invoke = callback
+        if mode != DELIVERY_INLINE:
+            name = getattr(callback, '__qualname__', callback)
+            options.setdefault('name', f'{self.name}[{pattern}]:{name}')
+            subscription = Subscription(callback, mode=mode, **options)
+            invoke = subscription.notify
+        self._paths.setdefault(pattern, []).append(PathWatch(callback, invoke, subscription))
+        self._routes = {}
+        return subscription
+
+    def forget_path(self, pattern: str, callback: Callable) -> None:
+        watches = self._paths.get(pattern, [])
+        for watch in watches:
+            if watch.callback == callback:
+                if watch.subscription is not None:
+                    watch.subscription.close()
+                watches.remove(watch)
+                if not watches:
+                    del self._paths[pattern]
+                self._routes = {}
+                return
+        raise ValueError(f'{self.name}: {pattern} not watched by {callback!r}')
+
+    def clear(self) -> None:
+        for watches in self._paths.values():
+            for watch in watches:
+                if watch.subscription is not None:
+                    watch.subscription.close()
+        self._paths.clear()
+        self._routes = {}
+        return super().clear()
+
+    def log_stats(self):
+        super().log_stats()
+        for watches in self._paths.values():
+            for watch in watches:
+                if watch.subscription is not None:
+                    logger.info(f'{watch.subscription.name}: {watch.subscription.stats}')
+
+    def _resolve(self, path: str) -> Tuple[Callable, ...]:
+        # the exact path first, then prefixes from the outermost to the innermost
+        keys = [path]
+        i = path.find('.')
+        while i >= 0:
+            keys.append(f'{path[:i]}.*')
+            i = path.find('.', i + 1)
+        keys.append(f'{path}.*')
+        return tuple(watch.invoke for key in keys for watch in self._paths.get(key, ()))
+
+
 ###############################################################################
 # Global Interface
 ###############################################################################
 
-on_data_changed: Final[Event] = Event(name='on_data_changed')
+main_loop: Final[MainLoopDispatcher] = MainLoopDispatcher()
+
+on_data_changed: Final[DataEvent] = DataEvent(name='on_data_changed')
+on_data_batch: Final[Event] = Event(name='on_data_batch')
 
 on_new_game: Final[Event] = Event(name='on_new_game')
 on_reset: Final[Event] = Event(name='on_reset')
 on_continue: Final[Event] = Event(name='on_continue')
 on_save_game: Final[Event] = Event(name='on_save_game')
+on_save_backup: Final[Event] = Event(name='on_save_backup')
 
 on_map_changed: Final[Event] = Event(name='on_map_changed')
 
@@ -94,3 +503,54 @@ on_battle_started: Final[Event] = Event(name='on_battle_started')
 on_battle_ended: Final[Event] = Event(name='on_battle_ended')
 on_champion_victory: Final[Event] = Event(name='on_champion_victory')
 on_blackout: Final[Event] = Event(name='on_blackout')
+
+EVENTS: Final[Tuple[Event, ...]] = (
+    on_data_changed,
+    on_data_batch,
+    on_new_game,
+    on_reset,
+    on_continue,
+    on_save_game,
+    on_save_backup,
+    on_map_changed,
+    on_battle_started,
+    on_battle_ended,
+    on_champion_victory,
+    on_blackout,
+)
+
+
+def dispatch_pending(delta: float = 0.0) -> int:
+    return main_loop.dispatch_pending(delta)
+
+
+def log_stats():
+    for event in EVENTS:
+        event.log_stats()
+
+
+def shutdown():
+    # deliver what is still queued, then stop the thread pool
+    dispatch_pending()
+    global _pool
+    with _pool_lock:
+        pool = _pool
+        _pool = None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock: Final[Lock] = Lock()
+
+
+def _thread_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix='events')
+        return _pool
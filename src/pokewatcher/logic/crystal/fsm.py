@@ -5,7 +5,7 @@
 # Imports
 ###############################################################################
 
-from typing import Any, Final, Optional
+from typing import Any, Final, Mapping, Optional
 
 import logging
 
@@ -22,6 +22,10 @@ from pokewatcher.data.crystal.constants import (
     MAP_NAMES,
     SFX_SAVE_FILE,
     TRAINER_CLASS_CHAMPION,
+    WRAM_BATTLE_MODE,
+    WRAM_MAP_GROUP,
+    WRAM_MAP_NUMBER,
+    WRAM_PLAYER_ID,
 )
 from pokewatcher.data.structs import GameData
 import pokewatcher.events as events
@@ -80,27 +84,27 @@ class MapTracker:
                     map = f'{self._map_number:02d}'
             data.location = f'{group}/{map}'
             logger.info(f'map changed: {data.location}')
-            events.on_map_changed.emit()
+            events.on_map_changed.emit(events.GameEvent.of(data))
             self._changed = False
 
 
 def _press_new_game(map_tracker: Optional[MapTracker] = None) -> GameState:
     logger.info('starting a new game')
-    events.on_new_game.emit()
+    events.on_new_game.emit(events.GameEvent())
     map_tracker = map_tracker or MapTracker()
     return InOverworld(map_tracker=map_tracker)
 
 
 def _press_continue(map_tracker: Optional[MapTracker] = None) -> GameState:
     logger.info('continue previous game')
-    events.on_continue.emit()
+    events.on_continue.emit(events.GameEvent())
     map_tracker = map_tracker or MapTracker()
     return InOverworld(map_tracker=map_tracker)
 
 
 def _reset_game() -> GameState:
     logger.info('game reset')
-    events.on_reset.emit()
+    events.on_reset.emit(events.GameEvent())
     return Initial()
 
 
@@ -150,6 +154,22 @@ class CrystalState(GameState):
 
 @define
 class Initial(CrystalState):
+    def resume(self, labels: Mapping[str, Any], data: GameData) -> GameState:
+        # all memory is zero until a game is started or continued
+        if not labels.get(WRAM_PLAYER_ID):
+            return self
+        map_tracker = MapTracker(labels.get(WRAM_MAP_GROUP, 0), labels.get(WRAM_MAP_NUMBER, 0))
+        battle_mode = labels.get(WRAM_BATTLE_MODE)
+        if battle_mode == BATTLE_MODE_WILD:
+            data.battle.set_wild_battle()
+            data.battle.ongoing = True
+            return InBattle(map_tracker)
+        if battle_mode == BATTLE_MODE_TRAINER:
+            data.battle.set_trainer_battle()
+            data.battle.ongoing = True
+            return InBattle(map_tracker)
+        return InOverworld(map_tracker=map_tracker)
+
     def wPlayerID(self, prev: int, value: int, _data: GameData) -> GameState:  # noqa: N815
         logger.debug(f'player ID changed: {prev} -> {value}')
         if value == 0:
@@ -262,21 +282,21 @@ class InOverworld(InGame):
             data.battle.set_wild_battle()
             data.battle.set_victory()
             data.battle.ongoing = True
-            events.on_battle_started.emit()
+            events.on_battle_started.emit(events.BattleEvent.of(data))
             return InBattle(self.map_tracker)
         if value == BATTLE_MODE_TRAINER:
             logger.info('trainer battle started')
             data.battle.set_trainer_battle()
             data.battle.set_victory()
             data.battle.ongoing = True
-            events.on_battle_started.emit()
+            events.on_battle_started.emit(events.BattleEvent.of(data))
             return InBattle(self.map_tracker)
         return self
 
-    def wChannel5MusicID(self, _p: Any, value: int, _d: GameData) -> GameState:  # noqa: N815
+    def wChannel5MusicID(self, _p: Any, value: int, data: GameData) -> GameState:  # noqa: N815
         if value == SFX_SAVE_FILE:
             logger.info('saved game')
-            events.on_save_game.emit()
+            events.on_save_game.emit(events.GameEvent.of(data))
         return self
 
     def wMapGroup(self, prev: Any, value: int, _d: GameData) -> GameState:  # noqa: N815
@@ -312,7 +332,7 @@ class InBattle(InGame):
         logger.debug(f'battle mode changed: {prev!r} -> {value!r}')
         if value == BATTLE_MODE_NONE:
             data.battle.ongoing = False
-            events.on_battle_ended()
+            events.on_battle_ended.emit(events.BattleEvent.of(data))
             return InOverworld(map_tracker=self.map_tracker)
         else:
             self.inconsistent('wBattleMode', value)
@@ -334,10 +354,10 @@ class InBattle(InGame):
         logger.debug(f'low health alarm changed: {p!r} -> {v!r}')
         if v:
             data.battle.set_victory()
-            events.on_battle_ended.emit()
+            events.on_battle_ended.emit(events.BattleEvent.of(data))
             if not data.battle.is_vs_wild:
                 if data.battle.trainer.trainer_class == TRAINER_CLASS_CHAMPION:
-                    events.on_champion_victory.emit()
+                    events.on_champion_victory.emit(events.BattleEvent.of(data))
             return VictorySequence(self.map_tracker)
         return self
 
@@ -52,7 +52,7 @@ logger: Final[logging.Logger] = logging.getLogger(__name__)
 
 def _reset_game() -> GameState:
     logger.info('game reset')
-    events.on_reset.emit()
+    events.on_reset.emit(events.GameEvent())
     return Initial()
 
 
@@ -61,7 +61,7 @@ def _go_to_battle(data: GameData) -> GameState:
     # logger.info(f'vs wild: {data.battle.is_vs_wild}')
     # logger.info(f'trainer: {data.battle.trainer.trainer_class}')
     data.battle.ongoing = True
-    events.on_battle_started.emit()
+    events.on_battle_started.emit(events.BattleEvent.of(data))
     return InBattle()
 
 
@@ -139,15 +139,15 @@ class InOverworld(InGame):
             return _reset_game()
         return self
 
-    def current_map(self, _p: Any, value: str, _d: GameData) -> GameState:
+    def current_map(self, _p: Any, value: str, data: GameData) -> GameState:
         logger.info(f'map changed: {value}')
-        events.on_map_changed.emit()
+        events.on_map_changed.emit(events.GameEvent.of(data))
         return self
 
-    def current_sound(self, _p: Any, value: int, _d: GameData) -> GameState:
+    def current_sound(self, _p: Any, value: int, data: GameData) -> GameState:
         if value == SFX_SAVE_FILE:
             logger.info('saved game')
-            events.on_save_game.emit()
+            events.on_save_game.emit(events.GameEvent.of(data))
         return self
 
 
@@ -168,7 +168,7 @@ class InBattle(InGame):
             if value != MAIN_STATE_BATTLE:
                 # logger.info('Battle -> Overworld (via callback1)')
                 data.battle.ongoing = False
-                events.on_battle_ended()
+                events.on_battle_ended.emit(events.BattleEvent.of(data))
                 return InOverworld()
         return self
 
@@ -185,20 +185,20 @@ class InBattle(InGame):
         if value == BATTLE_RESULT_WIN or value == BATTLE_RESULT_CAUGHT:
             # logger.info('Battle -> Overworld (via outcome)')
             data.battle.set_victory()
-            events.on_battle_ended.emit()
+            events.on_battle_ended.emit(events.BattleEvent.of(data))
             if not data.battle.is_vs_wild:
                 if data.battle.trainer.trainer_class in TRAINER_CLASSES_FINAL_BATTLE:
-                    events.on_champion_victory.emit()
+                    events.on_champion_victory.emit(events.BattleEvent.of(data))
             return InOverworld()
         elif value == BATTLE_RESULT_LOSE or value == BATTLE_RESULT_FORFEITED:
             # logger.info('Battle -> Overworld (via outcome)')
             data.battle.set_defeat()
-            events.on_battle_ended.emit()
+            events.on_battle_ended.emit(events.BattleEvent.of(data))
             return InOverworld()
         elif value != BATTLE_RESULT_NONE:
             # logger.info('Battle -> Overworld (via outcome)')
             data.battle.set_draw()
-            events.on_battle_ended.emit()
+            events.on_battle_ended.emit(events.BattleEvent.of(data))
             return InOverworld()
         # data.battle.ongoing = True
         return self
@@ -5,8 +5,9 @@
 # Imports
 ###############################################################################
 
-from typing import Any, Callable, Final
+from typing import Any, Callable, ClassVar, Dict, Final, Mapping
 
+import inspect
 import logging
 
 from attrs import define, field
@@ -27,18 +28,18 @@ logger: Final[logging.Logger] = logging.getLogger(__name__)
 
 @define
 class GameState:
-    # transitions: Mapping[str, Callable] = field(init=False, factory=dict)
-
-    # def __attrs_post_init__(self):
-    #     for attr in dir(self):
-    #         if attr.startswith('__'):
-    #             continue
-    #         method = getattr(self, attr)
-    #         if not callable(method):
-    #             continue
-    #         label = getattr(method, 'label')
-    #         if label:
-    #             self.transitions[label] = method
+    # label -> transition function, computed once per class
+    transitions: ClassVar[Mapping[str, Callable]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        transitions: Dict[str, Callable] = {}
+        for attr, method in inspect.getmembers(cls, inspect.isfunction):
+            if attr.startswith('_') or hasattr(GameState, attr):
+                continue
+            label = getattr(method, 'label', attr)
+            transitions[label] = method
+        cls.transitions = transitions
 
     @property
     def name(self) -> str:
@@ -54,10 +55,15 @@ class GameState:
     def inconsistent(self, label: str, value: Any):
         raise StateMachineError.inconsistent(self.name, label, value)
 
+    def resume(self, labels: Mapping[str, Any], data: GameData) -> 'GameState':
+        # jump straight to the state of a game in progress, given the current
+        # value of each label, without replaying transitions or emitting events
+        return self
+
 
 def transition(state: GameState, prev: Any, value: Any, data: GameData) -> GameState:
     # this is just a template for other transition functions
-    logger.debug(f'on state input: {state.name} -> transition ({prev}, {value})')
+    logger.debug('on state input: %s -> transition (%s, %s)', state.name, prev, value)
     return state
 
 
@@ -79,12 +85,21 @@ class StateMachine:
     state: GameState = field(factory=GameState)
 
     def on_input(self, label: str, prev: Any, value: Any, data: GameData):
-        logger.debug(f'on {label}: {prev} -> {value}')
-        t = getattr(self.state, label)
+        t = self.state.transitions.get(label)
+        if t is transition:
+            # fast path: most inputs are ignored by most states
+            return
         if t is None:
             # logger.debug(f'no state transition: {self.state.name} -> {label} ({prev}, {value})')
             raise StateMachineError.no_transition(self.state.name, label, value)
-        new_state = t(prev, value, data)
+        logger.debug('on %s: %s -> %s', label, prev, value)
+        new_state = t(self.state, prev, value, data)
         if new_state is not self.state:
             logger.info(f'state transition: {self.state.name} -> {new_state.name}')
         self.state = new_state
+
+    def resume(self, labels: Mapping[str, Any], data: GameData):
+        new_state = self.state.resume(labels, data)
+        if new_state is not self.state:
+            logger.info(f'resuming game in state {new_state.name}')
+        self.state = new_state
@@ -5,7 +5,7 @@
 # Imports
 ###############################################################################
 
-from typing import Any, Final
+from typing import Any, Final, Mapping
 
 import logging
 
@@ -24,6 +24,8 @@ from pokewatcher.data.yellow.constants import (
     MENU_ITEM_NEW_GAME,
     SFX_SAVE_FILE,
     TRAINER_CLASS_CHAMPION,
+    WRAM_BATTLE_TYPE,
+    WRAM_PLAYER_ID,
 )
 import pokewatcher.events as events
 from pokewatcher.logic.fsm import GameState, transition
@@ -59,6 +61,19 @@ class YellowState(GameState):
 
 @define
 class Initial(YellowState):
+    def resume(self, labels: Mapping[str, Any], data: GameData) -> GameState:
+        # the player ID is zero until a game is started or continued
+        if not labels.get(WRAM_PLAYER_ID):
+            return self
+        battle_type = labels.get(WRAM_BATTLE_TYPE)
+        if battle_type == BATTLE_TYPE_WILD:
+            data.battle.set_wild_battle()
+            return InBattle()
+        if battle_type == BATTLE_TYPE_TRAINER:
+            data.battle.set_trainer_battle()
+            return InBattle()
+        return InOverworld()
+
     def wPlayerName(self, prev: str, value: str, _data: GameData) -> GameState:  # noqa: N815
         logger.debug(f'player name changed: {prev!r} -> {value!r}')
         if value == DEFAULT_PLAYER_NAME:
@@ -199,28 +214,28 @@ class InOverworld(InGame):
     def wIsInBattle(self, _p: Any, value: Any, data: GameData) -> GameState:  # noqa: N815
         if value == BATTLE_TYPE_WILD:
             data.battle.set_wild_battle()
-            events.on_battle_started.emit()
+            events.on_battle_started.emit(events.BattleEvent.of(data))
             return InBattle()
         elif value == BATTLE_TYPE_TRAINER:
             data.battle.set_trainer_battle()
-            events.on_battle_started.emit()
+            events.on_battle_started.emit(events.BattleEvent.of(data))
             return InBattle()
         elif value == BATTLE_TYPE_LOST:
             data.battle.set_defeat()
-            events.on_blackout.emit()
+            events.on_blackout.emit(events.BattleEvent.of(data))
         elif value != BATTLE_TYPE_NONE:
             logger.warning(f'unknown battle type: {value}')
         return self
 
-    def wChannelSoundIDs_5(self, _p: Any, value: int, _d: GameData) -> GameState:  # noqa: N815
+    def wChannelSoundIDs_5(self, _p: Any, value: int, data: GameData) -> GameState:  # noqa: N815
         if value == SFX_SAVE_FILE:
             logger.info('saved game')
-            events.on_save_game.emit()
+            events.on_save_game.emit(events.GameEvent.of(data))
         return self
 
-    def wCurMap(self, _p: Any, value: str, _d: GameData) -> GameState:  # noqa: N815
+    def wCurMap(self, _p: Any, value: str, data: GameData) -> GameState:  # noqa: N815
         logger.info(f'map changed: {value}')
-        events.on_map_changed.emit()
+        events.on_map_changed.emit(events.GameEvent.of(data))
         return self
 
 
@@ -236,11 +251,11 @@ class InBattle(InGame):
                 data.battle.ongoing = False
             else:
                 data.battle.set_defeat()
-            events.on_battle_ended()
+            events.on_battle_ended.emit(events.BattleEvent.of(data))
             return InOverworld()
         if value == BATTLE_TYPE_LOST:
             data.battle.set_defeat()
-            events.on_battle_ended()
+            events.on_battle_ended.emit(events.BattleEvent.of(data))
             return InOverworld()
         elif value == BATTLE_TYPE_WILD or value == BATTLE_TYPE_TRAINER:
             self.inconsistent('wIsInBattle', value)
@@ -251,10 +266,10 @@ class InBattle(InGame):
     def wLowHealthAlarmDisabled(self, _p: int, v: bool, data: GameData) -> GameState:  # noqa: N815
         if v:
             data.battle.set_victory()
-            events.on_battle_ended.emit()
+            events.on_battle_ended.emit(events.BattleEvent.of(data))
             if not data.battle.is_vs_wild:
                 if data.battle.trainer.trainer_class == TRAINER_CLASS_CHAMPION:
-                    events.on_champion_victory.emit()
+                    events.on_champion_victory.emit(events.BattleEvent.of(data))
             return VictorySequence()
         return self
 
@@ -287,17 +302,17 @@ class VictorySequence(InGame):
 
 def _press_new_game() -> GameState:
     logger.info('starting a new game')
-    events.on_new_game.emit()
+    events.on_new_game.emit(events.GameEvent())
     return InOverworld()
 
 
 def _press_continue() -> GameState:
     logger.info('continue previous game')
-    events.on_continue.emit()
+    events.on_continue.emit(events.GameEvent())
     return InOverworld()
 
 
 def _reset_game() -> GameState:
     logger.info('game reset')
-    events.on_reset.emit()
+    events.on_reset.emit(events.GameEvent())
     return Initial()
@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import pytest
+
+from pokewatcher.core.backups import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    BackupStore,
+    BackupStoreError,
+)
+
+###############################################################################
+# Backup Store
+###############################################################################
+
+
+@pytest.mark.parametrize('compression', [COMPRESSION_NONE, COMPRESSION_ZLIB])
+def test_identical_saves_share_one_blob(tmp_path, compression):
+    save_file = tmp_path / 'rom.srm'
+    save_file.write_bytes(b'\x00' * 32768)
+    store = BackupStore(tmp_path / 'store', compression=compression)
+    first = store.add(save_file, 'rom-001.srm')
+    second = store.add(save_file, 'rom-002.srm')
+    assert first.digest == second.digest
+    assert store.blob_path(first) == store.blob_path(second)
+    blobs = [p for p in (tmp_path / 'store' / 'blobs').rglob('*') if p.is_file()]
+    assert len(blobs) == 1
+    assert store.names() == ['rom-001.srm', 'rom-002.srm']
+
+
+def test_changed_save_adds_blob(tmp_path):
+    save_file = tmp_path / 'rom.srm'
+    save_file.write_bytes(b'\x00' * 64)
+    store = BackupStore(tmp_path / 'store')
+    first = store.add(save_file, 'rom-001.srm')
+    save_file.write_bytes(b'\x01' + b'\x00' * 63)
+    second = store.add(save_file, 'rom-002.srm')
+    assert first.digest != second.digest
+    assert store.read('rom-001.srm') == b'\x00' * 64
+    assert store.read('rom-002.srm') == b'\x01' + b'\x00' * 63
+    assert store.latest().name == 'rom-002.srm'
+
+
+def test_index_survives_reload_and_export(tmp_path):
+    save_file = tmp_path / 'rom.srm'
+    save_file.write_bytes(b'ASH' * 100)
+    store = BackupStore(tmp_path / 'store')
+    store.add(save_file, 'rom-001.srm')
+
+    store = BackupStore(tmp_path / 'store').load()
+    assert store.names() == ['rom-001.srm']
+    out = tmp_path / 'out'
+    out.mkdir()
+    path = store.export('rom-001.srm', out)
+    assert path == out / 'rom-001.srm'
+    assert path.read_bytes() == b'ASH' * 100
+
+
+def test_missing_and_corrupted_backups(tmp_path):
+    save_file = tmp_path / 'rom.srm'
+    save_file.write_bytes(b'\x07' * 16)
+    store = BackupStore(tmp_path / 'store', compression=COMPRESSION_NONE)
+    with pytest.raises(BackupStoreError):
+        store.read('nope.srm')
+    entry = store.add(save_file, 'rom-001.srm')
+    store.blob_path(entry).write_bytes(b'garbage')
+    with pytest.raises(BackupStoreError):
+        store.read('rom-001.srm')
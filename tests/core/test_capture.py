@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import pytest
+
+from pokewatcher.core.capture import (
+    CaptureError,
+    CaptureReader,
+    CaptureRecord,
+    CaptureWriter,
+    replay,
+)
+
+###############################################################################
+# Capture Files
+###############################################################################
+
+
+def test_write_and_read_back(tmp_path):
+    path = tmp_path / 'session.pwcap'
+    meta = {'gameName': 'Pokemon Yellow'}
+    writer = CaptureWriter(path)
+    writer.open(meta=meta)
+    writer.write(('gameTime.frames', 0xD3DA, 12, [12], False, ['value', 'bytes']))
+    writer.write(('player.name', 0xD158, 'ASH', [128, 146, 135], False, ['value']))
+    writer.close()
+    assert writer.count == 2
+
+    reader = CaptureReader(path)
+    records = reader.records()
+    assert reader.game_name == 'Pokemon Yellow'
+    assert [r.prop for r in records] == ['gameTime.frames', 'player.name']
+    assert records[0].value == 12
+    assert records[0].byte_values == [12]
+    assert records[0].changed_bytes
+    assert not records[1].changed_bytes
+    assert 0.0 <= records[0].timestamp <= records[1].timestamp
+
+
+def test_writes_while_closed_are_counted(tmp_path):
+    path = tmp_path / 'session.pwcap'
+    writer = CaptureWriter(path)
+    writer.write(('a', 0, 1, [1], False, ['bytes']))
+    with writer:
+        writer.write(('a', 0, 2, [2], False, ['bytes']))
+    writer.write(('a', 0, 3, [3], False, ['bytes']))
+    assert writer.count == 1
+    assert writer.dropped == 1
+    assert [r.value for r in CaptureReader(path).records()] == [2]
+
+
+def test_reject_foreign_files(tmp_path):
+    path = tmp_path / 'session.pwcap'
+    path.write_bytes(b'not a capture')
+    with pytest.raises(CaptureError):
+        CaptureReader(path).records()
+
+
+def test_reject_truncated_files(tmp_path):
+    path = tmp_path / 'session.pwcap'
+    with CaptureWriter(path) as writer:
+        writer.write(('a', 0, 1, [1], False, ['bytes']))
+    path.write_bytes(path.read_bytes()[:-2])
+    with pytest.raises(CaptureError):
+        CaptureReader(path).records()
+
+
+###############################################################################
+# Replay
+###############################################################################
+
+
+def test_replay_as_fast_as_possible_only_delivers_byte_changes():
+    records = [
+        CaptureRecord(0.0, 'a', 1, [1], ['bytes']),
+        CaptureRecord(5.0, 'b', 2, [2], ['value']),
+        CaptureRecord(10.0, 'a', 3, [3], ['value', 'bytes']),
+    ]
+    changes = []
+    sleeps = []
+    n = replay(iter(records), lambda *args: changes.append(args), speed=0, sleep=sleeps.append)
+    assert n == 2
+    assert changes == [('a', 1, [1]), ('a', 3, [3])]
+    assert sleeps == []
+
+
+def test_replay_scales_delays_with_speed():
+    records = [
+        CaptureRecord(10.0, 'a', 1, [1], ['bytes']),
+        CaptureRecord(20.0, 'a', 2, [2], ['bytes']),
+    ]
+    sleeps = []
+    replay(iter(records), lambda *args: None, speed=10.0, sleep=sleeps.append)
+    assert len(sleeps) == 2
+    assert sleeps[0] == pytest.approx(1.0, abs=0.1)
+    # fake sleep does not advance the clock
+    assert sleeps[1] == pytest.approx(2.0, abs=0.1)
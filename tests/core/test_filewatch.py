@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import os
+from threading import Timer
+
+import pytest
+
+from pokewatcher.core.filewatch import (
+    FileWatcherError,
+    InotifyWatcher,
+    PollingWatcher,
+    get_mtime,
+    new_file_watcher,
+)
+
+###############################################################################
+# Helpers
+###############################################################################
+
+
+def inotify_watcher():
+    try:
+        return InotifyWatcher()
+    except FileWatcherError as e:
+        pytest.skip(str(e))
+
+
+def write_later(path, delay=0.05):
+    timer = Timer(delay, path.write_bytes, args=(b'\x01' * 16,))
+    timer.start()
+    return timer
+
+
+@pytest.fixture(params=['poll', 'inotify'])
+def watcher(request):
+    if request.param == 'poll':
+        w = PollingWatcher(interval=0.01)
+    else:
+        w = inotify_watcher()
+    yield w
+    w.close()
+
+
+###############################################################################
+# File Watchers
+###############################################################################
+
+
+def test_detects_write(tmp_path, watcher):
+    save_file = tmp_path / 'rom.srm'
+    save_file.write_bytes(b'\x00' * 16)
+    since = get_mtime(save_file)
+    os.utime(save_file, (since - 10.0, since - 10.0))
+    since = get_mtime(save_file)
+    timer = write_later(save_file)
+    try:
+        assert watcher.wait_for_write(save_file, since, timeout=5.0)
+    finally:
+        timer.join()
+
+
+def test_detects_write_before_waiting(tmp_path, watcher):
+    save_file = tmp_path / 'rom.srm'
+    save_file.write_bytes(b'\x00' * 16)
+    assert watcher.wait_for_write(save_file, 0.0, timeout=0.0)
+
+
+def test_times_out_without_writes(tmp_path, watcher):
+    save_file = tmp_path / 'rom.srm'
+    save_file.write_bytes(b'\x00' * 16)
+    (tmp_path / 'other.srm').write_bytes(b'\x00')
+    assert not watcher.wait_for_write(save_file, get_mtime(save_file), timeout=0.05)
+
+
+def test_wake_interrupts_wait(tmp_path, watcher):
+    save_file = tmp_path / 'rom.srm'
+    timer = Timer(0.05, watcher.wake)
+    timer.start()
+    try:
+        assert not watcher.wait_for_write(save_file, 0.0, timeout=5.0)
+    finally:
+        timer.join()
+
+
+def test_new_file_watcher():
+    watcher = new_file_watcher('poll', poll_interval=0.5)
+    assert isinstance(watcher, PollingWatcher)
+    assert watcher.interval == 0.5
+    with pytest.raises(FileWatcherError):
+        new_file_watcher('fanotify')
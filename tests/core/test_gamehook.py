@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import pytest
+
+from pokewatcher.core.capture import CaptureError, CaptureWriter
+from pokewatcher.core.gamehook import GameHookBridge
+
+###############################################################################
+# Helpers
+###############################################################################
+
+
+def record_session(path):
+    writer = CaptureWriter(path)
+    writer.open(meta={'gameName': 'Pokemon Yellow'})
+    writer.write(('gameTime.frames', 0xD3DA, 12, [12], False, ['value', 'bytes']))
+    writer.write(('player.name', 0xD158, 'ASH', [128, 146, 135], False, ['value']))
+    writer.write(('player.badges', 0xD356, 1, [1], False, ['bytes']))
+    writer.write(('gameTime.frames', 0xD3DA, 13, [13], False, ['bytes']))
+    writer.close()
+
+
+def recording_bridge():
+    changes = []
+    flushes = []
+    bridge = GameHookBridge(
+        on_change=lambda *args: changes.append(args),
+        on_flush=lambda: flushes.append(len(changes)),
+    )
+    return bridge, changes, flushes
+
+
+###############################################################################
+# Replay
+###############################################################################
+
+
+def test_replay_delivers_recorded_changes_in_order(tmp_path):
+    path = tmp_path / 'session.pwcap'
+    record_session(path)
+    bridge, changes, flushes = recording_bridge()
+    n = bridge.replay(path, speed=0)
+    assert n == 3
+    assert bridge.game_name == 'Pokemon Yellow'
+    assert changes == [
+        ('gameTime.frames', 12, [12]),
+        ('player.badges', 1, [1]),
+        ('gameTime.frames', 13, [13]),
+    ]
+    # flushed once, after every change was delivered
+    assert flushes == [3]
+
+
+def test_replay_paces_changes_with_speed(tmp_path):
+    path = tmp_path / 'session.pwcap'
+    record_session(path)
+    bridge, changes, _flushes = recording_bridge()
+    sleeps = []
+    bridge.replay(path, speed=1e-6, sleep=sleeps.append)
+    # recorded timestamps are tiny, but scaled up by the slow speed;
+    # every record is waited for, even those that are not delivered
+    assert len(sleeps) == 4
+    assert all(delay > 0.0 for delay in sleeps)
+    assert len(changes) == 3
+
+
+def test_replay_rejects_foreign_files(tmp_path):
+    path = tmp_path / 'session.pwcap'
+    path.write_bytes(b'not a capture')
+    bridge, changes, flushes = recording_bridge()
+    with pytest.raises(CaptureError):
+        bridge.replay(path, speed=0)
+    assert changes == []
+    assert flushes == []
+
+
+def test_replay_applies_changes_before_a_truncated_record(tmp_path):
+    path = tmp_path / 'session.pwcap'
+    record_session(path)
+    path.write_bytes(path.read_bytes()[:-2])
+    bridge, changes, flushes = recording_bridge()
+    with pytest.raises(CaptureError):
+        bridge.replay(path, speed=0)
+    assert changes == [('gameTime.frames', 12, [12]), ('player.badges', 1, [1])]
+    assert flushes == [2]
@@ -0,0 +1,126 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from threading import Thread
+
+from pokewatcher.core.ingest import (
+    POLICY_BLOCK,
+    POLICY_COALESCE,
+    POLICY_DROP_OLDEST,
+    IngestQueue,
+)
+
+###############################################################################
+# Helpers
+###############################################################################
+
+
+class Recorder:
+    def __init__(self):
+        self.changes = []
+
+    def __call__(self, prop, value, byte_values):
+        self.changes.append((prop, value))
+
+
+###############################################################################
+# Ingest Queue
+###############################################################################
+
+
+def test_drain_delivers_in_order():
+    queue = IngestQueue()
+    queue.put('a', 1, [1])
+    queue.put('b', 2, [2])
+    queue.put('a', 3, [3])
+    assert queue.depth == 3
+    recorder = Recorder()
+    assert queue.drain(recorder) == 3
+    assert recorder.changes == [('a', 1), ('b', 2), ('a', 3)]
+    assert queue.depth == 0
+    assert queue.stats.delivered == 3
+    assert queue.stats.max_depth == 3
+
+
+def test_drain_with_limit():
+    queue = IngestQueue()
+    for i in range(5):
+        queue.put('a', i, [i])
+    recorder = Recorder()
+    assert queue.drain(recorder, limit=2) == 2
+    assert recorder.changes == [('a', 0), ('a', 1)]
+    assert queue.depth == 3
+
+
+def test_failing_callback_does_not_lose_the_batch():
+    queue = IngestQueue()
+    for prop in ('a', 'b', 'c'):
+        queue.put(prop, 1, [1])
+    recorder = Recorder()
+
+    def callback(prop, value, byte_values):
+        if prop == 'b':
+            raise ValueError(prop)
+        recorder(prop, value, byte_values)
+
+    assert queue.drain(callback) == 3
+    assert recorder.changes == [('a', 1), ('c', 1)]
+    assert queue.stats.delivered == 2
+    assert queue.stats.failed == 1
+
+
+def test_drop_oldest_when_full():
+    queue = IngestQueue(capacity=2, policy=POLICY_DROP_OLDEST)
+    queue.put('a', 1, [1])
+    queue.put('b', 2, [2])
+    queue.put('c', 3, [3])
+    recorder = Recorder()
+    queue.drain(recorder)
+    assert recorder.changes == [('b', 2), ('c', 3)]
+    assert queue.stats.dropped == 1
+    assert queue.stats.received == 3
+
+
+def test_coalesce_keeps_latest_value_in_original_position():
+    queue = IngestQueue(capacity=2, policy=POLICY_COALESCE)
+    queue.put('a', 1, [1])
+    queue.put('b', 2, [2])
+    queue.put('a', 3, [3])
+    queue.put('a', 4, [4])
+    recorder = Recorder()
+    queue.drain(recorder)
+    assert recorder.changes == [('a', 4), ('b', 2)]
+    assert queue.stats.coalesced == 2
+    assert queue.stats.dropped == 0
+    # after draining, the same property is queued again
+    queue.put('a', 5, [5])
+    queue.drain(recorder)
+    assert recorder.changes[-1] == ('a', 5)
+
+
+def test_block_times_out_and_drops_new_change():
+    queue = IngestQueue(capacity=1, policy=POLICY_BLOCK, block_timeout=0.01)
+    queue.put('a', 1, [1])
+    queue.put('b', 2, [2])
+    recorder = Recorder()
+    queue.drain(recorder)
+    assert recorder.changes == [('a', 1)]
+    assert queue.stats.dropped == 1
+
+
+def test_block_waits_for_consumer():
+    queue = IngestQueue(capacity=1, policy=POLICY_BLOCK, block_timeout=5.0)
+    queue.put('a', 1, [1])
+    producer = Thread(target=queue.put, args=('b', 2, [2]))
+    producer.start()
+    recorder = Recorder()
+    while len(recorder.changes) < 2:
+        if queue.wait(1.0):
+            queue.drain(recorder)
+    producer.join()
+    assert recorder.changes == [('a', 1), ('b', 2)]
+    assert queue.stats.dropped == 0
@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import socket
+from threading import Thread
+
+import pytest
+
+from pokewatcher.core.livesplit import LivesplitClient
+
+###############################################################################
+# Helpers
+###############################################################################
+
+
+class FakeLivesplitServer:
+    """Answers `getcurrenttime` with a counter, sending replies in odd chunks."""
+
+    def __init__(self):
+        self.listener = socket.create_server(('127.0.0.1', 0))
+        self.port = self.listener.getsockname()[1]
+        self.received = []
+        self.connections = 0
+        self.thread = Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            with conn:
+                self.handle(conn)
+
+    def handle(self, conn):
+        buffer = b''
+        while True:
+            data = conn.recv(1024)
+            if not data:
+                return
+            buffer += data
+            replies = b''
+            while b'\r\n' in buffer:
+                line, buffer = buffer.split(b'\r\n', 1)
+                command = line.decode()
+                self.received.append(command)
+                if command == 'getcurrenttime':
+                    replies += f'1:{len(self.received):02}.50\r\n'.encode()
+                elif command == 'hangup':
+                    return
+            # split and merge replies across packets
+            for i in range(0, len(replies), 5):
+                conn.sendall(replies[i : i + 5])
+
+    def close(self):
+        self.listener.close()
+
+
+@pytest.fixture
+def server():
+    s = FakeLivesplitServer()
+    yield s
+    s.close()
+
+
+###############################################################################
+# LiveSplit Client
+###############################################################################
+
+
+def test_pipelined_requests_are_matched_in_order(server):
+    client = LivesplitClient('127.0.0.1', server.port, timeout=2.0)
+    client.start()
+    try:
+        client.send('starttimer')
+        futures = [client.request('getcurrenttime') for _ in range(5)]
+        client.send('pause')
+        replies = [f.result(timeout=2.0) for f in futures]
+    finally:
+        client.stop()
+    assert replies == [f'1:{i:02}.50' for i in range(2, 7)]
+    assert server.received[0] == 'starttimer'
+    assert client.stats['getcurrenttime'].sent == 5
+    assert client.stats['starttimer'].sent == 1
+
+
+def test_reconnects_after_connection_loss(server):
+    client = LivesplitClient('127.0.0.1', server.port, timeout=2.0, backoff_min=0.01)
+    client.start()
+    try:
+        assert client.request('getcurrenttime').result(timeout=2.0)
+        client.send('hangup')
+        reply = None
+        for _ in range(100):
+            try:
+                reply = client.request('getcurrenttime').result(timeout=2.0)
+                break
+            except ConnectionError:
+                continue
+    finally:
+        client.stop()
+    assert reply is not None
+    assert server.connections == 2
+
+
+def test_requests_fail_when_stopped():
+    client = LivesplitClient('127.0.0.1', 9, timeout=0.1, backoff_min=10.0)
+    client.start()
+    future = client.request('getcurrenttime')
+    client.stop()
+    with pytest.raises(ConnectionError):
+        future.result(timeout=1.0)
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import json
+
+import pytest
+
+from pokewatcher.core.mapper_cache import MapperCache, mapper_digest
+
+###############################################################################
+# Helpers
+###############################################################################
+
+URL = 'http://localhost:8085/mapper'
+
+MAPPER = {
+    'meta': {'gameName': 'Pokemon Yellow'},
+    'glossary': {},
+    'properties': [{'path': 'player.playerId', 'address': 0xD359, 'length': 2}],
+}
+
+###############################################################################
+# Mapper Cache
+###############################################################################
+
+
+def test_saved_mapper_is_loaded_back(tmp_path):
+    cache = MapperCache(tmp_path / 'cache')
+    body = json.dumps(MAPPER).encode('utf-8')
+    saved = cache.save(URL, body, etag='"v1"')
+    assert saved.key == f'Pokemon Yellow@{mapper_digest(body)[:12]}'
+    loaded = cache.load(URL)
+    assert loaded == saved
+    assert loaded.mapper == MAPPER
+    assert cache.load('http://localhost:9999/mapper') is None
+
+
+def test_corrupted_or_unloaded_mappers_are_not_used(tmp_path):
+    cache = MapperCache(tmp_path)
+    assert cache.load(URL) is None
+    cache.save(URL, json.dumps(MAPPER).encode('utf-8'))
+    cache.mapper_path(URL).write_text(json.dumps({'meta': {}}))
+    assert cache.load(URL) is None
+    with pytest.raises(KeyError):
+        cache.save(URL, b'{"meta": {"gameName": "Pokemon Yellow"}}')
@@ -0,0 +1,180 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from pokewatcher.core.memory import (
+    AddressMap,
+    IntervalIndex,
+    MemoryBlock,
+    MemoryField,
+    MemoryPoller,
+    changed_ranges,
+)
+
+###############################################################################
+# Helpers
+###############################################################################
+
+MAPPER_PROPERTIES = [
+    {'path': 'player.playerId', 'address': 0xD359, 'length': 2},
+    {'path': 'player.name', 'address': 0xD158, 'length': 11},
+    {'path': 'gameTime.hours', 'address': 0xDA41, 'length': 1},
+    {'path': 'gameTime.minutes', 'address': 0xDA43, 'length': 1},
+    {'path': 'gameTime.seconds', 'address': 0xDA44, 'length': 1},
+    {'path': 'gameTime.frames', 'address': 0xDA45, 'length': 1},
+    {'path': 'overworld.map', 'address': None, 'length': 1},
+]
+
+INCLUDE = {
+    'player.playerId',
+    'gameTime.hours',
+    'gameTime.minutes',
+    'gameTime.seconds',
+    'gameTime.frames',
+    'overworld.map',
+}
+
+
+class FakeMemory:
+    def __init__(self):
+        self.ram = bytearray(0x10000)
+        self.reads = []
+
+    def read(self, requests):
+        self.reads.append(list(requests))
+        return [bytes(self.ram[a : a + n]) for a, n in requests]
+
+
+###############################################################################
+# Address Map
+###############################################################################
+
+
+def test_address_map_from_mapper():
+    address_map = AddressMap.from_mapper(MAPPER_PROPERTIES, INCLUDE)
+    assert address_map.fields[0] == MemoryField(0xD359, 2, 'player.playerId')
+    assert address_map.props == INCLUDE - {'overworld.map'}
+
+
+def test_nearby_fields_are_batched():
+    address_map = AddressMap.from_mapper(MAPPER_PROPERTIES, INCLUDE)
+    blocks = address_map.blocks()
+    assert [(b.address, b.length) for b in blocks] == [(0xD359, 2), (0xDA41, 5)]
+    blocks = address_map.blocks(max_gap=0)
+    assert [(b.address, b.length) for b in blocks] == [(0xD359, 2), (0xDA41, 1), (0xDA43, 3)]
+    blocks = address_map.blocks(max_length=2)
+    assert [(b.address, b.length) for b in blocks] == [
+        (0xD359, 2),
+        (0xDA41, 1),
+        (0xDA43, 2),
+        (0xDA45, 1),
+    ]
+
+
+def test_packed_group_replaces_its_members():
+    members = ['gameTime.hours', 'gameTime.minutes', 'gameTime.seconds', 'gameTime.frames']
+    address_map = AddressMap.from_mapper(
+        MAPPER_PROPERTIES, INCLUDE, packed={'gameTime': (members, 5)}
+    )
+    assert address_map.fields == [
+        MemoryField(0xD359, 2, 'player.playerId'),
+        MemoryField(0xDA41, 5, 'gameTime'),
+    ]
+    # members outside of the group size are left as they are
+    address_map = AddressMap.from_mapper(
+        MAPPER_PROPERTIES, INCLUDE, packed={'gameTime': (members, 4)}
+    )
+    assert 'gameTime' not in address_map.props
+    assert len(address_map.fields) == 5
+
+
+###############################################################################
+# Polling
+###############################################################################
+
+
+def test_poller_emits_only_changed_properties():
+    memory = FakeMemory()
+    changes = []
+    poller = MemoryPoller(
+        memory.read,
+        AddressMap.from_mapper(MAPPER_PROPERTIES, INCLUDE),
+        on_change=lambda prop, value, byte_values: changes.append((prop, byte_values)),
+    )
+    assert poller.poll() == 5  # first snapshot
+    assert len(memory.reads[0]) == 2
+    changes.clear()
+
+    assert poller.poll() == 0
+    memory.ram[0xDA45] = 30
+    memory.ram[0xD35A] = 0x39
+    assert poller.poll() == 2
+    assert changes == [('player.playerId', b'\x00\x39'), ('gameTime.frames', b'\x1e')]
+
+    changes.clear()
+    poller.reset()
+    assert poller.poll() == 5
+
+
+def test_first_snapshot_can_seed_instead_of_change():
+    seeds = []
+    changes = []
+    memory = FakeMemory()
+    poller = MemoryPoller(
+        memory.read,
+        AddressMap.from_mapper(MAPPER_PROPERTIES, INCLUDE),
+        on_change=lambda prop, value, byte_values: changes.append(prop),
+        on_seed=lambda prop, value, byte_values: seeds.append(prop),
+    )
+    poller.poll()
+    memory.ram[0xDA45] = 1
+    poller.poll()
+    assert len(seeds) == 5
+    assert changes == ['gameTime.frames']
+
+
+###############################################################################
+# Block Diffing
+###############################################################################
+
+
+def test_changed_ranges_are_chunk_aligned_and_merged():
+    a = bytes(64)
+    b = bytearray(a)
+    assert changed_ranges(a, bytes(b), chunk=8) == []
+    b[3] = 1
+    b[9] = 1
+    b[40] = 1
+    assert changed_ranges(a, bytes(b), chunk=8) == [(0, 16), (40, 48)]
+    ranges = changed_ranges(a, bytes(b[:50]), chunk=8)
+    assert ranges[-1] == (50, 64)
+    assert all(any(start <= i < end for start, end in ranges) for i in (3, 9, 40))
+
+
+def test_interval_index_finds_overlapping_fields():
+    fields = [
+        MemoryField(0x10, 4, 'a'),
+        MemoryField(0x12, 1, 'b'),
+        MemoryField(0x20, 2, 'c'),
+    ]
+    index = IntervalIndex(fields)
+    assert [f.prop for f in index.overlapping(0x13, 0x14)] == ['a']
+    assert [f.prop for f in index.overlapping(0x12, 0x13)] == ['a', 'b']
+    assert [f.prop for f in index.overlapping(0x14, 0x20)] == []
+    assert [f.prop for f in index.overlapping(0x00, 0x40)] == ['a', 'b', 'c']
+
+
+def test_block_diff_reports_only_changed_fields():
+    fields = [MemoryField(0x100 + 4 * i, 2, f'p{i}') for i in range(32)]
+    block = MemoryBlock(0x100, 128, fields)
+    data = bytearray(128)
+    assert len(block.diff(bytes(data))) == 32
+    assert block.diff(bytes(data)) == []
+    data[2] = 0xFF  # between fields p0 and p1
+    data[9] = 0xFF  # p2
+    data[127] = 0xFF  # beyond the last field
+    data[124] = 0xFF  # p31
+    assert [f.prop for f in block.diff(bytes(data))] == ['p2', 'p31']
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import asyncio
+import socket
+from threading import Thread
+
+import pytest
+
+from pokewatcher.core.retroarch import (
+    AsyncRetroArchClient,
+    RetroArchClient,
+    RetroArchError,
+    reply_key,
+)
+
+###############################################################################
+# Helpers
+###############################################################################
+
+MEMORY = {0xD158: 0x80, 0xD159: 0x92, 0xD15A: 0x87}
+
+
+class FakeRetroArch:
+    """Answers NCI commands over UDP, except `GET_CONFIG_PARAM ignored`."""
+
+    def __init__(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('127.0.0.1', 0))
+        self.port = self.socket.getsockname()[1]
+        self.received = []
+        self.thread = Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                data, addr = self.socket.recvfrom(4096)
+            except OSError:
+                return
+            command = data.decode().strip()
+            self.received.append(command)
+            reply = self.reply(command)
+            if reply is not None:
+                self.socket.sendto(reply.encode() + b'\n', addr)
+
+    def reply(self, command):
+        parts = command.split()
+        if parts[0] == 'GET_STATUS':
+            return 'GET_STATUS PLAYING game_boy,Pokemon Yellow,crc32=7d527d62'
+        if parts[0] == 'GET_CONFIG_PARAM' and parts[1] != 'ignored':
+            return f'{command} /saves/{parts[1]}'
+        if parts[0] == 'READ_CORE_MEMORY':
+            address = int(parts[1], 16)
+            if address not in MEMORY:
+                return f'READ_CORE_MEMORY {parts[1]} -1 no memory map defined'
+            values = ' '.join(f'{MEMORY.get(address + i, 0):02X}' for i in range(int(parts[2])))
+            return f'READ_CORE_MEMORY {parts[1]} {values}'
+        return None
+
+    def close(self):
+        self.socket.close()
+
+
+@pytest.fixture
+def retroarch():
+    server = FakeRetroArch()
+    yield server
+    server.close()
+
+
+###############################################################################
+# RetroArch Client
+###############################################################################
+
+
+def test_reply_key():
+    assert reply_key('GET_STATUS PLAYING game_boy,Pokemon Yellow') == ('GET_STATUS',)
+    assert reply_key('GET_CONFIG_PARAM savefile_directory /a b') == (
+        'GET_CONFIG_PARAM',
+        'savefile_directory',
+    )
+    assert reply_key('READ_CORE_MEMORY 0xD158 80') == reply_key('READ_CORE_MEMORY d158 1')
+
+
+def test_async_client_matches_concurrent_replies(retroarch):
+    async def run():
+        client = AsyncRetroArchClient('127.0.0.1', retroarch.port, timeout=2.0)
+        await client.connect()
+        try:
+            return await asyncio.gather(
+                client.get_status(),
+                client.get_config_param('savefile_directory'),
+                client.get_config_param('system_directory'),
+                client.read_core_memory(0xD158, 3),
+            )
+        finally:
+            client.close()
+
+    status, saves, system, memory = asyncio.run(run())
+    assert status == ('PLAYING', 'Pokemon Yellow')
+    assert saves == '/saves/savefile_directory'
+    assert system == '/saves/system_directory'
+    assert memory == bytes([0x80, 0x92, 0x87])
+
+
+def test_sync_client_timeouts_and_errors(retroarch):
+    client = RetroArchClient('127.0.0.1', retroarch.port, timeout=0.1)
+    client.start()
+    try:
+        with pytest.raises(RetroArchError):
+            client.get_config_param('ignored')
+        with pytest.raises(RetroArchError):
+            client.read_core_memory(0x1234, 1)
+        client.save_state()
+        assert client.get_status() == ('PLAYING', 'Pokemon Yellow')
+        reads = client.read_core_memory_many([(0xD158, 2), (0xD159, 2)])
+        assert reads == [bytes([0x80, 0x92]), bytes([0x92, 0x87])]
+    finally:
+        client.stop()
+    assert 'SAVE_STATE' in retroarch.received
+
+
+def test_sync_client_safety_net_timeout(retroarch):
+    client = RetroArchClient('127.0.0.1', retroarch.port, timeout=0.05)
+    client.start()
+    try:
+        with pytest.raises(RetroArchError):
+            client._call(asyncio.sleep(1.0))
+        assert client.get_status() == ('PLAYING', 'Pokemon Yellow')
+    finally:
+        client.stop()
+
+
+def test_sync_client_requires_start():
+    client = RetroArchClient('127.0.0.1', 55355)
+    with pytest.raises(RetroArchError):
+        client.get_status()
+    with pytest.raises(RetroArchError):
+        client.save_state()
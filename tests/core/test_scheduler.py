@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import pytest
+
+from pokewatcher.core.scheduler import Scheduler
+
+###############################################################################
+# Helpers
+###############################################################################
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+###############################################################################
+# Scheduler
+###############################################################################
+
+
+def test_tasks_run_at_their_own_rates():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    fast = []
+    slow = []
+    scheduler.add('fast', fast.append, rate=8.0)
+    scheduler.add('slow', slow.append, rate=1.0)
+    for _ in range(16):
+        scheduler.run_pending()
+        clock.now += 0.125
+    assert len(fast) == 16
+    assert len(slow) == 2
+    assert fast[1] == pytest.approx(0.125)
+    assert slow[1] == pytest.approx(1.0)
+
+
+def test_deadlines_do_not_drift_with_lateness():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    task = scheduler.add('task', lambda delta: None, rate=10.0)
+    scheduler.run_pending()
+    clock.now += 0.15  # late, but within the next period
+    scheduler.run_pending()
+    assert task.next_due == pytest.approx(100.2)
+    assert task.overruns == 0
+    assert task.max_lateness == pytest.approx(0.05)
+
+
+def test_overruns_skip_missed_periods():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+
+    def slow(delta):
+        clock.now += 0.35
+
+    task = scheduler.add('slow', slow, rate=10.0)
+    scheduler.run_pending()
+    assert task.overruns == 1
+    assert task.next_due == pytest.approx(100.45)
+    assert task.max_duration == pytest.approx(0.35)
+
+
+def test_wake_runs_wake_tasks_early():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    woken = []
+    periodic = []
+    scheduler.add('woken', woken.append, rate=1.0, on_wake=True)
+    scheduler.add('periodic', periodic.append, rate=1.0)
+    scheduler.run_pending()
+    clock.now += 0.25
+    assert scheduler.run_pending() == 0
+    scheduler.wake()
+    assert scheduler.run_pending() == 1
+    assert len(woken) == 2
+    assert len(periodic) == 1
+    # waking does not move the periodic deadline
+    assert scheduler.time_until_next_due() == pytest.approx(0.75)
+
+
+def test_stop_from_a_task():
+    scheduler = Scheduler()
+    calls = []
+
+    def task(delta):
+        calls.append(delta)
+        if len(calls) == 3:
+            scheduler.stop()
+
+    scheduler.add('task', task, rate=1000.0)
+    scheduler.run()
+    assert len(calls) == 3
+    assert not scheduler.is_running
+
+
+def test_reject_bad_rates():
+    with pytest.raises(ValueError):
+        Scheduler().add('task', lambda delta: None, rate=0.0)
@@ -0,0 +1,324 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from attrs import define, field
+
+from pokewatcher.data.gamehook import DataHandler
+from pokewatcher.data.structs import GameData
+from pokewatcher.events import on_data_batch, on_data_changed
+from pokewatcher.logic.fsm import StateMachine
+
+###############################################################################
+# Helpers
+###############################################################################
+
+
+@define
+class RecordingStateMachine(StateMachine):
+    inputs: list = field(factory=list)
+
+    def on_input(self, label, prev, value, data):
+        self.inputs.append((label, prev, value))
+
+
+def new_handler():
+    return DataHandler(GameData(), RecordingStateMachine())
+
+
+def watching(event):
+    calls = []
+
+    def cb(*args):
+        calls.append(args)
+
+    event.watch(cb)
+    return calls, cb
+
+
+###############################################################################
+# Data Handler
+###############################################################################
+
+
+def test_unknown_property_is_ignored():
+    handler = new_handler()
+    handler.on_property_changed('not.configured', 1, [1])
+    assert handler.fsm.inputs == []
+
+
+def test_bytes_are_decoded_with_endianness():
+    handler = new_handler()
+    handler.configure_property('a', {'type': 'int', 'bytes': True, 'store': 'player.money'})
+    handler.configure_property(
+        'b',
+        {'type': 'int', 'bytes': True, 'little_endian': True, 'store': 'player.number'},
+    )
+    handler.on_property_changed('a', None, [0x01, 0x02])
+    handler.on_property_changed('b', None, [0x01, 0x02])
+    assert handler.data.player.money == 0x0102
+    assert handler.data.player.number == 0x0201
+
+
+def test_bytes_are_decoded_from_any_length_and_buffer():
+    handler = new_handler()
+    handler.configure_property('a', {'type': 'int', 'bytes': True, 'store': 'player.money'})
+    handler.on_property_changed('a', None, [0x42])
+    assert handler.data.player.money == 0x42
+    handler.on_property_changed('a', None, b'\x01\x02\x03')
+    assert handler.data.player.money == 0x010203
+    handler.on_property_changed('a', None, memoryview(b'\x00\x00\x00\x07'))
+    assert handler.data.player.money == 7
+
+
+def test_packed_properties_apply_only_changed_members():
+    handler = new_handler()
+    handler.configure_property('h', {'type': 'int', 'bytes': True, 'store': 'time.hours'})
+    handler.configure_property('m', {'type': 'int', 'bytes': True, 'store': 'time.minutes'})
+    handler.configure_property('f', {'type': 'int', 'bytes': True, 'label': 'wFrames'})
+    handler.configure_property('t', {'packed': ['h', 'm', 'f'], 'format': '>BxBB'})
+    handler.on_property_changed('t', None, bytes([1, 0xFF, 2, 3]))
+    assert (handler.data.time.hours, handler.data.time.minutes) == (1, 2)
+    handler.on_property_changed('t', None, [1, 0, 2, 4])
+    assert handler.fsm.inputs == [('wFrames', None, 3), ('wFrames', 3, 4)]
+    assert handler.properties['h'].previous == 1
+
+
+def test_packed_format_must_match_members():
+    handler = new_handler()
+    handler.configure_property('t', {'packed': ['h', 'm'], 'format': '>BBB'})
+    handler.configure_property('u', {'packed': ['h', 'm'], 'format': '>Q?!'})
+    assert handler.packed == {}
+    handler.on_property_changed('t', None, [1, 2, 3])
+
+
+def test_processors_are_applied_in_order():
+    handler = new_handler()
+    metadata = {
+        'type': 'string',
+        'store': 'location',
+        'processors': [['prefix', 'Kanto/'], ['suffix', '!']],
+    }
+    handler.configure_property('overworld.map', metadata)
+    handler.on_property_changed('overworld.map', 'Pallet Town', [])
+    assert handler.data.location == 'Kanto/Pallet Town!'
+
+
+def test_default_replaces_missing_value():
+    handler = new_handler()
+    metadata = {'type': 'int', 'store': 'battle.player.stages.attack', 'default': 0}
+    handler.configure_property('stage', metadata)
+    handler.on_property_changed('stage', 3, [])
+    assert handler.data.battle.player.stages.attack == 3
+    handler.on_property_changed('stage', None, [])
+    assert handler.data.battle.player.stages.attack == 0
+
+
+def test_store_emits_data_changed():
+    handler = new_handler()
+    handler.configure_property('level', {'type': 'int', 'store': 'player.team.slot1.level'})
+    changes = []
+
+    def cb(path, prev, value):
+        changes.append((path, prev, value))
+
+    on_data_changed.watch(cb)
+    try:
+        handler.on_property_changed('level', 5, [])
+        handler.on_property_changed('level', 6, [])
+    finally:
+        on_data_changed.forget(cb)
+    assert changes == [
+        ('player.team.slot1.level', 1, 5),
+        ('player.team.slot1.level', 5, 6),
+    ]
+
+
+def test_invalid_store_path_is_rejected_on_configure():
+    handler = new_handler()
+    handler.configure_property('level', {'type': 'int', 'store': 'player.team.slot9.level'})
+    assert handler.properties['level'].attribute is None
+    handler.on_property_changed('level', 5, [])
+
+
+def test_label_feeds_state_machine_with_previous_value():
+    handler = new_handler()
+    handler.configure_property('x', {'type': 'int', 'label': 'wXCoord'})
+    handler.configure_property('id', {'type': 'int', 'store': 'player.number', 'label': 'wID'})
+    handler.on_property_changed('x', 3, [])
+    handler.on_property_changed('x', 4, [])
+    handler.on_property_changed('id', 7, [])
+    assert handler.fsm.inputs == [
+        ('wXCoord', None, 3),
+        ('wXCoord', 3, 4),
+        ('wID', -1, 7),
+    ]
+
+
+def test_handlers_run_before_state_machine():
+    handler = new_handler()
+    calls = []
+    handler.configure_property('x', {'type': 'int', 'label': 'wXCoord'})
+    handler.do('x', lambda value, data: calls.append(('first', value)))
+    handler.do('x', lambda value, data: calls.append(('second', value)))
+    handler.on_property_changed('x', 9, [])
+    assert calls == [('first', 9), ('second', 9)]
+    assert handler.fsm.inputs == [('wXCoord', None, 9)]
+
+
+def test_coalesced_property_applies_latest_value_on_flush():
+    handler = new_handler()
+    metadata = {'type': 'int', 'store': 'time.frames', 'coalesce_ms': 60000}
+    handler.configure_property('gameTime.frames', metadata)
+    handler.on_property_changed('gameTime.frames', 1, [])
+    assert handler.data.time.frames == 1
+    handler.on_property_changed('gameTime.frames', 2, [])
+    handler.on_property_changed('gameTime.frames', 3, [])
+    assert handler.data.time.frames == 1
+    handler.flush()
+    assert handler.data.time.frames == 1
+    handler._deferred['gameTime.frames'].due = 0.0
+    handler.flush()
+    assert handler.data.time.frames == 3
+
+
+def test_label_properties_are_never_coalesced():
+    handler = new_handler()
+    metadata = {'type': 'int', 'label': 'wXCoord', 'coalesce_ms': 60000}
+    handler.configure_property('overworld.x', metadata)
+    for x in range(3):
+        handler.on_property_changed('overworld.x', x, [])
+    assert [value for _label, _prev, value in handler.fsm.inputs] == [0, 1, 2]
+
+
+def test_transaction_emits_one_batch_and_orders_labels():
+    handler = new_handler()
+    handler.configure_property('x', {'type': 'int', 'store': 'player.number', 'label': 'wX'})
+    handler.configure_property('y', {'type': 'int', 'store': 'player.money', 'label': 'wY'})
+    changes, cb = watching(on_data_changed)
+    batches, cb_batch = watching(on_data_batch)
+    money = []
+
+    def cb_money(*args):
+        money.append(args)
+
+    on_data_changed.watch_path('player.money', cb_money)
+    try:
+        handler.on_properties_changed([('y', 1, []), ('x', 2, []), ('y', 3, [])])
+    finally:
+        on_data_changed.forget(cb)
+        on_data_batch.forget(cb_batch)
+        on_data_changed.forget_path('player.money', cb_money)
+    assert batches == [({'player.money': (0, 3), 'player.number': (-1, 2)},)]
+    # plain subscribers see each changed path once
+    assert changes == [('player.money', 0, 3), ('player.number', -1, 2)]
+    assert money == [('player.money', 0, 3)]
+    # configuration order, then every value of each label in order
+    assert handler.fsm.inputs == [('wX', -1, 2), ('wY', 0, 1), ('wY', 1, 3)]
+
+
+def test_consecutive_group_members_are_applied_together():
+    handler = new_handler()
+    handler.configure_property('a', {'type': 'int', 'label': 'wA'})
+    handler.configure_property('b', {'type': 'int', 'label': 'wB'})
+    handler.configure_property('c', {'type': 'int', 'label': 'wC'})
+    handler.configure_property('ab', {'group': ['a', 'b']})
+    handler.on_property_changed('b', 1, [])
+    assert handler.fsm.inputs == []
+    # complete as soon as every member is in
+    handler.on_property_changed('a', 2, [])
+    assert [label for label, _prev, _value in handler.fsm.inputs] == ['wA', 'wB']
+    handler.on_property_changed('b', 4, [])
+    handler.on_property_changed('c', 3, [])
+    assert [label for label, _prev, _value in handler.fsm.inputs] == ['wA', 'wB', 'wB', 'wC']
+    handler.on_property_changed('a', 5, [])
+    handler.flush()
+    assert handler.fsm.inputs[-1] == ('wA', 2, 5)
+
+
+def test_partial_group_is_closed_by_flush():
+    handler = new_handler()
+    handler.configure_property('a', {'type': 'int', 'store': 'player.money', 'label': 'wA'})
+    handler.configure_property('b', {'type': 'int', 'label': 'wB'})
+    handler.configure_property('c', {'type': 'int', 'label': 'wC'})
+    handler.configure_property('abc', {'group': ['a', 'b', 'c']})
+    changes, cb = watching(on_data_changed)
+    try:
+        # e.g., a level up that raises only some stats
+        handler.on_property_changed('b', 1, [])
+        handler.on_property_changed('a', 2, [])
+        assert changes == []
+        assert handler.fsm.inputs == []
+        # the end of a drain or poll
+        handler.flush()
+    finally:
+        on_data_changed.forget(cb)
+    assert changes == [('player.money', 0, 2)]
+    assert handler.fsm.inputs == [('wA', 0, 2), ('wB', None, 1)]
+    handler.on_property_changed('a', 3, [])
+    handler.flush()
+    assert handler.fsm.inputs[-1] == ('wA', 2, 3)
+
+
+def test_transaction_keeps_label_edges():
+    handler = new_handler()
+    handler.configure_property('x', {'type': 'int', 'label': 'wX'})
+    with handler.transaction():
+        for x in (0, 1, 1, 0):
+            handler.on_property_changed('x', x, [])
+    assert handler.fsm.inputs == [('wX', None, 0), ('wX', 0, 1), ('wX', 1, 0)]
+
+
+def test_nested_transactions_commit_once():
+    handler = new_handler()
+    handler.configure_property('x', {'type': 'int', 'label': 'wX'})
+    with handler.transaction():
+        with handler.transaction():
+            handler.on_property_changed('x', 1, [])
+        assert handler.fsm.inputs == []
+        handler.on_property_changed('x', 2, [])
+    assert handler.fsm.inputs == [('wX', None, 1), ('wX', 1, 2)]
+
+
+def test_bootstrap_stores_quietly_and_returns_labels():
+    handler = new_handler()
+    handler.configure_property('id', {'type': 'int', 'bytes': True, 'store': 'player.number'})
+    handler.configure_property('x', {'type': 'int', 'label': 'wX'})
+    handler.configure_property('y', {'type': 'int', 'label': 'wY'})
+    changes, cb = watching(on_data_changed)
+    try:
+        labels = handler.bootstrap(
+            [('id', 7, [0, 7]), ('x', 3, []), ('y', None, []), ('unknown', 1, [])]
+        )
+    finally:
+        on_data_changed.forget(cb)
+    assert labels == {'wX': 3}
+    assert handler.data.player.number == 7
+    assert changes == []
+    assert handler.fsm.inputs == []
+    handler.on_property_changed('x', 4, [])
+    assert handler.fsm.inputs == [('wX', 3, 4)]
+
+
+def test_seed_unpacks_packed_properties():
+    handler = new_handler()
+    handler.configure_property('h', {'type': 'int', 'bytes': True, 'store': 'time.hours'})
+    handler.configure_property('m', {'type': 'int', 'bytes': True, 'label': 'wMinutes'})
+    handler.configure_property('t', {'packed': ['h', 'm'], 'format': '>BB'})
+    handler.seed('t', None, b'\x02\x03')
+    assert handler.data.time.hours == 2
+    handler.on_property_changed('t', None, b'\x02\x04')
+    assert handler.fsm.inputs == [('wMinutes', 3, 4)]
+
+
+def test_unknown_value_of_a_fixed_layout_field():
+    handler = new_handler()
+    handler.configure_property('m', {'type': 'int', 'store': 'time.minutes', 'label': 'wM'})
+    handler.on_property_changed('m', 5, [])
+    # GameHook sends `None` for values that it cannot read
+    handler.on_property_changed('m', None, [])
+    assert handler.data.time.minutes == 0
+    assert handler.fsm.inputs[-1] == ('wM', 5, None)
@@ -7,8 +7,12 @@
 
 from collections import defaultdict
 
+import pytest
+
 from pokewatcher.core.util import Attribute
-from pokewatcher.data.structs import GameData
+import pokewatcher.data.constants as constants
+from pokewatcher.data.structs import GameData, MonStats, PartyMon
+from pokewatcher.errors import PokeWatcherDataError
 
 ###############################################################################
 # Data Structures
@@ -24,3 +28,72 @@ def test_asdict_converts_defaultdict():
     data = data.serialize()
     assert not isinstance(data['custom']['x'], defaultdict)
     assert isinstance(data['custom']['x'], dict)
+
+
+def test_party_slots_are_views_into_one_buffer():
+    data = GameData()
+    Attribute.of(data, 'player.team.slot2.stats.special').set(40)
+    Attribute.of(data, 'player.team.slot2.species').set('PIKACHU')
+    Attribute.of(data, 'player.badges.badge3').set(True)
+    team = data.player.team
+    assert team.slot2.stats.sp_defense == 40
+    assert team[1].species == 'PIKACHU'
+    assert data.player.badges[2] and data.player.badges['badge3']
+    team.slot1 = PartyMon(species='ONIX', level=12, stats=MonStats(hp=35))
+    assert team.lead.hp == 35
+    assert team.lead.max_hp == 35
+
+
+def test_copy_is_a_detached_snapshot():
+    data = GameData()
+    data.player.team.size = 1
+    data.player.team.slot1.level = 5
+    data.custom['x']['y'] = 1
+    snapshot = data.copy()
+    assert snapshot == data
+    data.player.team.slot1.level = 6
+    data.player.badges.badge1 = True
+    data.time.seconds = 30
+    data.custom['x']['y'] = 2
+    assert snapshot.player.team.slot1.level == 5
+    assert not snapshot.player.badges.badge1
+    assert snapshot.time.seconds == 0
+    assert snapshot.custom['x']['y'] == 1
+    assert snapshot != data
+    assert snapshot.serialize()['player']['team']['slot1']['level'] == 5
+
+
+def test_attribute_paths_are_resolved_once():
+    data = GameData()
+    attr = Attribute.of(data, constants.VAR_BATTLE_TRAINER_MON1_LEVEL)
+    attr.set(30)
+    assert data.battle.trainer.team.slot1.level == 30
+    assert attr.get() == 30
+    with pytest.raises(PokeWatcherDataError):
+        Attribute.of(data, 'player.team.slot7.level')
+    with pytest.raises(PokeWatcherDataError):
+        Attribute.of(data, 'player.team.slot1.nickname')
+    with pytest.raises(PokeWatcherDataError):
+        Attribute.of({'player': {}}, 'player.name')
+
+
+def test_number_fields_reject_other_values():
+    data = GameData()
+    minutes = Attribute.of(data, 'time.minutes')
+    minutes.set(12)
+    with pytest.raises(PokeWatcherDataError):
+        minutes.set(1.5)
+    with pytest.raises(PokeWatcherDataError):
+        PartyMon(level='5')
+    assert data.time.minutes == 12
+    data.player.badges.badge1 = True
+    assert data.player.badges.badge1
+
+
+def test_number_fields_restore_the_default_on_none():
+    data = GameData()
+    minutes = Attribute.of(data, 'time.minutes')
+    minutes.set(12)
+    minutes.set(None)
+    assert data.time.minutes == 0
+    assert PartyMon(level=None).level == PartyMon().level
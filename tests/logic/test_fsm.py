@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from attrs import define
+import pytest
+
+from pokewatcher.data.structs import GameData
+from pokewatcher.errors import StateMachineError
+from pokewatcher.logic.fsm import GameState, StateMachine, transition, transition_label
+
+###############################################################################
+# Test States
+###############################################################################
+
+
+class DummyState(GameState):
+    wIgnored = transition  # noqa: N815
+    wNext = transition  # noqa: N815
+
+
+@define
+class First(DummyState):
+    def wNext(self, prev, value, data):  # noqa: N802
+        return Second()
+
+    @transition_label('wRenamed')
+    def on_renamed(self, prev, value, data):
+        data.location = value
+        return self
+
+    def _helper(self):
+        return None
+
+
+@define
+class Second(DummyState):
+    pass
+
+
+###############################################################################
+# Transition Tables
+###############################################################################
+
+
+def test_transition_table_is_computed_per_class():
+    assert First.transitions['wIgnored'] is transition
+    assert First.transitions['wNext'] is First.wNext
+    assert First.transitions['wRenamed'] is First.on_renamed
+    assert Second.transitions['wNext'] is transition
+    assert '_helper' not in First.transitions
+    assert 'inconsistent' not in First.transitions
+
+
+def test_state_machine_transitions():
+    fsm = StateMachine(First())
+    data = GameData()
+    fsm.on_input('wIgnored', 0, 1, data)
+    assert isinstance(fsm.state, First)
+    fsm.on_input('wRenamed', '', 'Pallet Town', data)
+    assert isinstance(fsm.state, First)
+    assert data.location == 'Pallet Town'
+    fsm.on_input('wNext', 0, 1, data)
+    assert isinstance(fsm.state, Second)
+
+
+def test_state_machine_unknown_label():
+    fsm = StateMachine(First())
+    with pytest.raises(StateMachineError):
+        fsm.on_input('wUnknown', 0, 1, GameData())
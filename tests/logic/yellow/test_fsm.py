@@ -63,6 +63,16 @@ def test_initial_player_name_transition():
     )
 
 
+def test_initial_resume():
+    data = GameData()
+    assert Initial().resume({WRAM_PLAYER_ID: 0}, data).name == 'Initial'
+    labels = {WRAM_PLAYER_ID: 1234, WRAM_BATTLE_TYPE: BATTLE_TYPE_NONE}
+    assert isinstance(Initial().resume(labels, data), InOverworld)
+    labels[WRAM_BATTLE_TYPE] = BATTLE_TYPE_WILD
+    assert isinstance(Initial().resume(labels, data), InBattle)
+    assert data.battle.is_vs_wild
+
+
 ###############################################################################
 # MainMenu State
 ###############################################################################
@@ -272,10 +282,17 @@ def test_in_overworld_battle_type_trainer():
     s1 = InOverworld()
     data = GameData()
     data.battle.trainer.trainer_class = 'TRAINER'
-    s2 = s1.wIsInBattle(BATTLE_TYPE_NONE, BATTLE_TYPE_TRAINER, data)
+    payloads = []
+    events.on_battle_started.watch(payloads.append)
+    try:
+        s2 = s1.wIsInBattle(BATTLE_TYPE_NONE, BATTLE_TYPE_TRAINER, data)
+    finally:
+        events.on_battle_started.forget(payloads.append)
     assert s2 is not s1
     assert isinstance(s2, InBattle)
     assert events.on_battle_started.count == c + 1
+    assert [p.trainer_class for p in payloads] == ['TRAINER']
+    assert payloads[0].ongoing
     assert data.battle.ongoing
     assert not data.battle.is_vs_wild
 
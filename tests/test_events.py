@@ -0,0 +1,194 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André "Oatspear" Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import asyncio
+from threading import Event as ThreadEvent, Thread
+
+from attrs.exceptions import FrozenInstanceError
+import pytest
+
+from pokewatcher.data.structs import GameData
+from pokewatcher.events import (
+    DELIVERY_ASYNC,
+    DELIVERY_MAIN,
+    DELIVERY_THREAD,
+    OVERFLOW_BLOCK,
+    BattleEvent,
+    DataEvent,
+    Event,
+    GameEvent,
+    dispatch_pending,
+)
+
+###############################################################################
+# Event Bus
+###############################################################################
+
+
+def test_inline_callbacks_run_before_emit_returns():
+    calls = []
+    e = Event(name='test')
+    e.watch(calls.append)
+    e.emit(1)
+    assert calls == [1]
+    e.forget(calls.append)
+    e.emit(2)
+    assert calls == [1]
+
+
+def test_main_loop_delivery_is_queued_and_isolated():
+    calls = []
+
+    def fail(value):
+        raise RuntimeError(value)
+
+    e = Event(name='test')
+    failing = e.watch(fail, mode=DELIVERY_MAIN)
+    e.watch(calls.append, mode=DELIVERY_MAIN)
+    e.emit(1)
+    e.emit(2)
+    assert calls == []
+    assert dispatch_pending() == 4
+    assert calls == [1, 2]
+    assert failing.stats.failed == 2
+    assert failing.stats.delivered == 2
+    e.clear()
+
+
+def test_full_queue_drops_oldest():
+    calls = []
+    e = Event(name='test')
+    subscription = e.watch(calls.append, mode=DELIVERY_MAIN, max_pending=2)
+    for i in range(5):
+        e.emit(i)
+    dispatch_pending()
+    assert calls == [3, 4]
+    assert subscription.stats.dropped == 3
+    e.clear()
+
+
+def test_thread_delivery_keeps_order():
+    calls = []
+    done = ThreadEvent()
+    gate = ThreadEvent()
+
+    def callback(value):
+        gate.wait(timeout=2.0)
+        calls.append(value)
+        if value == 9:
+            done.set()
+
+    e = Event(name='test')
+    subscription = e.watch(callback, mode=DELIVERY_THREAD, overflow=OVERFLOW_BLOCK)
+    for i in range(10):
+        e.emit(i)  # does not wait for the callback
+    gate.set()
+    assert done.wait(timeout=2.0)
+    assert calls == list(range(10))
+    assert subscription.stats.delivered == 10
+    e.clear()
+
+
+def test_async_delivery_awaits_coroutines():
+    loop = asyncio.new_event_loop()
+    thread = Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    calls = []
+    done = ThreadEvent()
+
+    async def callback(value):
+        await asyncio.sleep(0)
+        calls.append(value)
+        if value == 2:
+            done.set()
+
+    e = Event(name='test')
+    e.watch(callback, mode=DELIVERY_ASYNC, loop=loop)
+    for i in range(3):
+        e.emit(i)
+    try:
+        assert done.wait(timeout=2.0)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=2.0)
+        loop.close()
+    assert calls == [0, 1, 2]
+    with pytest.raises(ValueError):
+        e.watch(callback, mode=DELIVERY_ASYNC)
+
+
+def test_path_subscriptions_match_exact_paths_and_prefixes():
+    e = DataEvent(name='test')
+    everything, badges, slot1 = [], [], []
+    e.watch(lambda *args: everything.append(args))
+    e.watch_path('player.badges', lambda *args: badges.append(args))
+    e.watch_path('player.team.slot1.*', lambda *args: slot1.append(args))
+    e.emit('player.badges', 0, 1)
+    e.emit('player.team.slot1', None, 'PIKACHU')
+    e.emit('player.team.slot1.level', 5, 6)
+    e.emit('player.team.slot10.level', 5, 6)
+    e.emit('player.badges.boulder', False, True)
+    assert len(everything) == 5
+    assert badges == [('player.badges', 0, 1)]
+    assert slot1 == [('player.team.slot1', None, 'PIKACHU'), ('player.team.slot1.level', 5, 6)]
+
+
+def test_path_subscriptions_can_be_queued_and_forgotten():
+    e = DataEvent(name='test')
+    calls = []
+
+    def callback(*args):
+        calls.append(args)
+
+    subscription = e.watch_path('player.money', callback, mode=DELIVERY_MAIN)
+    e.route('player.money', 0, 100)
+    assert calls == []
+    assert dispatch_pending() == 1
+    assert calls == [('player.money', 0, 100)]
+    e.forget_path('player.money', callback)
+    e.route('player.money', 100, 200)
+    assert dispatch_pending() == 0
+    assert subscription.stats.delivered == 1
+    with pytest.raises(ValueError):
+        e.forget_path('player.money', callback)
+
+
+###############################################################################
+# Event Payloads
+###############################################################################
+
+
+def test_battle_payload_is_captured_at_emission():
+    data = GameData(location='PALLET_TOWN')
+    data.battle.set_trainer_battle()
+    data.battle.trainer.trainer_class = 'RIVAL1'
+    data.battle.trainer.number = 2
+    data.time.minutes = 12
+    calls = []
+    e = Event(name='test')
+    e.watch(calls.append, mode=DELIVERY_MAIN)
+    e.emit(BattleEvent.of(data))
+    data.battle.set_victory()
+    data.battle.trainer.trainer_class = ''
+    data.time.minutes = 13
+    assert dispatch_pending() == 1
+    event = calls[0]
+    assert (event.trainer_class, event.trainer_number) == ('RIVAL1', 2)
+    assert event.ongoing and not event.is_vs_wild
+    assert not event.is_victory and not event.is_defeat
+    assert event.location == 'PALLET_TOWN'
+    assert event.game_time.minutes == 12
+    with pytest.raises(FrozenInstanceError):
+        event.trainer_class = 'RIVAL2'
+    assert not hasattr(event, '__dict__')
+
+
+def test_game_payload_defaults():
+    event = GameEvent()
+    assert event.location == ''
+    assert event.timestamp > 0.0
+    assert GameEvent.of(GameData(location='VIRIDIAN_CITY')).location == 'VIRIDIAN_CITY'